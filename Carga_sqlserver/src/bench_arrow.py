@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import tempfile
+import time
+from pathlib import Path
+
+from bench_convert import make_synthetic
+from excel_to_sql.bulk import write_batch_file
+from excel_to_sql.convert import compile_conversion_plan, convert_with_plan
+from excel_to_sql.io import load_table
+
+
+def _mb(n: float) -> str:
+    return f"{n / 1024 / 1024:8.1f} MB"
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark: backend numpy vs pyarrow (lectura CSV + conversión + CSV de carga).")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--cols", type=int, default=8)
+    args = parser.parse_args()
+
+    df, schema_df = make_synthetic(args.rows, args.cols)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        src = tmp / "entrada.csv"
+        df.to_csv(src, index=False)
+        print(f"📊 shape={df.shape} | CSV={_mb(src.stat().st_size)}")
+
+        for backend in ("numpy", "pyarrow"):
+            dtype_backend = "pyarrow" if backend == "pyarrow" else None
+            plan = compile_conversion_plan(schema_df, backend=backend)
+
+            t0 = time.perf_counter()
+            raw = load_table(str(src), dtype_backend=dtype_backend)
+            t1 = time.perf_counter()
+            conv = convert_with_plan(raw, plan)
+            t2 = time.perf_counter()
+            write_batch_file(conv, tmp / f"bulk_{backend}.csv")
+            t3 = time.perf_counter()
+
+            print(f"   {backend:<8} leer={t1 - t0:6.2f}s  convertir={t2 - t1:6.2f}s  csv_carga={t3 - t2:6.2f}s  "
+                  f"total={t3 - t0:6.2f}s | memoria DF={_mb(conv.memory_usage(deep=True).sum())}")
+
+
+if __name__ == "__main__":
+    main()
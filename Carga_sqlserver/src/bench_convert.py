@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from excel_to_sql.convert import (
+    convert_dataframe_to_sql_schema,
+    convert_dataframe_to_sql_schema_legacy,
+)
+
+# (DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, IS_NULLABLE) rotando por columna
+TIPOS = [
+    ("int", None, "NO"),
+    ("varchar", 50, "YES"),
+    ("decimal", None, "YES"),
+    ("datetime", None, "YES"),
+    ("bit", None, "NO"),
+    ("nvarchar", 20, "NO"),
+    ("bigint", None, "YES"),
+    ("float", None, "NO"),
+]
+
+
+def make_synthetic(rows: int, cols: int, seed: int = 0) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """DF tipo Excel (todo object) + schema_df estilo INFORMATION_SCHEMA.COLUMNS."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    schema_rows = []
+    for i in range(cols):
+        tipo, max_len, nullable = TIPOS[i % len(TIPOS)]
+        name = f"COL_{i:03d}"
+        if tipo in ("int", "bigint"):
+            v = rng.integers(0, 1_000_000, rows).astype(str)
+        elif tipo in ("decimal", "float"):
+            v = np.round(rng.random(rows) * 1000, 2).astype(str)
+        elif tipo == "datetime":
+            v = (pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 86400 * 365, rows), unit="s")).astype(str).to_numpy()
+        elif tipo == "bit":
+            v = rng.choice(np.array(["si", "no", "1", "0", "true", "false"], dtype=object), rows)
+        else:
+            v = rng.choice(np.array(["ACTIVO", "RETIRADO", "EN PROCESO DE MATRICULA", "  pendiente  "], dtype=object), rows)
+        data[name.lower()] = pd.Series(v, dtype=object)
+        schema_rows.append({
+            "COLUMN_NAME": name,
+            "DATA_TYPE": tipo,
+            "CHARACTER_MAXIMUM_LENGTH": max_len,
+            "NUMERIC_PRECISION": None,
+            "NUMERIC_SCALE": None,
+            "IS_NULLABLE": nullable,
+        })
+    return pd.DataFrame(data), pd.DataFrame(schema_rows)
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark: conversión legacy vs plan compilado (sin SQL Server).")
+    parser.add_argument("--tall-rows", type=int, default=1_000_000, help="Filas del frame alto.")
+    parser.add_argument("--tall-cols", type=int, default=8, help="Columnas del frame alto.")
+    parser.add_argument("--wide-rows", type=int, default=20_000, help="Filas del frame ancho.")
+    parser.add_argument("--wide-cols", type=int, default=200, help="Columnas del frame ancho.")
+    parser.add_argument("--workers", type=int, default=4, help="Hilos para la variante paralela.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for nombre, rows, cols in (("tall", args.tall_rows, args.tall_cols), ("wide", args.wide_rows, args.wide_cols)):
+        df, schema_df = make_synthetic(rows, cols)
+
+        ref = convert_dataframe_to_sql_schema_legacy(df, schema_df)
+        new = convert_dataframe_to_sql_schema(df, schema_df, max_workers=args.workers)
+        pd.testing.assert_frame_equal(ref, new)
+
+        t_legacy = _time(lambda df=df, s=schema_df: convert_dataframe_to_sql_schema_legacy(df, s), args.repeat)
+        t_plan = _time(lambda df=df, s=schema_df: convert_dataframe_to_sql_schema(df, s), args.repeat)
+        t_par = _time(
+            lambda df=df, s=schema_df: convert_dataframe_to_sql_schema(df, s, max_workers=args.workers), args.repeat
+        )
+
+        print(f"📊 {nombre}: shape={df.shape}")
+        print(f"   legacy:             {t_legacy:8.3f}s")
+        print(f"   plan (1 hilo):      {t_plan:8.3f}s  x{t_legacy / t_plan:.2f}")
+        print(f"   plan ({args.workers} hilos):     {t_par:8.3f}s  x{t_legacy / t_par:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import tempfile
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+
+from bench_convert import make_synthetic
+from excel_to_sql.bulk import BulkConfig, load_bulk_config_from_env
+from excel_to_sql.convert import convert_dataframe_to_sql_schema
+from excel_to_sql.db.mssql import load_config_from_env, make_engine
+from excel_to_sql.load import LOADERS, upload_dataframe
+
+load_dotenv()
+
+SQLITE_TYPES = {"int": "INTEGER", "bigint": "INTEGER", "bit": "INTEGER", "decimal": "REAL", "float": "REAL"}
+
+
+def _sqlite_engine(path: Path, schema_df):
+    engine = create_engine(f"sqlite:///{path}")
+    cols = ", ".join(f"[{r.COLUMN_NAME}] {SQLITE_TYPES.get(r.DATA_TYPE, 'TEXT')}" for r in schema_df.itertuples())
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE TABLE BENCH_CARGA ({cols})"))
+    return engine
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark de loaders (executemany vs bulk) contra SQLite o SQL Server.")
+    parser.add_argument("--target", choices=["sqlite", "mssql"], default="sqlite", help="sqlite = sustituto local (CI).")
+    parser.add_argument("--schema", default="main", help="Schema destino (mssql: tabla debe existir).")
+    parser.add_argument("--table", default="BENCH_CARGA", help="Tabla destino (mssql: debe existir y estar vacía).")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--cols", type=int, default=8)
+    parser.add_argument("--chunksize", type=int, default=1000, help="Batch size de executemany.")
+    parser.add_argument("--batch-rows", type=int, default=50_000, help="Filas por archivo en bulk.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1], help="Conexiones paralelas a staging (ej. 1 4).")
+    parser.add_argument("--loaders", nargs="+", choices=LOADERS, default=list(LOADERS))
+    args = parser.parse_args()
+
+    df, schema_df = make_synthetic(args.rows, args.cols)
+    df_conv = convert_dataframe_to_sql_schema(df, schema_df)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        if args.target == "sqlite":
+            engine = _sqlite_engine(tmp / "bench.db", schema_df)
+            schema, table = "main", "BENCH_CARGA"
+            bulk = BulkConfig(local_dir=tmp / "bulk", batch_rows=args.batch_rows)
+        else:
+            engine = make_engine(load_config_from_env())
+            schema, table = args.schema, args.table
+            bulk = load_bulk_config_from_env()
+            bulk.batch_rows = args.batch_rows
+
+        print(f"📊 target={args.target} | shape={df_conv.shape}")
+        for loader in args.loaders:
+            for workers in args.workers:
+                t0 = time.perf_counter()
+                res = upload_dataframe(
+                    engine,
+                    df_conv,
+                    schema=schema,
+                    table=table,
+                    chunksize=args.chunksize,
+                    truncate_destination=True,
+                    loader=loader,
+                    bulk=bulk,
+                    workers=workers,
+                )
+                dt = time.perf_counter() - t0
+                print(f"   {loader:<12} workers={workers:<3} {dt:8.3f}s  {res.rows_inserted / dt:12,.0f} filas/s  lotes={res.batch_rows}")
+                for p in res.partitions:
+                    print(f"      worker {p.worker}: {p.rows:,} filas  {p.rows_per_s:12,.0f} filas/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import fnmatch
+import glob
+import json
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from .convert import compile_conversion_plan, convert_with_plan
+from .io import list_sheets, load_table
+
+EXTENSIONS = (".xlsx", ".xlsm", ".csv", ".parquet")
+
+
+@dataclass(frozen=True)
+class BatchItem:
+    path: str
+    sheet: str
+    size: int
+    mtime_ns: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.path}::{self.sheet}::{self.size}::{self.mtime_ns}"
+
+
+@dataclass
+class BatchItemResult:
+    path: str
+    sheet: str
+    size: int
+    mtime_ns: int
+    status: str  # "ok" | "error"
+    rows: int = 0
+    rows_loaded: int = 0
+    parse_seconds: float = 0.0
+    load_seconds: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class BatchSummary:
+    total: int
+    skipped: int
+    ok: int
+    failed: int
+    rows_loaded: int
+
+
+def _is_supported(p: Path) -> bool:
+    name = p.name.lower()
+    return p.is_file() and not p.name.startswith("~$") and (name.endswith(EXTENSIONS) or name.endswith(".csv.gz"))
+
+
+def discover_inputs(source: str, sheet_pattern: str = "*") -> List[BatchItem]:
+    """
+    Expande una carpeta o un glob en (archivo, hoja). Para Excel se filtran hojas con `sheet_pattern`
+    (fnmatch); CSV/Parquet no tienen hoja.
+    """
+    src = Path(source)
+    if src.is_dir():
+        files = sorted(p for p in src.iterdir() if _is_supported(p))
+    else:
+        files = sorted(Path(p) for p in glob.glob(source, recursive=True) if _is_supported(Path(p)))
+
+    items: List[BatchItem] = []
+    for p in files:
+        st = p.stat()
+        if p.suffix.lower() in (".xlsx", ".xlsm"):
+            sheets = [s for s in list_sheets(str(p)) if fnmatch.fnmatchcase(s, sheet_pattern)]
+        else:
+            sheets = [""]
+        for sh in sheets:
+            items.append(BatchItem(path=str(p.resolve()), sheet=sh, size=st.st_size, mtime_ns=st.st_mtime_ns))
+    return items
+
+
+class BatchLedger:
+    """Bitácora JSON-lines por (archivo, hoja, tamaño, mtime). Una re-ejecución salta los que quedaron "ok"."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._done: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            for line in self.path.read_text(encoding="utf-8").splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # línea truncada por un corte
+                item = BatchItem(rec["path"], rec["sheet"], int(rec["size"]), int(rec["mtime_ns"]))
+                if rec.get("status") == "ok":
+                    self._done[item.key] = rec
+                else:
+                    self._done.pop(item.key, None)
+
+    def is_done(self, item: BatchItem) -> bool:
+        return item.key in self._done
+
+    def record(self, res: BatchItemResult) -> None:
+        rec = asdict(res)
+        rec["ts"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            if res.status == "ok":
+                self._done[BatchItem(res.path, res.sheet, res.size, res.mtime_ns).key] = rec
+
+
+def _parse_one(path: str, sheet: str, schema_records: list, strict: bool, backend: str = "numpy") -> Tuple[pd.DataFrame, float]:
+    """Corre en el pool de procesos: lee + convierte un archivo/hoja."""
+    t0 = time.perf_counter()
+    plan = compile_conversion_plan(pd.DataFrame(schema_records), backend=backend)
+    raw = load_table(path, sheet=sheet or None, dtype_backend="pyarrow" if backend == "pyarrow" else None)
+    df = convert_with_plan(raw, plan, strict=strict)
+    return df, time.perf_counter() - t0
+
+
+def _iter_parsed(
+    items: List[BatchItem],
+    schema_df: pd.DataFrame,
+    *,
+    strict: bool,
+    parse_workers: int,
+    backend: str = "numpy",
+) -> Iterator[Tuple[BatchItem, Optional[pd.DataFrame], float, Optional[BaseException]]]:
+    """Parsea en un ProcessPoolExecutor con ventana acotada (no más de 2*workers resultados en memoria)."""
+    records = schema_df.to_dict("records")
+    window = max(parse_workers, 1) * 2
+    pending = list(reversed(items))
+    in_flight: Dict[Future, BatchItem] = {}
+
+    with ProcessPoolExecutor(max_workers=max(parse_workers, 1)) as ex:
+        while pending or in_flight:
+            while pending and len(in_flight) < window:
+                it = pending.pop()
+                in_flight[ex.submit(_parse_one, it.path, it.sheet, records, strict, backend)] = it
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                it = in_flight.pop(fut)
+                try:
+                    df, secs = fut.result()
+                    yield it, df, secs, None
+                except Exception as e:  # noqa: BLE001
+                    yield it, None, 0.0, e
+
+
+def run_batch(
+    items: List[BatchItem],
+    schema_df: pd.DataFrame,
+    load_fn: Callable[[pd.DataFrame], int],
+    ledger: BatchLedger,
+    *,
+    strict: bool = True,
+    parse_workers: int = 2,
+    backend: str = "numpy",
+    on_result: Optional[Callable[[BatchItemResult], None]] = None,
+) -> BatchSummary:
+    """
+    Procesa muchos archivos con un solo engine/esquema:
+
+    - los archivos se leen y convierten en un pool de procesos (`parse_workers`)
+    - un hilo cargador toma los DataFrames convertidos de una cola acotada y llama `load_fn(df)`
+      (una transacción por archivo); devuelve filas cargadas
+    - cada resultado queda en el ledger; los ya "ok" se saltan en la siguiente corrida
+    - si el hilo cargador falla fuera de `load_fn` (ej. el ledger no se puede escribir), la cola se sigue vaciando
+      para no bloquear al productor y el error se relanza acá al terminar
+    """
+    todo = [it for it in items if not ledger.is_done(it)]
+    skipped = len(items) - len(todo)
+    results: List[BatchItemResult] = []
+    q: "queue.Queue[Optional[Tuple[BatchItem, pd.DataFrame, float]]]" = queue.Queue(maxsize=max(parse_workers, 1))
+
+    def _finish(res: BatchItemResult) -> None:
+        ledger.record(res)
+        results.append(res)
+        if on_result:
+            on_result(res)
+
+    def _load(it: BatchItem, df: pd.DataFrame, parse_s: float) -> None:
+        t0 = time.perf_counter()
+        try:
+            n = load_fn(df)
+            _finish(BatchItemResult(it.path, it.sheet, it.size, it.mtime_ns, "ok", rows=len(df), rows_loaded=int(n),
+                                    parse_seconds=parse_s, load_seconds=time.perf_counter() - t0))
+        except Exception as e:  # noqa: BLE001
+            _finish(BatchItemResult(it.path, it.sheet, it.size, it.mtime_ns, "error", rows=len(df),
+                                    parse_seconds=parse_s, load_seconds=time.perf_counter() - t0,
+                                    error=f"{type(e).__name__}: {e}"))
+
+    loader_error: List[BaseException] = []
+
+    def _loader() -> None:
+        while True:
+            msg = q.get()
+            if msg is None:
+                return
+            if loader_error:
+                continue  # ya falló: solo vacía la cola para que el productor no quede bloqueado en q.put
+            try:
+                _load(*msg)
+            except BaseException as e:  # noqa: BLE001
+                loader_error.append(e)
+
+    th = threading.Thread(target=_loader, name="batch-loader", daemon=True)
+    th.start()
+    try:
+        for it, df, parse_s, err in _iter_parsed(todo, schema_df, strict=strict, parse_workers=parse_workers, backend=backend):
+            if loader_error:
+                break
+            if err is not None:
+                _finish(BatchItemResult(it.path, it.sheet, it.size, it.mtime_ns, "error", error=f"{type(err).__name__}: {err}"))
+                continue
+            q.put((it, df, parse_s))
+    finally:
+        q.put(None)
+        th.join()
+    if loader_error:
+        raise loader_error[0]
+
+    ok = sum(1 for r in results if r.status == "ok")
+    return BatchSummary(
+        total=len(items),
+        skipped=skipped,
+        ok=ok,
+        failed=len(results) - ok,
+        rows_loaded=sum(r.rows_loaded for r in results),
+    )
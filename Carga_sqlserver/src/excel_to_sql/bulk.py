@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import os
+import re
+import uuid
+from dataclasses import dataclass
+from pathlib import Path, PureWindowsPath, PurePosixPath
+from typing import List, Optional
+
+import pandas as pd
+from sqlalchemy import text
+
+
+@dataclass
+class BulkConfig:
+    # carpeta donde el cliente escribe los archivos de carga
+    local_dir: Path = Path("outputs/bulk")
+    # la misma carpeta vista desde SQL Server (ej. UNC \\servidor\carga); None = local_dir
+    server_dir: Optional[str] = None
+    batch_rows: int = 100_000
+    keep_files: bool = False
+
+
+def load_bulk_config_from_env() -> BulkConfig:
+    return BulkConfig(
+        local_dir=Path(os.environ.get("BULK_DIR", "outputs/bulk")),
+        server_dir=os.environ.get("BULK_SERVER_DIR") or None,
+        batch_rows=int(os.environ.get("BULK_BATCH_ROWS", "100000")),
+        keep_files=os.environ.get("BULK_KEEP_FILES", "no").lower() in {"1","true","yes","y"},
+    )
+
+
+def _server_path(cfg: BulkConfig, file_name: str) -> str:
+    if not cfg.server_dir:
+        return str((cfg.local_dir / file_name).resolve())
+    base = cfg.server_dir
+    pure = PureWindowsPath if ("\\" in base or ":" in base) else PurePosixPath
+    return str(pure(base) / file_name)
+
+
+def to_bulk_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Formatea columnas para CSV de carga (fechas ISO con milisegundos: válido para datetime y datetime2)."""
+    out = {}
+    for c in df.columns:
+        s = df[c]
+        if pd.api.types.is_datetime64_any_dtype(s):
+            s = s.dt.strftime("%Y-%m-%d %H:%M:%S.%f").str[:-3]
+        out[c] = s
+    return pd.DataFrame(out, columns=df.columns)
+
+
+def _is_arrow_frame(df: pd.DataFrame) -> bool:
+    return len(df.columns) > 0 and all(isinstance(t, pd.ArrowDtype) for t in df.dtypes)
+
+
+def _csv_column(s: pd.Series) -> pd.Series:
+    """Texto CSV de una columna: números/booleanos sin comillas, texto siempre entre comillas, NULL = campo vacío.
+
+    Así `''` se escribe `""` y NULL queda vacío sin comillas (igual que el writer CSV de Arrow).
+    """
+    na = s.isna().to_numpy()
+    if pd.api.types.is_numeric_dtype(s) or pd.api.types.is_bool_dtype(s):
+        txt = s.astype(object).astype(str)
+    else:
+        txt = '"' + s.astype(object).astype(str).str.replace('"', '""', regex=False) + '"'
+    return txt.mask(na, "")
+
+
+def write_batch_file(df: pd.DataFrame, path: Path) -> None:
+    # CSV RFC 4180 sin encabezado; NULL = campo vacío sin comillas, texto vacío = ""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if _is_arrow_frame(df):
+        # backend pyarrow: los buffers Arrow van directo al writer CSV de Arrow (sin pasar por objetos Python)
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pacsv.write_csv(table, str(path), write_options=pacsv.WriteOptions(include_header=False))
+        return
+    if df.empty:
+        path.write_text("", encoding="utf-8")
+        return
+    frame = to_bulk_frame(df)
+    cols = [_csv_column(frame[c]).reset_index(drop=True) for c in frame.columns]
+    lines = cols[0].str.cat(cols[1:], sep=",") if len(cols) > 1 else cols[0]
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        fh.write("\n".join(lines.tolist()))
+        fh.write("\n")
+
+
+# campo CSV: entre comillas ("" escapa una comilla) o suelto
+_CSV_FIELD = re.compile(r'"((?:[^"]|"")*)"|([^,\n"]*)')
+
+
+def read_batch_file(text_: str) -> List[tuple]:
+    """Lee un archivo de `write_batch_file` con la misma regla que BULK INSERT: vacío sin comillas = NULL, "" = ''."""
+    rows: List[tuple] = []
+    row: list = []
+    pos, n = 0, len(text_)
+    while pos < n:
+        m = _CSV_FIELD.match(text_, pos)
+        quoted, bare = m.group(1), m.group(2)
+        row.append(quoted.replace('""', '"') if quoted is not None else (bare if bare != "" else None))
+        pos = m.end()
+        if pos >= n:
+            rows.append(tuple(row))
+            break
+        sep = text_[pos]
+        pos += 1
+        if sep == "\n":
+            rows.append(tuple(row))
+            row = []
+        elif sep != ",":
+            raise ValueError(f"CSV de carga mal formado en la posición {pos}")
+    return rows
+
+
+def bulk_insert_file(conn, stg_full: str, local_path: Path, server_path: str) -> int:
+    """Carga un archivo a la staging con el mecanismo nativo del motor. Devuelve filas cargadas."""
+    if conn.dialect.name == "mssql":
+        res = conn.execute(text(f"""BULK INSERT {stg_full}
+FROM '{server_path.replace("'", "''")}'
+WITH (FORMAT = 'CSV', CODEPAGE = '65001', FIELDTERMINATOR = ',', ROWTERMINATOR = '0x0a',
+      FIELDQUOTE = '"', KEEPNULLS, TABLOCK);
+"""))
+        return int(res.rowcount or 0)
+
+    # Sustituto local (SQLite/DuckDB/...): lee el mismo archivo y hace executemany sobre la DBAPI
+    with open(local_path, newline="", encoding="utf-8") as fh:
+        rows = read_batch_file(fh.read())
+    if not rows:
+        return 0
+    marks = ", ".join("?" for _ in rows[0])
+    conn.exec_driver_sql(f"INSERT INTO {stg_full} VALUES ({marks})", rows)
+    return len(rows)
+
+
+def bulk_load_dataframe(conn, df: pd.DataFrame, stg_full: str, cfg: BulkConfig) -> List[int]:
+    """
+    Serializa df a archivos CSV de `batch_rows` filas y los carga a la staging (un BULK INSERT por lote).
+
+    Devuelve las filas cargadas por lote.
+    """
+    batch_rows = max(int(cfg.batch_rows), 1)
+    counts: List[int] = []
+    run_id = uuid.uuid4().hex[:8]
+
+    for i, start in enumerate(range(0, len(df), batch_rows)):
+        name = f"bulk_{run_id}_{i:05d}.csv"
+        local_path = cfg.local_dir / name
+        write_batch_file(df.iloc[start:start + batch_rows], local_path)
+        try:
+            counts.append(bulk_insert_file(conn, stg_full, local_path, _server_path(cfg, name)))
+        finally:
+            if not cfg.keep_files:
+                local_path.unlink(missing_ok=True)
+
+    return counts
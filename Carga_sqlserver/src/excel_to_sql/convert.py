@@ -1,8 +1,18 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
 import pandas as pd
 
 
+INT_TYPES = ("int","bigint","smallint","tinyint")
+FLOAT_TYPES = ("decimal","numeric","float","real","money","smallmoney")
+DATE_TYPES = ("date","datetime","datetime2","smalldatetime","datetimeoffset","time")
+
+
 def _map_bit(x):
     if pd.isna(x):
         return None
@@ -14,13 +24,277 @@ def _map_bit(x):
     return None
 
 
-def convert_dataframe_to_sql_schema(df_in: pd.DataFrame, schema_df: pd.DataFrame, *, strict: bool = True) -> pd.DataFrame:
+def _to_int(serie: pd.Series) -> pd.Series:
+    return pd.to_numeric(serie, errors="coerce").astype("Int64")
+
+
+def _to_float(serie: pd.Series) -> pd.Series:
+    return pd.to_numeric(serie, errors="coerce")
+
+
+def _to_datetime(serie: pd.Series) -> pd.Series:
+    return pd.to_datetime(serie, errors="coerce")
+
+
+def _to_bit(serie: pd.Series) -> pd.Series:
+    # _map_bit solo sobre valores únicos (pocos) y luego take vectorizado
+    codes, uniques = pd.factorize(serie, use_na_sentinel=True)
+    lut = np.array([_map_bit(u) for u in uniques] + [None], dtype=object)  # código -1 → None
+    return pd.Series(lut[codes], index=serie.index).astype("Int64")
+
+
+def _make_text(max_len: Optional[int]) -> Callable[[pd.Series], pd.Series]:
+    def _to_text(serie: pd.Series) -> pd.Series:
+        serie_new = serie.astype("string")
+        if max_len:
+            serie_new = serie_new.str.slice(0, max_len)
+        return serie_new
+    return _to_text
+
+
+# ---- backend "pyarrow": pd.ArrowDtype con el tipo más angosto que admite la columna SQL ----
+
+ARROW_INT_TYPES = {"tinyint": "uint8", "smallint": "int16", "int": "int32", "bigint": "int64"}
+BACKENDS = ("numpy", "pyarrow")
+
+
+def _pa():
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError as e:  # pragma: no cover
+        raise ImportError("El backend 'pyarrow' requiere pyarrow (pip install pyarrow).") from e
+    return pa, pc
+
+
+def _arrow_cast_fast(serie: pd.Series, pa_type) -> Optional[pd.Series]:
+    """Si la entrada ya es Arrow (CSV/Excel leído con dtype_backend='pyarrow'), intenta pc.cast directo."""
+    if not isinstance(serie.dtype, pd.ArrowDtype):
+        return None
+    pa, pc = _pa()
+    try:
+        arr = pc.cast(pa.array(serie.array), pa_type)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return None  # valores sucios: ruta con coerción de pandas
+    return pd.Series(pd.arrays.ArrowExtensionArray(arr), index=serie.index)
+
+
+def _make_arrow_int(tipo: str) -> Callable[[pd.Series], pd.Series]:
+    def _to_arrow_int(serie: pd.Series) -> pd.Series:
+        pa, _ = _pa()
+        pa_type = getattr(pa, ARROW_INT_TYPES[tipo])()
+        fast = _arrow_cast_fast(serie, pa_type)
+        if fast is not None:
+            return fast
+        return _to_int(serie).astype(pd.ArrowDtype(pa_type))
+    return _to_arrow_int
+
+
+def _to_arrow_float(serie: pd.Series) -> pd.Series:
+    pa, _ = _pa()
+    fast = _arrow_cast_fast(serie, pa.float64())
+    if fast is not None:
+        return fast
+    return _to_float(serie).astype(pd.ArrowDtype(pa.float64()))
+
+
+def _to_arrow_datetime(serie: pd.Series) -> pd.Series:
+    # ms: precisión de datetime en SQL Server y formato que acepta BULK INSERT
+    pa, _ = _pa()
+    if isinstance(serie.dtype, pd.ArrowDtype) and getattr(serie.dtype.pyarrow_dtype, "tz", None) is None:
+        fast = _arrow_cast_fast(serie, pa.timestamp("ms"))
+        if fast is not None:
+            return fast
+    out = _to_datetime(serie)
+    if isinstance(out.dtype, pd.DatetimeTZDtype):
+        # datetime de SQL Server no guarda zona horaria: se normaliza a UTC y se quita la zona
+        out = out.dt.tz_convert(None)
+    return out.astype("datetime64[ms]").astype(pd.ArrowDtype(pa.timestamp("ms")))
+
+
+def _to_arrow_bit(serie: pd.Series) -> pd.Series:
+    pa, _ = _pa()
+    return _to_bit(serie).astype(pd.ArrowDtype(pa.uint8()))
+
+
+def _make_arrow_text(max_len: Optional[int]) -> Callable[[pd.Series], pd.Series]:
+    def _to_arrow_text(serie: pd.Series) -> pd.Series:
+        pa, pc = _pa()
+        if isinstance(serie.dtype, pd.ArrowDtype) and pa.types.is_string(serie.dtype.pyarrow_dtype):
+            arr = pa.array(serie.array)
+        else:
+            # mismo texto que el backend numpy (astype("string") = str(x))
+            arr = pa.array(serie.astype("string").array, type=pa.string())
+        if max_len:
+            arr = pc.utf8_slice_codeunits(arr, 0, max_len)
+        return pd.Series(pd.arrays.ArrowExtensionArray(arr), index=serie.index)
+    return _to_arrow_text
+
+
+@dataclass(frozen=True)
+class ColumnPlan:
+    column: str
+    tipo: str
+    max_len: Optional[int]
+    not_null: bool
+    convert: Callable[[pd.Series], pd.Series]
+
+
+@dataclass(frozen=True)
+class ConversionPlan:
+    columns: Tuple[ColumnPlan, ...]
+    sql_cols: Tuple[str, ...]
+    sql_map: Dict[str, str]
+
+
+def compile_conversion_plan(schema_df: pd.DataFrame, *, backend: str = "numpy") -> ConversionPlan:
+    """
+    Compila las filas de INFORMATION_SCHEMA.COLUMNS en un plan de conversión por columna.
+
+    Se hace una sola vez por tabla; el plan se puede reutilizar para varios DataFrames/chunks.
+
+    backend:
+    - "numpy": Int64 / float64 / datetime64 / string (comportamiento original)
+    - "pyarrow": pd.ArrowDtype (uint8/int16/int32/int64, float64, timestamp[ms], uint8 para bit, string)
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend debe ser uno de {BACKENDS}")
+    arrow = backend == "pyarrow"
+    if arrow:
+        _pa()
+
+    cols: List[ColumnPlan] = []
+    for rec in schema_df.to_dict("records"):
+        col = rec["COLUMN_NAME"]
+        tipo = str(rec["DATA_TYPE"]).lower()
+        max_len = rec.get("CHARACTER_MAXIMUM_LENGTH")
+        max_len = int(max_len) if max_len is not None and pd.notna(max_len) and int(max_len) > 0 else None
+        not_null = str(rec.get("IS_NULLABLE", "YES")).upper() == "NO"
+
+        if tipo in INT_TYPES:
+            fn = _make_arrow_int(tipo) if arrow else _to_int
+        elif tipo in FLOAT_TYPES:
+            fn = _to_arrow_float if arrow else _to_float
+        elif tipo in DATE_TYPES:
+            fn = _to_arrow_datetime if arrow else _to_datetime
+        elif tipo == "bit":
+            fn = _to_arrow_bit if arrow else _to_bit
+        else:
+            # texto / otros
+            fn = _make_arrow_text(max_len) if arrow else _make_text(max_len)
+
+        cols.append(ColumnPlan(column=col, tipo=tipo, max_len=max_len, not_null=not_null, convert=fn))
+
+    sql_cols = tuple(c.column for c in cols)
+    return ConversionPlan(columns=tuple(cols), sql_cols=sql_cols, sql_map={c.lower(): c for c in sql_cols})
+
+
+def _resolve_columns(df_in: pd.DataFrame, plan: ConversionPlan) -> Dict[str, object]:
+    """Devuelve {COLUMN_NAME sql → columna original del DF} (case-insensitive)."""
+    source: Dict[str, object] = {}
+    for c in df_in.columns:
+        key = str(c).strip().lower()
+        if key in plan.sql_map:
+            source[plan.sql_map[key]] = c
+
+    faltantes = set(plan.sql_cols) - set(source)
+    if faltantes:
+        raise ValueError(f"El Excel/DF NO tiene columnas requeridas por {faltantes}")
+    return source
+
+
+def _run_column(cp: ColumnPlan, serie: pd.Series, strict: bool) -> Tuple[Optional[pd.Series], Optional[str]]:
+    try:
+        serie_new = cp.convert(serie)
+
+        # Validación no-null (si existía valor "real" y quedó nulo).
+        # Solo se stringifican los candidatos (nulo en salida y no-nulo en entrada), no toda la serie.
+        if strict and cp.not_null:
+            cand = serie_new.isna().to_numpy(dtype=bool) & serie.notna().to_numpy(dtype=bool)
+            if cand.any():
+                sub = serie[cand]
+                n = int((sub.astype(str).str.strip() != "").sum())
+                if n:
+                    return serie_new, f"Columna '{cp.column}' ({cp.tipo}) tiene {n} valores no convertibles y NO admite NULL."
+
+        return serie_new, None
+
+    except Exception as e:
+        return None, f"Error convirtiendo '{cp.column}' ({cp.tipo}): {e}"
+
+
+def convert_with_plan(
+    df_in: pd.DataFrame,
+    plan: ConversionPlan,
+    *,
+    strict: bool = True,
+    max_workers: int = 1,
+) -> pd.DataFrame:
+    """
+    Aplica un ConversionPlan a df_in sin copiar el DataFrame completo.
+
+    - Cada columna se convierte una vez y el resultado se arma directamente en el orden de SQL.
+    - max_workers > 1 reparte las columnas en un ThreadPoolExecutor.
+    """
+    source = _resolve_columns(df_in, plan)
+    tasks = [(cp, df_in[source[cp.column]]) for cp in plan.columns]
+
+    if max_workers and max_workers > 1 and len(tasks) > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            results = list(ex.map(lambda t: _run_column(t[0], t[1], strict), tasks))
+    else:
+        results = [_run_column(cp, serie, strict) for cp, serie in tasks]
+
+    # errores en el orden del esquema (mismo reporte que la versión secuencial)
+    errores = [err for _, err in results if err]
+    if errores:
+        msg = "Errores de conversión:\n- " + "\n- ".join(errores)
+        raise ValueError(msg)
+
+    data = {cp.column: serie_new for (cp, _), (serie_new, _) in zip(tasks, results)}
+    return pd.DataFrame(data, columns=list(plan.sql_cols))
+
+
+def convert_dataframe_to_sql_schema(
+    df_in: pd.DataFrame,
+    schema_df: pd.DataFrame,
+    *,
+    strict: bool = True,
+    max_workers: int = 1,
+    backend: str = "numpy",
+) -> pd.DataFrame:
     """
     Convierte df_in a los tipos que espera SQL Server según INFORMATION_SCHEMA.COLUMNS.
 
     - Normaliza nombres de columnas (case-insensitive) contra COLUMN_NAME.
     - Elimina columnas extra que no estén en la tabla.
     - Valida no-nullables: si había valor y quedó NULL por conversión, falla si strict=True.
+    - max_workers > 1 convierte columnas en paralelo (hilos).
+    - backend="pyarrow" produce columnas pd.ArrowDtype (ver compile_conversion_plan).
+    """
+    plan = compile_conversion_plan(schema_df, backend=backend)
+    return convert_with_plan(df_in, plan, strict=strict, max_workers=max_workers)
+
+
+def convert_chunks(
+    chunks: Iterable[pd.DataFrame],
+    schema_df: pd.DataFrame,
+    *,
+    strict: bool = True,
+    max_workers: int = 1,
+    backend: str = "numpy",
+) -> Iterator[pd.DataFrame]:
+    """Convierte un iterable de chunks compilando el plan una sola vez (ver io.iter_chunks)."""
+    plan = compile_conversion_plan(schema_df, backend=backend)
+    for chunk in chunks:
+        yield convert_with_plan(chunk, plan, strict=strict, max_workers=max_workers)
+
+
+def convert_dataframe_to_sql_schema_legacy(df_in: pd.DataFrame, schema_df: pd.DataFrame, *, strict: bool = True) -> pd.DataFrame:
+    """
+    Implementación original fila-a-fila (iterrows + copias completas).
+
+    Se conserva como referencia para benchmarks y pruebas de regresión.
     """
 
     # 1) Normalizar nombres (case-insensitive)
@@ -60,13 +334,13 @@ def convert_dataframe_to_sql_schema(df_in: pd.DataFrame, schema_df: pd.DataFrame
         serie = out[col]
 
         try:
-            if tipo in ("int","bigint","smallint","tinyint"):
+            if tipo in INT_TYPES:
                 serie_new = pd.to_numeric(serie, errors="coerce").astype("Int64")
 
-            elif tipo in ("decimal","numeric","float","real","money","smallmoney"):
+            elif tipo in FLOAT_TYPES:
                 serie_new = pd.to_numeric(serie, errors="coerce")
 
-            elif tipo in ("date","datetime","datetime2","smalldatetime","datetimeoffset","time"):
+            elif tipo in DATE_TYPES:
                 serie_new = pd.to_datetime(serie, errors="coerce")
 
             elif tipo == "bit":
@@ -29,7 +29,7 @@ def load_config_from_env() -> MSSQLConfig:
     )
 
 
-def make_engine(cfg: MSSQLConfig):
+def make_engine(cfg: MSSQLConfig, *, pool_size: int = 5):
     if not cfg.server or not cfg.database:
         raise ValueError("Faltan SQL_SERVER y/o SQL_DB en el .env")
 
@@ -52,7 +52,7 @@ def make_engine(cfg: MSSQLConfig):
             f"TrustServerCertificate=yes;"
         )
 
-    engine = create_engine(f"mssql+pyodbc:///?odbc_connect={params}", pool_pre_ping=True)
+    engine = create_engine(f"mssql+pyodbc:///?odbc_connect={params}", pool_pre_ping=True, pool_size=pool_size)
 
     # Acelera inserts (pyodbc)
     @event.listens_for(engine, "before_cursor_execute")
@@ -1,11 +1,142 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Iterator, List, Optional
+
 import pandas as pd
 
 
-def load_excel(path: str, sheet: str = "Sheet1") -> pd.DataFrame:
+def _backend_kwargs(dtype_backend: Optional[str]) -> dict:
+    # dtype_backend="pyarrow": columnas pd.ArrowDtype desde la lectura (pandas >= 2.0)
+    return {"dtype_backend": dtype_backend} if dtype_backend == "pyarrow" else {}
+
+
+def load_excel(path: str, sheet: str = "Sheet1", *, dtype_backend: Optional[str] = None) -> pd.DataFrame:
+    p = Path(path)
+    if not p.exists():
+        raise FileNotFoundError(f"No existe el archivo: {p}")
+    return pd.read_excel(p, sheet_name=sheet, **_backend_kwargs(dtype_backend))
+
+
+def load_table(path: str, sheet: Optional[str] = "Sheet1", *, dtype_backend: Optional[str] = None) -> pd.DataFrame:
+    """Lee un archivo completo según su extensión (.xlsx/.xlsm, .csv/.csv.gz, .parquet)."""
+    p = Path(path)
+    if not p.exists():
+        raise FileNotFoundError(f"No existe el archivo: {p}")
+    suffixes = [s.lower() for s in p.suffixes]
+    if ".csv" in suffixes:
+        if dtype_backend == "pyarrow":
+            # parser multihilo de Arrow, directo a columnas Arrow
+            return pd.read_csv(p, engine="pyarrow", dtype_backend="pyarrow")
+        return pd.read_csv(p)
+    if suffixes and suffixes[-1] == ".parquet":
+        return pd.read_parquet(p, **_backend_kwargs(dtype_backend))
+    return load_excel(path, sheet=sheet or "Sheet1", dtype_backend=dtype_backend)
+
+
+def list_sheets(path: str) -> List[str]:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(Path(path), read_only=True)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+def _header(p: Path, sheet: str) -> list:
+    """Encabezados exactamente como los deja read_excel: duplicados "A", "A.1", numéricos sin pasar a str,
+    vacíos como "Unnamed: i". `nrows=0` solo lee la primera fila."""
+    return list(pd.read_excel(p, sheet_name=sheet, nrows=0).columns)
+
+
+def _frame(rows: List[tuple], cols: list, dtype_backend: Optional[str]) -> pd.DataFrame:
+    df = pd.DataFrame.from_records(rows, columns=cols)
+    # bloque de celdas vacías (p.ej. una racha de filas en blanco): NaN como read_excel, no None
+    vacias = [i for i in range(df.shape[1]) if df.iloc[:, i].isna().all()]
+    for i in vacias:
+        df.isetitem(i, df.iloc[:, i].astype("float64"))
+    if dtype_backend == "pyarrow":
+        df = df.convert_dtypes(dtype_backend="pyarrow")
+    return df
+
+
+def _iter_excel_chunks(p: Path, sheet: str, chunksize: int, dtype_backend: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(p, read_only=True, data_only=True)
+    try:
+        if sheet not in wb.sheetnames:
+            raise ValueError(f"La hoja '{sheet}' no existe en {p}. Hojas: {wb.sheetnames}")
+        rows = wb[sheet].iter_rows(values_only=True)
+
+        first = next(rows, None)
+        if first is None:
+            return
+        cols = _header(p, sheet)
+        width = len(cols)
+
+        buf: List[tuple] = []
+        pending_empty = 0  # filas vacías: solo se emiten si después viene una fila con datos (igual que read_excel)
+        for r in rows:
+            r = tuple(r[:width]) + (None,) * (width - len(r))
+            if all(v is None for v in r):
+                pending_empty += 1
+                continue
+            if pending_empty:
+                buf.extend([(None,) * width] * pending_empty)
+                pending_empty = 0
+            buf.append(r)
+            while len(buf) >= chunksize:  # una racha de filas vacías puede sumar más de un bloque
+                yield _frame(buf[:chunksize], cols, dtype_backend)
+                buf = buf[chunksize:]
+
+        if buf:
+            yield _frame(buf, cols, dtype_backend)
+    finally:
+        wb.close()
+
+
+def _iter_parquet_chunks(p: Path, chunksize: int, dtype_backend: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:  # pragma: no cover
+        raise ImportError("Para leer Parquet instala pyarrow (pip install pyarrow).") from e
+
+    pf = pq.ParquetFile(p)
+    for batch in pf.iter_batches(batch_size=chunksize):
+        yield batch.to_pandas(types_mapper=pd.ArrowDtype) if dtype_backend == "pyarrow" else batch.to_pandas()
+
+
+def iter_chunks(
+    path: str,
+    sheet: Optional[str] = "Sheet1",
+    chunksize: int = 100_000,
+    *,
+    dtype_backend: Optional[str] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Lee el archivo por bloques de `chunksize` filas (memoria acotada por el chunk, no por el archivo).
+
+    - .xlsx/.xlsm: openpyxl en modo read_only (valores ya tipados: int/float/datetime/str)
+    - .csv / .csv.gz: pd.read_csv(chunksize=...)
+    - .parquet: pyarrow iter_batches
+
+    dtype_backend="pyarrow" entrega columnas pd.ArrowDtype.
+    """
     p = Path(path)
     if not p.exists():
         raise FileNotFoundError(f"No existe el archivo: {p}")
-    return pd.read_excel(p, sheet_name=sheet)
+    if chunksize <= 0:
+        raise ValueError("chunksize debe ser > 0")
+
+    suffixes = [s.lower() for s in p.suffixes]
+    if suffixes and suffixes[-1] in (".xlsx", ".xlsm"):
+        yield from _iter_excel_chunks(p, sheet or "Sheet1", chunksize, dtype_backend)
+    elif ".csv" in suffixes:
+        with pd.read_csv(p, chunksize=chunksize, **_backend_kwargs(dtype_backend)) as reader:
+            yield from reader
+    elif suffixes and suffixes[-1] == ".parquet":
+        yield from _iter_parquet_chunks(p, chunksize, dtype_backend)
+    else:
+        raise ValueError(f"Formato no soportado para lectura por bloques: {p.name} (usa .xlsx, .csv o .parquet)")
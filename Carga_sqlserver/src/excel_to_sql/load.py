@@ -1,17 +1,39 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
 
 import pandas as pd
 from sqlalchemy import text
 
+from .bulk import BulkConfig, bulk_load_dataframe
+
+LOADERS = ("executemany", "bulk")
+
+
+@dataclass
+class PartitionStat:
+    worker: int
+    staging_table: str
+    chunks: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
 
 @dataclass
 class UploadResult:
     rows_excel: int
     rows_inserted: int
     temp_table: str
+    batch_rows: List[int] = field(default_factory=list)
+    partitions: List[PartitionStat] = field(default_factory=list)
 
 
 def bracket(name: str) -> str:
@@ -26,6 +48,12 @@ def create_staging_like_destination(conn, schema: str, table: str, staging_table
     dest = fq(schema, table)
     stg = fq(schema, staging_table)
 
+    if conn.dialect.name != "mssql":
+        # sustituto local (SQLite) para pruebas/benchmarks
+        conn.execute(text(f"DROP TABLE IF EXISTS {stg};"))
+        conn.execute(text(f"CREATE TABLE {stg} AS SELECT * FROM {dest} WHERE 0 = 1;"))
+        return
+
     # Drop staging if exists, then clone structure
     conn.execute(text(f"""IF OBJECT_ID(N'{schema}.{staging_table}', N'U') IS NOT NULL
     DROP TABLE {stg};
@@ -35,6 +63,39 @@ FROM {dest};
 """))
 
 
+def truncate_table(conn, full_name: str):
+    if conn.dialect.name != "mssql":
+        conn.execute(text(f"DELETE FROM {full_name};"))
+        return
+    conn.execute(text(f"TRUNCATE TABLE {full_name};"))
+
+
+def append_to_staging(
+    conn,
+    df: pd.DataFrame,
+    *,
+    schema: str,
+    staging_table: str,
+    chunksize: int = 1000,
+    loader: str = "executemany",
+    bulk: Optional[BulkConfig] = None,
+) -> List[int]:
+    """Agrega df a la staging con el loader elegido. Devuelve filas cargadas por lote."""
+    if loader == "bulk":
+        return bulk_load_dataframe(conn, df, fq(schema, staging_table), bulk or BulkConfig())
+
+    df.to_sql(
+        name=staging_table,
+        con=conn,
+        schema=schema,
+        if_exists="append",
+        index=False,
+        chunksize=chunksize,
+        method=None,  # evita límite 2100 parámetros de method="multi"
+    )
+    return [len(df)]
+
+
 def upload_dataframe(
     engine,
     df: pd.DataFrame,
@@ -44,34 +105,102 @@ def upload_dataframe(
     staging_suffix: str = "_TEMP_CARGA",
     chunksize: int = 1000,
     truncate_destination: bool = False,
+    loader: str = "executemany",
+    bulk: Optional[BulkConfig] = None,
+    workers: int = 1,
 ) -> UploadResult:
+    if workers > 1 and len(df) > 0:
+        # N particiones contiguas, una por worker
+        step = -(-len(df) // workers)
+        chunks = [df.iloc[i:i + step] for i in range(0, len(df), step)]
+    else:
+        chunks = [df]
+    return upload_chunks(
+        engine,
+        chunks,
+        schema=schema,
+        table=table,
+        staging_suffix=staging_suffix,
+        chunksize=chunksize,
+        truncate_destination=truncate_destination,
+        loader=loader,
+        bulk=bulk,
+        workers=workers,
+    )
+
+
+def upload_chunks(
+    engine,
+    chunks: Iterable[pd.DataFrame],
+    *,
+    schema: str,
+    table: str,
+    staging_suffix: str = "_TEMP_CARGA",
+    chunksize: int = 1000,
+    truncate_destination: bool = False,
+    loader: str = "executemany",
+    bulk: Optional[BulkConfig] = None,
+    workers: int = 1,
+) -> UploadResult:
+    """
+    Igual que upload_dataframe, pero consume un iterable de DataFrames (ya convertidos).
+
+    Cada chunk se agrega a la staging y se libera; el pico de memoria depende del tamaño
+    del chunk y no del archivo. Todo ocurre en una sola transacción.
+
+    loader:
+    - "executemany": df.to_sql (fast_executemany en pyodbc)
+    - "bulk": serializa a CSV y carga con BULK INSERT ... WITH (TABLOCK), un archivo por lote
+
+    workers > 1: ver upload_chunks_parallel.
+    """
+    if loader not in LOADERS:
+        raise ValueError(f"loader debe ser uno de {LOADERS}")
+    bulk = bulk or BulkConfig()
+
+    if workers > 1:
+        return upload_chunks_parallel(
+            engine,
+            chunks,
+            schema=schema,
+            table=table,
+            staging_suffix=staging_suffix,
+            chunksize=chunksize,
+            truncate_destination=truncate_destination,
+            loader=loader,
+            bulk=bulk,
+            workers=workers,
+        )
+
     staging_table = f"{table}{staging_suffix}"
     dest_full = fq(schema, table)
     stg_full = fq(schema, staging_table)
 
+    rows_excel = 0
+    cols: Optional[list] = None
+    batch_rows: List[int] = []
+
     with engine.begin() as conn:
         create_staging_like_destination(conn, schema, table, staging_table)
 
-        # Cargar a staging
-        df.to_sql(
-            name=staging_table,
-            con=conn,
-            schema=schema,
-            if_exists="append",
-            index=False,
-            chunksize=chunksize,
-            method=None,  # evita límite 2100 parámetros de method="multi"
-        )
+        # Cargar a staging (chunk a chunk)
+        for df in chunks:
+            if cols is None:
+                cols = df.columns.tolist()
+            rows_excel += len(df)
+            batch_rows.extend(append_to_staging(
+                conn, df, schema=schema, staging_table=staging_table, chunksize=chunksize, loader=loader, bulk=bulk,
+            ))
 
         # (Opcional) truncar destino antes de insertar
         if truncate_destination:
-            conn.execute(text(f"TRUNCATE TABLE {dest_full};"))
+            truncate_table(conn, dest_full)
 
-        cols = [bracket(c) for c in df.columns.tolist()]
-        cols_sql = ", ".join(cols)
+        if cols:
+            cols_sql = ", ".join(bracket(c) for c in cols)
 
-        # Insertar al destino
-        conn.execute(text(f"""INSERT INTO {dest_full} ({cols_sql})
+            # Insertar al destino
+            conn.execute(text(f"""INSERT INTO {dest_full} ({cols_sql})
 SELECT {cols_sql}
 FROM {stg_full};
 """))
@@ -82,4 +211,126 @@ FROM {stg_full};
         # Borrar staging
         conn.execute(text(f"DROP TABLE {stg_full};"))
 
-    return UploadResult(rows_excel=len(df), rows_inserted=int(rows_inserted), temp_table=f"{schema}.{staging_table}")
+    return UploadResult(
+        rows_excel=rows_excel,
+        rows_inserted=int(rows_inserted),
+        temp_table=f"{schema}.{staging_table}",
+        batch_rows=batch_rows,
+    )
+
+
+def upload_chunks_parallel(
+    engine,
+    chunks: Iterable[pd.DataFrame],
+    *,
+    schema: str,
+    table: str,
+    staging_suffix: str = "_TEMP_CARGA",
+    chunksize: int = 1000,
+    truncate_destination: bool = False,
+    loader: str = "executemany",
+    bulk: Optional[BulkConfig] = None,
+    workers: int = 4,
+) -> UploadResult:
+    """
+    Carga a staging en paralelo: `workers` hilos, cada uno con su propia conexión del pool
+    y su propia staging (`<TABLA><suffix>_<i>`). Los chunks se reparten por una cola acotada
+    (a lo sumo `workers` chunks en memoria esperando).
+
+    El destino solo se toca en una única transacción final (TRUNCATE opcional +
+    INSERT ... SELECT desde todas las staging + DROP). Si algo falla, se borran las staging
+    y el destino queda intacto.
+
+    El pool del engine debe admitir `workers` conexiones (pool_size + max_overflow).
+    """
+    dest_full = fq(schema, table)
+    stats = [PartitionStat(worker=i, staging_table=f"{table}{staging_suffix}_{i}") for i in range(workers)]
+    batch_rows: List[List[int]] = [[] for _ in range(workers)]
+    cols: List[Optional[list]] = [None]
+    errors: List[BaseException] = []
+    q: "queue.Queue[Optional[pd.DataFrame]]" = queue.Queue(maxsize=workers)
+    created = [False] * workers
+
+    def _worker(i: int) -> None:
+        st = stats[i]
+        try:
+            with engine.begin() as conn:
+                create_staging_like_destination(conn, schema, table, st.staging_table)
+            created[i] = True
+            with engine.connect() as conn:
+                while True:
+                    df = q.get()
+                    if df is None:
+                        return
+                    if errors:
+                        continue  # drenar la cola sin cargar
+                    t0 = time.perf_counter()
+                    with conn.begin():
+                        batch_rows[i].extend(append_to_staging(
+                            conn, df, schema=schema, staging_table=st.staging_table,
+                            chunksize=chunksize, loader=loader, bulk=bulk,
+                        ))
+                    st.seconds += time.perf_counter() - t0
+                    st.chunks += 1
+                    st.rows += len(df)
+        except BaseException as e:  # noqa: BLE001
+            errors.append(e)
+            # seguir drenando para no bloquear al productor
+            while q.get() is not None:
+                pass
+
+    threads = [threading.Thread(target=_worker, args=(i,), name=f"carga-{i}", daemon=True) for i in range(workers)]
+    for t in threads:
+        t.start()
+
+    rows_excel = 0
+    rows_inserted = 0
+    try:
+        try:
+            for df in chunks:
+                if errors:
+                    break
+                if cols[0] is None:
+                    cols[0] = df.columns.tolist()
+                rows_excel += len(df)
+                q.put(df)
+        finally:
+            for _ in threads:
+                q.put(None)
+            for t in threads:
+                t.join()
+
+        if errors:
+            raise errors[0]
+
+        with engine.begin() as conn:
+            if truncate_destination:
+                truncate_table(conn, dest_full)
+            if cols[0]:
+                cols_sql = ", ".join(bracket(c) for c in cols[0])
+                for st in stats:
+                    conn.execute(text(f"""INSERT INTO {dest_full} ({cols_sql})
+SELECT {cols_sql}
+FROM {fq(schema, st.staging_table)};
+"""))
+            for st in stats:
+                stg = fq(schema, st.staging_table)
+                rows_inserted += int(conn.execute(text(f"SELECT COUNT(1) FROM {stg};")).scalar() or 0)
+                conn.execute(text(f"DROP TABLE {stg};"))
+            created[:] = [False] * workers
+
+    finally:
+        # limpieza si algo falló antes de la transacción final
+        if any(created):
+            with engine.begin() as conn:
+                for st, c in zip(stats, created):
+                    if c:
+                        conn.execute(text(f"DROP TABLE IF EXISTS {fq(schema, st.staging_table)};"))
+
+    return UploadResult(
+        rows_excel=rows_excel,
+        rows_inserted=rows_inserted,
+        temp_table=f"{schema}.{table}{staging_suffix}_*",
+        batch_rows=[n for b in batch_rows for n in b],
+        partitions=stats,
+    )
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, TypeVar
+
+from sqlalchemy import event
+
+T = TypeVar("T")
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Pico de memoria residente del proceso: `resource` (ru_maxrss) en Linux/Mac, psutil `peak_wset` en Windows."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+        except ImportError:
+            return None
+        peak = getattr(psutil.Process().memory_info(), "peak_wset", None)
+        return int(peak) if peak else None
+    ru = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(ru if sys.platform == "darwin" else ru * 1024)  # Linux reporta KB, Mac bytes
+
+
+@dataclass
+class PhaseStat:
+    name: str
+    seconds: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    db_round_trips: int = 0
+    calls: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "phase": self.name,
+            "seconds": round(self.seconds, 4),
+            "rows": self.rows,
+            "rows_per_s": round(self.rows / self.seconds, 1) if self.seconds > 0 and self.rows else None,
+            "bytes": self.bytes or None,
+            "db_round_trips": self.db_round_trips,
+            "calls": self.calls,
+        }
+
+
+@dataclass
+class _Frame:
+    stat: PhaseStat
+    child_seconds: float = 0.0
+
+
+@dataclass
+class RunMetrics:
+    """
+    Tiempos por fase de una corrida (leer / esquema / convertir / cargar).
+
+    - Los tiempos son exclusivos: si una fase ocurre dentro de otra (p.ej. leer dentro de
+      convertir en --stream) su tiempo se descuenta de la fase externa.
+    - Cuenta round trips a la BD con un listener `before_cursor_execute` en el engine.
+    """
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    phases: Dict[str, PhaseStat] = field(default_factory=dict)
+    started: float = field(default_factory=time.perf_counter)
+    db_round_trips: int = 0
+    _stack: List[_Frame] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def attach_engine(self, engine) -> None:
+        @event.listens_for(engine, "before_cursor_execute")
+        def _count(conn, cursor, statement, parameters, context, executemany):
+            with self._lock:  # los workers de carga ejecutan en sus propios hilos
+                self.db_round_trips += 1
+
+    def _stat(self, name: str) -> PhaseStat:
+        if name not in self.phases:
+            self.phases[name] = PhaseStat(name)
+        return self.phases[name]
+
+    def add(self, name: str, *, rows: int = 0, nbytes: int = 0) -> None:
+        """Suma filas/bytes a una fase sin medir tiempo (p.ej. bytes del archivo al final del stream)."""
+        st = self._stat(name)
+        st.rows += rows
+        st.bytes += nbytes
+
+    @contextmanager
+    def phase(self, name: str, *, rows: int = 0, nbytes: int = 0):
+        st = self._stat(name)
+        frame = _Frame(st)
+        self._stack.append(frame)
+        rt0 = self.db_round_trips
+        t0 = time.perf_counter()
+        try:
+            yield st
+        finally:
+            elapsed = time.perf_counter() - t0
+            self._stack.pop()
+            st.seconds += elapsed - frame.child_seconds
+            st.rows += rows
+            st.bytes += nbytes
+            st.db_round_trips += self.db_round_trips - rt0
+            st.calls += 1
+            if self._stack:
+                self._stack[-1].child_seconds += elapsed
+
+    def iter_phase(self, name: str, items: Iterable[T]) -> Iterator[T]:
+        """Envuelve un iterable (chunks): el tiempo de cada next() y sus filas van a la fase `name`."""
+        it = iter(items)
+        while True:
+            with self.phase(name) as st:
+                try:
+                    item = next(it)
+                except StopIteration:
+                    st.calls -= 1  # se corrige al salir (+1)
+                    return
+                st.rows += len(item) if hasattr(item, "__len__") else 0
+            yield item
+
+    def records(self, **context) -> List[dict]:
+        total = time.perf_counter() - self.started
+        rss = peak_rss_bytes()
+        base = {"run_id": self.run_id, "ts": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        out = [{**base, "event": "phase", **p.as_dict()} for p in self.phases.values()]
+        out.append({
+            **base,
+            "event": "run",
+            "total_seconds": round(total, 4),
+            "peak_rss_mb": round(rss / 1024 / 1024, 1) if rss else None,
+            "db_round_trips": self.db_round_trips,
+            **context,
+        })
+        return out
+
+    def emit(self, *, stdout: bool = True, path: Optional[Path] = None, **context) -> List[dict]:
+        """Imprime JSON lines y/o los agrega a un archivo local de métricas (tendencias)."""
+        recs = self.records(**context)
+        lines = [json.dumps(r, ensure_ascii=False, default=str) for r in recs]
+        if stdout:
+            for line in lines:
+                print(line)
+        if path:
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("a", encoding="utf-8") as fh:
+                fh.write("\n".join(lines) + "\n")
+        return recs
+
+
+def file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
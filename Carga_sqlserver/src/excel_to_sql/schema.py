@@ -1,5 +1,13 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
 import pandas as pd
 from sqlalchemy import text
 
@@ -25,3 +33,101 @@ def fetch_table_schema(engine, schema: str, table: str) -> pd.DataFrame:
     if df.empty:
         raise ValueError(f"No encontré columnas para {schema}.{table}. ¿Existe la tabla y tienes permisos?")
     return df
+
+
+MODIFY_DATE_QUERY = text("""
+SELECT CONVERT(varchar(33), o.modify_date, 126) AS modify_date
+FROM sys.objects AS o
+WHERE o.object_id = OBJECT_ID(:fq, N'U');
+""")
+
+
+def fetch_table_version(engine, schema: str, table: str) -> Optional[str]:
+    """Versión barata de la tabla: sys.objects.modify_date (cambia con ALTER TABLE)."""
+    with engine.connect() as conn:
+        v = conn.execute(MODIFY_DATE_QUERY, {"fq": f"[{schema}].[{table}]"}).scalar()
+    return str(v) if v is not None else None
+
+
+@dataclass
+class SchemaCache:
+    """
+    Cache en disco de INFORMATION_SCHEMA.COLUMNS, un JSON por servidor/db/schema/tabla.
+
+    - Dentro del TTL: se usa sin consultar SQL Server.
+    - Vencido: se valida con sys.objects.modify_date; si no cambió, se renueva sin releer el esquema.
+    """
+    cache_dir: Path = Path("outputs/schema_cache")
+    ttl_seconds: int = 3600
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}.json"
+
+    def get(self, key: str) -> Optional[dict]:
+        p = self._path(key)
+        if not p.exists():
+            return None
+        try:
+            entry = json.loads(p.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("key") == key else None
+
+    def put(self, key: str, schema_df: pd.DataFrame, version: Optional[str]) -> None:
+        self._write(key, {
+            "key": key,
+            "version": version,
+            "checked_at": time.time(),
+            "columns": json.loads(schema_df.to_json(orient="records")),
+        })
+
+    def touch(self, key: str, entry: dict) -> None:
+        entry["checked_at"] = time.time()
+        self._write(key, entry)
+
+    def _write(self, key: str, entry: dict) -> None:
+        # escritura atómica (varias corridas del scheduler pueden compartir la carpeta)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        p = self._path(key)
+        tmp = p.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, p)
+
+    def is_fresh(self, entry: dict) -> bool:
+        return (time.time() - float(entry.get("checked_at", 0))) < self.ttl_seconds
+
+
+def schema_cache_key(server: str, database: str, schema: str, table: str) -> str:
+    return f"{server}/{database}/{schema}.{table}".lower()
+
+
+def fetch_table_schema_cached(
+    engine,
+    schema: str,
+    table: str,
+    *,
+    cache: Optional[SchemaCache],
+    server: str,
+    database: str,
+) -> Tuple[pd.DataFrame, str]:
+    """
+    fetch_table_schema con cache. Devuelve (schema_df, estado) con estado:
+    "hit" (TTL vigente), "revalidated" (modify_date igual), "miss" (se leyó INFORMATION_SCHEMA)
+    u "off" (sin cache).
+    """
+    if cache is None:
+        return fetch_table_schema(engine, schema, table), "off"
+
+    key = schema_cache_key(server, database, schema, table)
+    entry = cache.get(key)
+    if entry is not None and cache.is_fresh(entry):
+        return pd.DataFrame(entry["columns"]), "hit"
+
+    version = fetch_table_version(engine, schema, table)
+    if entry is not None and version is not None and entry.get("version") == version:
+        cache.touch(key, entry)
+        return pd.DataFrame(entry["columns"]), "revalidated"
+
+    df = fetch_table_schema(engine, schema, table)
+    cache.put(key, df, version)
+    return df, "miss"
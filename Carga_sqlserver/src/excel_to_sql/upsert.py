@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from .bulk import BulkConfig
+from .load import append_to_staging, bracket, create_staging_like_destination, fq
+
+KEY_SEP = "\x1f"
+
+
+@dataclass
+class UpsertResult:
+    rows_excel: int
+    rows_unchanged: int
+    rows_staged: int
+    rows_inserted: int
+    rows_updated: int
+    temp_table: str
+    batch_rows: List[int] = field(default_factory=list)
+
+
+def resolve_key_columns(df: pd.DataFrame, key_cols: Sequence[str]) -> List[str]:
+    """Resuelve las llaves (case-insensitive) contra las columnas ya convertidas."""
+    cols = {str(c).lower(): c for c in df.columns}
+    out = [cols[str(k).strip().lower()] for k in key_cols if str(k).strip().lower() in cols]
+    faltantes = [k for k in key_cols if str(k).strip().lower() not in cols]
+    if faltantes:
+        raise ValueError(f"Columnas llave no existen en la tabla: {faltantes}")
+    if not out:
+        raise ValueError("Modo upsert requiere al menos una columna llave (--keys).")
+    return out
+
+
+def row_keys_and_hashes(df: pd.DataFrame, key_cols: Sequence[str]) -> Tuple[pd.Series, np.ndarray]:
+    """
+    Llave compuesta (string) + hash de 64 bits de las columnas no-llave, por fila.
+
+    El hash usa pd.util.hash_pandas_object (determinístico entre corridas para el mismo dtype),
+    por eso se calcula sobre el DF ya convertido al esquema SQL.
+    """
+    keys_df = df[list(key_cols)]
+    if keys_df.isna().any(axis=None):
+        raise ValueError(f"Hay filas con NULL en columnas llave {list(key_cols)}; MERGE no puede emparejarlas.")
+
+    keys = keys_df.astype(str).agg(KEY_SEP.join, axis=1) if len(key_cols) > 1 else keys_df.iloc[:, 0].astype(str)
+
+    value_cols = [c for c in df.columns if c not in set(key_cols)]
+    if value_cols:
+        vals = df[value_cols]
+        # misma resolución de fechas sin importar el origen (Excel/CSV/Parquet)
+        dt_cols = [c for c in value_cols if pd.api.types.is_datetime64_dtype(vals[c])]
+        if dt_cols:
+            vals = vals.astype({c: "datetime64[ns]" for c in dt_cols})
+        h = pd.util.hash_pandas_object(vals, index=False).to_numpy()
+    else:
+        h = np.zeros(len(df), dtype=np.uint64)
+    # SQLite guarda INTEGER con signo
+    return keys.reset_index(drop=True), h.view(np.int64)
+
+
+class HashIndex:
+    """Índice persistente llave → hash de fila (SQLite local), por tabla destino."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # check_same_thread=False: el modo batch lo usa desde el hilo cargador (un solo hilo a la vez)
+        self._con = sqlite3.connect(self.path, check_same_thread=False)
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS row_hash (tbl TEXT NOT NULL, k TEXT NOT NULL, h INTEGER NOT NULL, PRIMARY KEY (tbl, k))"
+        )
+        self._con.commit()
+
+    def close(self) -> None:
+        self._con.close()
+
+    def load(self, tbl: str) -> pd.Series:
+        df = pd.read_sql_query("SELECT k, h FROM row_hash WHERE tbl = ?", self._con, params=(tbl,))
+        return pd.Series(df["h"].to_numpy(dtype=np.int64), index=df["k"].astype(str))
+
+    def update(self, tbl: str, keys: Iterable[str], hashes: Iterable[int]) -> None:
+        self._con.executemany(
+            "INSERT OR REPLACE INTO row_hash (tbl, k, h) VALUES (?, ?, ?)",
+            ((tbl, k, int(h)) for k, h in zip(keys, hashes)),
+        )
+        self._con.commit()
+
+    def reset(self, tbl: str) -> int:
+        n = self._con.execute("DELETE FROM row_hash WHERE tbl = ?", (tbl,)).rowcount
+        self._con.commit()
+        return int(n)
+
+
+def _lookup(ref: pd.Series, keys: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """(encontrada, hash) de cada llave en `ref` (índice llave → hash)."""
+    pos = ref.index.get_indexer(keys) if len(ref) else np.full(len(keys), -1)
+    found = pos >= 0
+    h = np.zeros(len(keys), dtype=np.int64)
+    h[found] = ref.to_numpy()[pos[found]]
+    return found, h
+
+
+def select_changed(
+    df: pd.DataFrame, key_cols: Sequence[str], known: pd.Series, staged: Optional[pd.Series] = None,
+) -> Tuple[pd.DataFrame, pd.Series, np.ndarray]:
+    """
+    Filtra filas nuevas o cambiadas vs el índice. Duplicados de llave en df: gana la última fila.
+
+    `staged` (llave → hash ya enviado a la staging en bloques anteriores) tiene prioridad sobre `known`:
+    una llave que se repite entre bloques se compara contra su última versión, no contra el destino.
+    """
+    keys, h = row_keys_and_hashes(df, key_cols)
+
+    last = ~keys.duplicated(keep="last").to_numpy()
+    found, ref = _lookup(known, keys)
+    if staged is not None and len(staged):
+        in_stg, stg_h = _lookup(staged, keys)
+        ref[in_stg] = stg_h[in_stg]
+        found |= in_stg
+    changed = ~found | (ref != h)
+
+    mask = last & changed
+    return df.iloc[np.flatnonzero(mask)], keys[mask].reset_index(drop=True), h[mask]
+
+
+def delete_staged_keys(conn, delta: pd.DataFrame, *, schema: str, staging_table: str, key_cols: Sequence[str]) -> int:
+    """Borra de la staging las filas con las llaves de `delta` (una llave repetida entre bloques: gana la última)."""
+    where = " AND ".join(f"{bracket(k)} = :k{i}" for i, k in enumerate(key_cols))
+    vals = delta[list(key_cols)].astype(object)
+    params = [{f"k{i}": v for i, v in enumerate(row)} for row in vals.itertuples(index=False, name=None)]
+    conn.execute(text(f"DELETE FROM {fq(schema, staging_table)} WHERE {where};"), params)
+    # la staging nunca tiene llaves repetidas: una fila borrada por llave
+    return len(params)
+
+
+def merge_staging(conn, *, schema: str, table: str, staging_table: str, cols: Sequence[str], key_cols: Sequence[str]) -> Tuple[int, int]:
+    """MERGE staging → destino por llaves. Devuelve (insertadas, actualizadas)."""
+    dest = fq(schema, table)
+    stg = fq(schema, staging_table)
+    on = " AND ".join(f"t.{bracket(k)} = s.{bracket(k)}" for k in key_cols)
+    value_cols = [c for c in cols if c not in set(key_cols)]
+    cols_sql = ", ".join(bracket(c) for c in cols)
+
+    staged = int(conn.execute(text(f"SELECT COUNT(1) FROM {stg};")).scalar() or 0)
+    updated = int(conn.execute(text(f"SELECT COUNT(1) FROM {stg} AS s INNER JOIN {dest} AS t ON {on};")).scalar() or 0)
+
+    if conn.dialect.name != "mssql":
+        # sustituto local (SQLite): UPSERT nativo; requiere índice UNIQUE sobre las llaves
+        keys_sql = ", ".join(bracket(k) for k in key_cols)
+        set_sql = ", ".join(f"{bracket(c)} = excluded.{bracket(c)}" for c in value_cols)
+        action = f"DO UPDATE SET {set_sql}" if value_cols else "DO NOTHING"
+        conn.execute(text(f"INSERT INTO {dest} ({cols_sql}) SELECT {cols_sql} FROM {stg} WHERE 1 ON CONFLICT ({keys_sql}) {action};"))
+        return staged - updated, updated
+
+    when_matched = ""
+    if value_cols:
+        set_sql = ", ".join(f"t.{bracket(c)} = s.{bracket(c)}" for c in value_cols)
+        when_matched = f"WHEN MATCHED THEN UPDATE SET {set_sql}\n"
+    vals_sql = ", ".join(f"s.{bracket(c)}" for c in cols)
+
+    conn.execute(text(f"""MERGE {dest} WITH (HOLDLOCK) AS t
+USING {stg} AS s
+ON {on}
+{when_matched}WHEN NOT MATCHED BY TARGET THEN INSERT ({cols_sql}) VALUES ({vals_sql});
+"""))
+    return staged - updated, updated
+
+
+def upsert_chunks(
+    engine,
+    chunks: Iterable[pd.DataFrame],
+    *,
+    schema: str,
+    table: str,
+    key_cols: Sequence[str],
+    index: HashIndex,
+    index_key: str,
+    staging_suffix: str = "_TEMP_CARGA",
+    chunksize: int = 1000,
+    loader: str = "executemany",
+    bulk: Optional[BulkConfig] = None,
+) -> UpsertResult:
+    """
+    Carga incremental: solo las filas nuevas/cambiadas (según el índice de hashes) van a la staging,
+    y luego un único MERGE al destino. El índice se actualiza solo si la transacción hace commit.
+    """
+    staging_table = f"{table}{staging_suffix}"
+    stg_full = fq(schema, staging_table)
+    known = index.load(index_key)
+
+    rows_excel = 0
+    cols: Optional[List[str]] = None
+    keys_res: Optional[List[str]] = None
+    batch_rows: List[int] = []
+    removed = 0
+    # llave → hash de lo que ya está en la staging (con --stream una llave puede repetirse entre bloques)
+    staged = pd.Series([], index=pd.Index([], dtype=object), dtype=np.int64)
+
+    with engine.begin() as conn:
+        create_staging_like_destination(conn, schema, table, staging_table)
+
+        for df in chunks:
+            if cols is None:
+                cols = df.columns.tolist()
+                keys_res = resolve_key_columns(df, key_cols)
+            rows_excel += len(df)
+
+            delta, k, h = select_changed(df, keys_res, known, staged)
+            if len(delta):
+                again = k.isin(staged.index).to_numpy()
+                if again.any():
+                    removed += delete_staged_keys(
+                        conn, delta.iloc[np.flatnonzero(again)], schema=schema, staging_table=staging_table, key_cols=keys_res,
+                    )
+                    staged = staged[~staged.index.isin(k[again])]
+                batch_rows.extend(append_to_staging(
+                    conn, delta, schema=schema, staging_table=staging_table, chunksize=chunksize, loader=loader, bulk=bulk,
+                ))
+                staged = pd.concat([staged, pd.Series(h, index=k.to_numpy(), dtype=np.int64)])
+
+        inserted = updated = 0
+        if cols and batch_rows:
+            inserted, updated = merge_staging(
+                conn, schema=schema, table=table, staging_table=staging_table, cols=cols, key_cols=keys_res,
+            )
+
+        conn.execute(text(f"DROP TABLE {stg_full};"))
+
+    if len(staged):
+        index.update(index_key, staged.index, staged.to_numpy())
+
+    n_staged = int(sum(batch_rows)) - removed
+    return UpsertResult(
+        rows_excel=rows_excel,
+        rows_unchanged=rows_excel - n_staged,
+        rows_staged=n_staged,
+        rows_inserted=inserted,
+        rows_updated=updated,
+        temp_table=f"{schema}.{staging_table}",
+        batch_rows=batch_rows,
+    )
+
+
+def upsert_dataframe(engine, df: pd.DataFrame, **kwargs) -> UpsertResult:
+    return upsert_chunks(engine, [df], **kwargs)
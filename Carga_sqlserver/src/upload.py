@@ -2,17 +2,74 @@
 from __future__ import annotations
 
 import os
+from pathlib import Path
+
 from dotenv import load_dotenv
 
 from excel_to_sql.db.mssql import load_config_from_env, make_engine
-from excel_to_sql.schema import fetch_table_schema
-from excel_to_sql.io import load_excel
-from excel_to_sql.convert import convert_dataframe_to_sql_schema
-from excel_to_sql.load import upload_dataframe
+from excel_to_sql.schema import SchemaCache, fetch_table_schema_cached
+from excel_to_sql.io import iter_chunks, load_table
+from excel_to_sql.convert import BACKENDS, convert_chunks, convert_dataframe_to_sql_schema
+from excel_to_sql.load import LOADERS, upload_chunks, upload_dataframe
+from excel_to_sql.bulk import load_bulk_config_from_env
+from excel_to_sql.upsert import HashIndex, upsert_chunks, upsert_dataframe
+from excel_to_sql.batch import BatchLedger, discover_inputs, run_batch
+from excel_to_sql.metrics import RunMetrics, file_size
 
 load_dotenv()
 
 
+def run_batch_mode(args, engine, cfg, schema_df, bulk, metrics: RunMetrics) -> None:
+    """Muchos archivos/hojas con un solo engine y un solo esquema (ver excel_to_sql.batch)."""
+    if args.truncate_destination:
+        raise SystemExit("--truncate-destination no aplica en modo --batch (borraría lo cargado por archivos previos).")
+
+    items = discover_inputs(args.batch, sheet_pattern=args.sheet_pattern or args.sheet)
+    ledger = BatchLedger(Path(args.ledger))
+    print(f"📚 Batch: {len(items):,} archivo(s)/hoja(s) | parse_workers={args.parse_workers} | ledger={args.ledger}")
+
+    index = None
+    if args.mode == "upsert":
+        keys = [k.strip() for k in args.keys.split(",") if k.strip()]
+        if not keys:
+            raise SystemExit("--mode upsert requiere --keys (o UPSERT_KEYS en .env).")
+        index = HashIndex(Path(args.hash_index))
+        index_key = f"{cfg.server}/{cfg.database}/{args.schema}.{args.table}"
+
+        def load_fn(df):
+            r = upsert_dataframe(
+                engine, df, schema=args.schema, table=args.table, key_cols=keys, index=index, index_key=index_key,
+                chunksize=args.chunksize, loader=args.loader, bulk=bulk,
+            )
+            return r.rows_inserted + r.rows_updated
+    else:
+        def load_fn(df):
+            r = upload_dataframe(
+                engine, df, schema=args.schema, table=args.table,
+                chunksize=args.chunksize, loader=args.loader, bulk=bulk, workers=args.workers,
+            )
+            return r.rows_inserted
+
+    def on_result(r):
+        if r.status == "ok":
+            print(f"  ✅ {Path(r.path).name} [{r.sheet or '-'}] {r.rows_loaded:,} filas | parse={r.parse_seconds:.1f}s load={r.load_seconds:.1f}s")
+        else:
+            print(f"  ❌ {Path(r.path).name} [{r.sheet or '-'}] {r.error}")
+
+    try:
+        with metrics.phase("batch", nbytes=sum(it.size for it in items)) as st:
+            summary = run_batch(
+                items, schema_df, load_fn, ledger,
+                strict=not args.no_strict, parse_workers=args.parse_workers, backend=args.dtype_backend, on_result=on_result,
+            )
+            st.rows += summary.rows_loaded
+    finally:
+        if index is not None:
+            index.close()
+
+    print(f"✅ Batch: ok={summary.ok:,} | fallidos={summary.failed:,} | saltados (ledger)={summary.skipped:,} | filas={summary.rows_loaded:,}")
+
+
 def main():
     import argparse
 
@@ -24,29 +81,168 @@ def main():
     parser.add_argument("--chunksize", type=int, default=int(os.environ.get("CHUNKSIZE", "1000")), help="Batch size.")
     parser.add_argument("--truncate-destination", action="store_true", help="TRUNCATE antes de insertar (PELIGROSO).")
     parser.add_argument("--no-strict", action="store_true", help="No falla si una conversión produce NULL en NOT NULL.")
+    parser.add_argument("--convert-workers", type=int, default=int(os.environ.get("CONVERT_WORKERS", "1")), help="Hilos para convertir columnas.")
+    parser.add_argument("--stream", action="store_true", help="Lee/convierte/carga por bloques (memoria acotada). Soporta .xlsx/.csv/.parquet.")
+    parser.add_argument("--read-chunksize", type=int, default=int(os.environ.get("READ_CHUNKSIZE", "100000")), help="Filas por bloque en --stream.")
+    parser.add_argument("--loader", choices=LOADERS, default=os.environ.get("LOADER", "executemany"), help="executemany (to_sql) | bulk (CSV + BULK INSERT TABLOCK).")
+    parser.add_argument("--bulk-batch-rows", type=int, default=None, help="Filas por archivo/lote en --loader bulk.")
+    parser.add_argument("--mode", choices=["append", "upsert"], default=os.environ.get("LOAD_MODE", "append"), help="append (INSERT) | upsert (solo filas nuevas/cambiadas + MERGE).")
+    parser.add_argument("--keys", default=os.environ.get("UPSERT_KEYS", ""), help="Columnas llave para --mode upsert, separadas por coma.")
+    parser.add_argument("--hash-index", default=os.environ.get("HASH_INDEX_PATH", "outputs/hash_index.sqlite"), help="Índice local de hashes por fila (SQLite).")
+    parser.add_argument("--reset-hash-index", action="store_true", help="Olvida los hashes de la tabla (la próxima carga re-envía todo al MERGE).")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("LOAD_WORKERS", "1")), help="Conexiones paralelas a staging (modo append).")
+    parser.add_argument("--schema-cache-ttl", type=int, default=int(os.environ.get("SCHEMA_CACHE_TTL", "3600")), help="Segundos que el esquema cacheado se usa sin validar.")
+    parser.add_argument("--no-schema-cache", action="store_true", help="Siempre lee INFORMATION_SCHEMA.")
+    parser.add_argument("--batch", default=None, help="Carpeta o glob (ej. 'data/diarios/*.xlsx'): carga muchos archivos en un proceso.")
+    parser.add_argument("--sheet-pattern", default=os.environ.get("SHEET_PATTERN"), help="Patrón de hojas en --batch (fnmatch). Default: --sheet.")
+    parser.add_argument("--parse-workers", type=int, default=int(os.environ.get("PARSE_WORKERS", "2")), help="Procesos que leen/convierten en --batch.")
+    parser.add_argument("--ledger", default=os.environ.get("BATCH_LEDGER", "outputs/batch_ledger.jsonl"), help="Bitácora de archivos cargados (--batch).")
+    parser.add_argument("--dtype-backend", choices=BACKENDS, default=os.environ.get("DTYPE_BACKEND", "numpy"), help="numpy | pyarrow (columnas Arrow de lectura a carga).")
+    parser.add_argument("--metrics", action="store_true", help="Imprime tiempos por fase (JSON lines) al terminar.")
+    parser.add_argument("--metrics-file", default=os.environ.get("METRICS_FILE"), help="Agrega las métricas de la corrida a este .jsonl (tendencias).")
     args = parser.parse_args()
 
+    if args.mode == "upsert" and args.truncate_destination:
+        raise SystemExit("--truncate-destination no aplica en --mode upsert.")
+
+    metrics = RunMetrics()
+    status = "error"
+    try:
+        run(args, metrics)
+        status = "ok"
+    finally:
+        if args.metrics or args.metrics_file:
+            metrics.emit(
+                stdout=args.metrics,
+                path=Path(args.metrics_file) if args.metrics_file else None,
+                status=status,
+                input=args.batch or args.input,
+                table=f"{args.schema}.{args.table}",
+                mode=args.mode,
+                loader=args.loader,
+                workers=args.workers,
+                stream=args.stream,
+                dtype_backend=args.dtype_backend,
+            )
+
+
+def run(args, metrics: RunMetrics) -> None:
+    read_backend = "pyarrow" if args.dtype_backend == "pyarrow" else None
+
     cfg = load_config_from_env()
-    engine = make_engine(cfg)
+    engine = make_engine(cfg, pool_size=max(5, args.workers))
+    metrics.attach_engine(engine)
+
+    bulk = load_bulk_config_from_env()
+    if args.bulk_batch_rows:
+        bulk.batch_rows = int(args.bulk_batch_rows)
+
+    cache = None
+    if not args.no_schema_cache:
+        cache = SchemaCache(Path(os.environ.get("SCHEMA_CACHE_DIR", "outputs/schema_cache")), ttl_seconds=args.schema_cache_ttl)
+    with metrics.phase("schema"):
+        schema_df, cache_status = fetch_table_schema_cached(
+            engine, args.schema, args.table, cache=cache, server=cfg.server, database=cfg.database,
+        )
+    print(f"🧱 Esquema SQL: {len(schema_df)} columnas | cache={cache_status}")
+
+    if args.batch:
+        run_batch_mode(args, engine, cfg, schema_df, bulk, metrics)
+        return
+
+    if args.mode == "upsert":
+        keys = [k.strip() for k in args.keys.split(",") if k.strip()]
+        if not keys:
+            raise SystemExit("--mode upsert requiere --keys (o UPSERT_KEYS en .env).")
+
+        if args.stream:
+            chunks = iter_chunks(args.input, sheet=args.sheet, chunksize=args.read_chunksize, dtype_backend=read_backend)
+            print(f"🌊 Modo stream: bloques de {args.read_chunksize:,} filas")
+        else:
+            chunks = [load_table(args.input, sheet=args.sheet, dtype_backend=read_backend)]
+        chunks = metrics.iter_phase("read", chunks)
+        conv = convert_chunks(chunks, schema_df, strict=not args.no_strict, max_workers=args.convert_workers, backend=args.dtype_backend)
+        conv = metrics.iter_phase("convert", conv)
+
+        index = HashIndex(Path(args.hash_index))
+        index_key = f"{cfg.server}/{cfg.database}/{args.schema}.{args.table}"
+        try:
+            if args.reset_hash_index:
+                print(f"🧹 Hashes olvidados: {index.reset(index_key):,}")
+            with metrics.phase("upsert") as st:
+                result = upsert_chunks(
+                    engine,
+                    conv,
+                    schema=args.schema,
+                    table=args.table,
+                    key_cols=keys,
+                    index=index,
+                    index_key=index_key,
+                    chunksize=args.chunksize,
+                    loader=args.loader,
+                    bulk=bulk,
+                )
+                st.rows += result.rows_staged
+        finally:
+            index.close()
+        metrics.add("read", nbytes=file_size(args.input))
+
+        print(f"📄 Filas leídas: {result.rows_excel:,} | sin cambios: {result.rows_unchanged:,} | a staging: {result.rows_staged:,}")
+        print(f"✅ MERGE: insertadas={result.rows_inserted:,} | actualizadas={result.rows_updated:,}")
+        return
+
+    if args.stream:
+        chunks = iter_chunks(args.input, sheet=args.sheet, chunksize=args.read_chunksize, dtype_backend=read_backend)
+        chunks = metrics.iter_phase("read", chunks)
+        conv = convert_chunks(chunks, schema_df, strict=not args.no_strict, max_workers=args.convert_workers, backend=args.dtype_backend)
+        conv = metrics.iter_phase("convert", conv)
+        print(f"🌊 Modo stream: bloques de {args.read_chunksize:,} filas")
 
-    df = load_excel(args.input, sheet=args.sheet)
-    print(f"📄 Excel cargado: shape={df.shape}")
+        # en stream las fases se intercalan: "upload" queda con su tiempo propio (sin leer/convertir)
+        with metrics.phase("upload") as st:
+            result = upload_chunks(
+                engine,
+                conv,
+                schema=args.schema,
+                table=args.table,
+                chunksize=args.chunksize,
+                truncate_destination=args.truncate_destination,
+                loader=args.loader,
+                bulk=bulk,
+                workers=args.workers,
+            )
+            st.rows += result.rows_inserted
+        metrics.add("read", nbytes=file_size(args.input))
+        print(f"📄 Filas leídas: {result.rows_excel:,}")
 
-    schema_df = fetch_table_schema(engine, args.schema, args.table)
-    print(f"🧱 Esquema SQL leído: {len(schema_df)} columnas")
+    else:
+        with metrics.phase("read", nbytes=file_size(args.input)) as st:
+            df = load_table(args.input, sheet=args.sheet, dtype_backend=read_backend)
+            st.rows += len(df)
+        print(f"📄 Excel cargado: shape={df.shape}")
 
-    df_conv = convert_dataframe_to_sql_schema(df, schema_df, strict=not args.no_strict)
-    print("✅ Tipos convertidos/validados contra SQL Server")
+        with metrics.phase("convert", rows=len(df)):
+            df_conv = convert_dataframe_to_sql_schema(df, schema_df, strict=not args.no_strict, max_workers=args.convert_workers, backend=args.dtype_backend)
+        print("✅ Tipos convertidos/validados contra SQL Server")
 
-    result = upload_dataframe(
-        engine,
-        df_conv,
-        schema=args.schema,
-        table=args.table,
-        chunksize=args.chunksize,
-        truncate_destination=args.truncate_destination,
-    )
+        with metrics.phase("upload") as st:
+            result = upload_dataframe(
+                engine,
+                df_conv,
+                schema=args.schema,
+                table=args.table,
+                chunksize=args.chunksize,
+                truncate_destination=args.truncate_destination,
+                loader=args.loader,
+                bulk=bulk,
+                workers=args.workers,
+            )
+            st.rows += result.rows_inserted
 
+    for p in result.partitions:
+        print(f"🧵 Worker {p.worker}: {p.rows:,} filas en {p.seconds:.1f}s ({p.rows_per_s:,.0f} filas/s) | chunks={p.chunks}")
+    if args.loader == "bulk":
+        print(f"📦 Lotes bulk: {len(result.batch_rows)} | filas por lote={result.batch_rows}")
     print(f"✅ Insertados: {result.rows_inserted:,} | temp={result.temp_table}")
 
 
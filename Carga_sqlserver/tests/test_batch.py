@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+from excel_to_sql.batch import BatchLedger, discover_inputs, run_batch
+from excel_to_sql.load import upload_dataframe
+
+
+def test_run_batch_with_ledger(tmp_path):
+    src = tmp_path / "entrada"
+    src.mkdir()
+    for i in range(3):
+        pd.DataFrame({"id": [i * 10 + j for j in range(4)], "nombre": list("abcd")}).to_csv(src / f"dia_{i}.csv", index=False)
+    with pd.ExcelWriter(src / "libro.xlsx") as w:
+        pd.DataFrame({"ID": [100, 101], "NOMBRE": ["x", "y"]}).to_excel(w, sheet_name="Llamadas_01", index=False)
+        pd.DataFrame({"otra": [1]}).to_excel(w, sheet_name="Resumen", index=False)
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'dest.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE DEST (ID INTEGER, NOMBRE TEXT)"))
+    schema_df = pd.DataFrame([
+        {"COLUMN_NAME": "ID", "DATA_TYPE": "int", "CHARACTER_MAXIMUM_LENGTH": None, "IS_NULLABLE": "NO"},
+        {"COLUMN_NAME": "NOMBRE", "DATA_TYPE": "varchar", "CHARACTER_MAXIMUM_LENGTH": 10, "IS_NULLABLE": "YES"},
+    ])
+
+    def load_fn(df):
+        return upload_dataframe(engine, df, schema="main", table="DEST").rows_inserted
+
+    items = discover_inputs(str(src), sheet_pattern="Llamadas_*")
+    assert len(items) == 4
+
+    ledger_path = tmp_path / "ledger.jsonl"
+    s1 = run_batch(items, schema_df, load_fn, BatchLedger(ledger_path), parse_workers=2)
+    assert (s1.ok, s1.failed, s1.skipped, s1.rows_loaded) == (4, 0, 0, 14)
+
+    s2 = run_batch(items, schema_df, load_fn, BatchLedger(ledger_path), parse_workers=2)
+    assert (s2.ok, s2.skipped) == (0, 4)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM DEST")).scalar() == 14
+
+
+def test_run_batch_surfaces_loader_failure(tmp_path):
+    src = tmp_path / "entrada"
+    src.mkdir()
+    for i in range(6):
+        pd.DataFrame({"id": [i], "nombre": ["a"]}).to_csv(src / f"dia_{i}.csv", index=False)
+    schema_df = pd.DataFrame([
+        {"COLUMN_NAME": "ID", "DATA_TYPE": "int", "CHARACTER_MAXIMUM_LENGTH": None, "IS_NULLABLE": "NO"},
+        {"COLUMN_NAME": "NOMBRE", "DATA_TYPE": "varchar", "CHARACTER_MAXIMUM_LENGTH": 10, "IS_NULLABLE": "YES"},
+    ])
+
+    class LedgerLleno(BatchLedger):
+        def record(self, res):
+            raise OSError("No queda espacio en el disco")
+
+    # cola de 1: sin drenar, el productor quedaría bloqueado para siempre en q.put
+    with pytest.raises(OSError, match="espacio"):
+        run_batch(discover_inputs(str(src)), schema_df, len, LedgerLleno(tmp_path / "ledger.jsonl"), parse_workers=1)
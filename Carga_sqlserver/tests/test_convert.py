@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+from excel_to_sql.convert import (
+    convert_dataframe_to_sql_schema,
+    convert_dataframe_to_sql_schema_legacy,
+)
+
+
+def _schema():
+    return pd.DataFrame([
+        {"COLUMN_NAME": "ID", "DATA_TYPE": "int", "CHARACTER_MAXIMUM_LENGTH": None, "IS_NULLABLE": "NO"},
+        {"COLUMN_NAME": "Nombre", "DATA_TYPE": "varchar", "CHARACTER_MAXIMUM_LENGTH": 3, "IS_NULLABLE": "YES"},
+        {"COLUMN_NAME": "Activo", "DATA_TYPE": "bit", "CHARACTER_MAXIMUM_LENGTH": None, "IS_NULLABLE": "YES"},
+        {"COLUMN_NAME": "Fecha", "DATA_TYPE": "datetime", "CHARACTER_MAXIMUM_LENGTH": None, "IS_NULLABLE": "YES"},
+        {"COLUMN_NAME": "Valor", "DATA_TYPE": "decimal", "CHARACTER_MAXIMUM_LENGTH": None, "IS_NULLABLE": "NO"},
+    ])
+
+
+def _df():
+    return pd.DataFrame({
+        "id": ["1", "2", None, "4"],
+        " NOMBRE ": ["Ana", "Bernardo", None, "Eva"],
+        "activo": ["Sí", "no", "x", None],
+        "fecha": ["2024-01-01", "2024-02-01", None, "2024-03-01"],
+        "valor": ["1.5", "  ", "3", None],
+        "extra": [1, 2, 3, 4],
+    })
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_plan_matches_legacy(workers):
+    ref = convert_dataframe_to_sql_schema_legacy(_df(), _schema())
+    new = convert_dataframe_to_sql_schema(_df(), _schema(), max_workers=workers)
+    pd.testing.assert_frame_equal(ref, new)
+
+
+def test_same_error_report():
+    df = _df()
+    df["id"] = ["1", "dos", "3", "x"]
+    df["valor"] = ["1.5", "abc", "  ", None]
+
+    with pytest.raises(ValueError) as ref:
+        convert_dataframe_to_sql_schema_legacy(df, _schema())
+    with pytest.raises(ValueError) as new:
+        convert_dataframe_to_sql_schema(df, _schema(), max_workers=2)
+    assert str(new.value) == str(ref.value)
+
+
+def test_pyarrow_backend_matches_values():
+    pytest.importorskip("pyarrow")
+    ref = convert_dataframe_to_sql_schema(_df(), _schema())
+    arw = convert_dataframe_to_sql_schema(_df(), _schema(), backend="pyarrow")
+
+    assert all(isinstance(t, pd.ArrowDtype) for t in arw.dtypes)
+    assert str(arw["ID"].dtype) == "int32[pyarrow]"
+    assert arw["Nombre"].tolist()[:2] == ["Ana", "Ber"]
+    for col in ref.columns:
+        assert ref[col].isna().tolist() == arw[col].isna().tolist()
+        assert [str(v) for v in ref[col].dropna()] == [str(v) for v in arw[col].dropna()]
+
+
+@pytest.mark.parametrize("arrow_input", [False, True])
+def test_pyarrow_backend_tz_aware_dates(arrow_input):
+    pytest.importorskip("pyarrow")
+    df = _df()
+    df["fecha"] = pd.to_datetime(df["fecha"]).dt.tz_localize("America/Bogota")
+    if arrow_input:
+        df = df.convert_dtypes(dtype_backend="pyarrow")
+    ref = convert_dataframe_to_sql_schema_legacy(_df().assign(fecha=df["fecha"]), _schema())
+    arw = convert_dataframe_to_sql_schema(df, _schema(), backend="pyarrow")
+
+    assert str(arw["Fecha"].dtype) == "timestamp[ms][pyarrow]"
+    # mismo instante que el legacy, en UTC y sin zona
+    esperado = ref["Fecha"].dt.tz_convert(None)
+    assert arw["Fecha"].isna().tolist() == esperado.isna().tolist()
+    assert arw["Fecha"].dropna().tolist() == esperado.dropna().tolist()
+    assert str(arw["Fecha"].iloc[0]) == "2024-01-01 05:00:00"
@@ -0,0 +1,50 @@
+import pandas as pd
+
+from excel_to_sql.io import iter_chunks, load_excel
+
+
+def test_iter_chunks_excel_matches_read_excel(tmp_path):
+    df = pd.DataFrame({
+        "ID": range(1, 8),
+        "Nombre": ["a", "b", None, "d", "e", "f", "g"],
+        "Fecha": pd.date_range("2024-01-01", periods=7),
+    })
+    path = tmp_path / "subida.xlsx"
+    df.to_excel(path, sheet_name="Sheet1", index=False)
+
+    chunks = list(iter_chunks(str(path), sheet="Sheet1", chunksize=3))
+    assert [len(c) for c in chunks] == [3, 3, 1]
+
+    got = pd.concat(chunks, ignore_index=True)
+    ref = load_excel(str(path), sheet="Sheet1")
+    pd.testing.assert_frame_equal(got, ref, check_dtype=False)
+
+
+def test_iter_chunks_csv(tmp_path):
+    path = tmp_path / "subida.csv"
+    pd.DataFrame({"a": range(10), "b": list("abcdefghij")}).to_csv(path, index=False)
+    assert [len(c) for c in iter_chunks(str(path), chunksize=4)] == [4, 4, 2]
+
+
+def test_iter_chunks_excel_headers_and_blank_runs_match_read_excel(tmp_path):
+    from openpyxl import Workbook
+
+    path = tmp_path / "raro.xlsx"
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Sheet1"
+    ws.append(["ID", "Nombre", "Nombre", 2024, None, "Nombre.1"])  # duplicados, numérico, vacío
+    for i in range(1, 4):
+        ws.append([i, f"a{i}", f"b{i}", i * 10, i, "x"])
+    for _ in range(5):
+        ws.append([])  # racha de filas vacías más larga que el bloque
+    for i in range(4, 8):
+        ws.append([i, f"a{i}", f"b{i}", i * 10, i, "x"])
+    wb.save(path)
+
+    ref = load_excel(str(path), sheet="Sheet1")
+    chunks = list(iter_chunks(str(path), sheet="Sheet1", chunksize=2))
+    assert all(len(c) <= 2 for c in chunks)
+    got = pd.concat(chunks, ignore_index=True)
+    assert list(got.columns) == list(ref.columns) == ["ID", "Nombre", "Nombre.2", 2024, "Unnamed: 4", "Nombre.1"]
+    pd.testing.assert_frame_equal(got, ref, check_dtype=False)
@@ -0,0 +1,109 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+
+from excel_to_sql.bulk import BulkConfig
+from excel_to_sql.load import upload_chunks, upload_dataframe
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # SQLite como sustituto local de SQL Server
+    eng = create_engine(f"sqlite:///{tmp_path / 'dest.db'}")
+    with eng.begin() as conn:
+        conn.execute(text("CREATE TABLE DEST (ID INTEGER NOT NULL, NOMBRE TEXT, FECHA TEXT)"))
+    return eng
+
+
+def _df(n=25):
+    return pd.DataFrame({
+        "ID": pd.array(range(n), dtype="Int64"),
+        "NOMBRE": pd.array([f"n, {i}" if i % 5 else None for i in range(n)], dtype="string"),
+        "FECHA": pd.date_range("2024-01-01", periods=n, freq="h"),
+    })
+
+
+@pytest.mark.parametrize("loader", ["executemany", "bulk"])
+def test_upload_dataframe_loaders(engine, tmp_path, loader):
+    bulk = BulkConfig(local_dir=tmp_path / "bulk", batch_rows=10)
+    res = upload_dataframe(engine, _df(), schema="main", table="DEST", loader=loader, bulk=bulk)
+
+    assert res.rows_inserted == 25
+    assert sum(res.batch_rows) == 25
+    if loader == "bulk":
+        assert res.batch_rows == [10, 10, 5]
+        assert not list((tmp_path / "bulk").glob("*.csv"))
+
+    with engine.connect() as conn:
+        got = pd.read_sql(text("SELECT * FROM DEST ORDER BY ID"), conn)
+    assert got["NOMBRE"].isna().sum() == 5
+    assert got.loc[1, "NOMBRE"] == "n, 1"
+
+
+@pytest.mark.parametrize("loader", ["executemany", "bulk"])
+def test_upload_dataframe_parallel(engine, tmp_path, loader):
+    bulk = BulkConfig(local_dir=tmp_path / "bulk", batch_rows=4)
+    res = upload_dataframe(engine, _df(), schema="main", table="DEST", loader=loader, bulk=bulk, workers=3)
+
+    assert res.rows_inserted == 25
+    assert len(res.partitions) == 3
+    assert sum(p.rows for p in res.partitions) == 25
+    with engine.connect() as conn:
+        tablas = conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'")).scalars().all()
+        assert tablas == ["DEST"]
+        assert conn.execute(text("SELECT COUNT(*) FROM DEST")).scalar() == 25
+
+
+def test_upload_parallel_failure_leaves_destination_untouched(engine):
+    malo = _df(5).assign(NO_EXISTE=1)
+    # pandas >= 3 envuelve el error de SQLAlchemy en pandas.errors.DatabaseError
+    with pytest.raises((DBAPIError, pd.errors.DatabaseError), match="no column named NO_EXISTE") as exc:
+        upload_chunks(engine, [_df(5), malo, _df(5)], schema="main", table="DEST", workers=2)
+    assert isinstance(exc.value, DBAPIError) or isinstance(exc.value.__cause__, DBAPIError)
+
+    with engine.connect() as conn:
+        tablas = conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'")).scalars().all()
+        assert tablas == ["DEST"]
+        assert conn.execute(text("SELECT COUNT(*) FROM DEST")).scalar() == 0
+
+
+def test_bulk_loader_with_arrow_frame(engine, tmp_path):
+    pytest.importorskip("pyarrow")
+    df = _df().convert_dtypes(dtype_backend="pyarrow")
+    df["FECHA"] = df["FECHA"].astype("datetime64[ms]").astype("timestamp[ms][pyarrow]")
+    bulk = BulkConfig(local_dir=tmp_path / "bulk", batch_rows=10)
+    res = upload_dataframe(engine, df, schema="main", table="DEST", loader="bulk", bulk=bulk)
+
+    assert res.batch_rows == [10, 10, 5]
+    with engine.connect() as conn:
+        got = pd.read_sql(text("SELECT * FROM DEST ORDER BY ID"), conn)
+    assert got["NOMBRE"].isna().sum() == 5
+    assert got.loc[1, "FECHA"] == "2024-01-01 01:00:00.000"
+
+
+@pytest.mark.parametrize("backend", ["numpy", "pyarrow"])
+def test_bulk_keeps_empty_string_apart_from_null(engine, tmp_path, backend):
+    df = pd.DataFrame({
+        "ID": pd.array([1, 2, 3, 4], dtype="Int64"),
+        "NOMBRE": pd.array(["", None, 'con "comillas", y coma', "a\nb"], dtype="string"),
+        "FECHA": pd.array([None, "", "x", "y"], dtype="string"),
+    })
+    if backend == "pyarrow":
+        pytest.importorskip("pyarrow")
+        df = df.convert_dtypes(dtype_backend="pyarrow")
+    bulk = BulkConfig(local_dir=tmp_path / "bulk", batch_rows=10, keep_files=True)
+    upload_dataframe(engine, df, schema="main", table="DEST", loader="bulk", bulk=bulk)
+    ref = create_engine(f"sqlite:///{tmp_path / 'ref.db'}")
+    with ref.begin() as conn:
+        conn.execute(text("CREATE TABLE DEST (ID INTEGER NOT NULL, NOMBRE TEXT, FECHA TEXT)"))
+    upload_dataframe(ref, df, schema="main", table="DEST", loader="executemany")
+
+    q = text("SELECT ID, NOMBRE, FECHA FROM DEST ORDER BY ID")
+    with engine.connect() as conn:
+        got = conn.execute(q).all()
+    with ref.connect() as conn:
+        assert got == conn.execute(q).all()
+    assert got[0][1] == "" and got[1][1] is None
+    assert got[0][2] is None and got[1][2] == ""
+    assert got[2][1] == 'con "comillas", y coma' and got[3][1] == "a\nb"
@@ -0,0 +1,48 @@
+import json
+import time
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from excel_to_sql.load import upload_chunks
+from excel_to_sql.metrics import RunMetrics, peak_rss_bytes
+
+
+def test_phases_are_exclusive_and_count_round_trips(tmp_path):
+    eng = create_engine(f"sqlite:///{tmp_path / 'dest.db'}")
+    with eng.begin() as conn:
+        conn.execute(text("CREATE TABLE DEST (ID INTEGER)"))
+
+    m = RunMetrics()
+    m.attach_engine(eng)
+
+    def lento():
+        for i in range(3):
+            time.sleep(0.05)
+            yield pd.DataFrame({"ID": range(i * 10, i * 10 + 10)})
+
+    with m.phase("upload") as st:
+        res = upload_chunks(eng, m.iter_phase("read", lento()), schema="main", table="DEST")
+        st.rows += res.rows_inserted
+
+    read, upload = m.phases["read"], m.phases["upload"]
+    assert read.rows == 30 and read.calls == 3
+    assert read.seconds >= 0.15
+    assert upload.seconds < read.seconds  # el tiempo de lectura no se cuenta dos veces
+    assert upload.db_round_trips > 0 and read.db_round_trips == 0
+
+    out = tmp_path / "metrics.jsonl"
+    m.emit(stdout=False, path=out, table="main.DEST")
+    m.emit(stdout=False, path=out, table="main.DEST")
+    recs = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert [r["event"] for r in recs] == ["phase", "phase", "run"] * 2
+    assert recs[2]["table"] == "main.DEST" and recs[2]["db_round_trips"] == m.db_round_trips
+
+
+def test_peak_rss_is_the_peak_not_current_rss():
+    n = 200 * 1024 * 1024
+    buf = bytearray(n)
+    buf[::4096] = b"x" * len(range(0, n, 4096))  # toca cada página para que quede residente
+    del buf
+    peak = peak_rss_bytes()
+    assert peak is None or peak >= n
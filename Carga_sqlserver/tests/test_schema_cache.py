@@ -0,0 +1,30 @@
+import pandas as pd
+
+from excel_to_sql import schema as schema_mod
+from excel_to_sql.schema import SchemaCache, fetch_table_schema_cached
+
+
+def test_schema_cache_hit_revalidate_miss(tmp_path, monkeypatch):
+    calls = {"schema": 0, "version": "2024-01-01T00:00:00"}
+    schema_df = pd.DataFrame([{"COLUMN_NAME": "ID", "DATA_TYPE": "int", "CHARACTER_MAXIMUM_LENGTH": None, "IS_NULLABLE": "NO"}])
+
+    def fake_schema(engine, schema, table):
+        calls["schema"] += 1
+        return schema_df
+
+    monkeypatch.setattr(schema_mod, "fetch_table_schema", fake_schema)
+    monkeypatch.setattr(schema_mod, "fetch_table_version", lambda engine, schema, table: calls["version"])
+
+    cache = SchemaCache(cache_dir=tmp_path, ttl_seconds=3600)
+    kw = dict(cache=cache, server="srv", database="db")
+
+    assert fetch_table_schema_cached(None, "COE", "T", **kw)[1] == "miss"
+    df, estado = fetch_table_schema_cached(None, "COE", "T", **kw)
+    assert estado == "hit"
+    assert df["COLUMN_NAME"].tolist() == ["ID"]
+
+    cache.ttl_seconds = 0
+    assert fetch_table_schema_cached(None, "COE", "T", **kw)[1] == "revalidated"
+    calls["version"] = "2024-02-01T00:00:00"
+    assert fetch_table_schema_cached(None, "COE", "T", **kw)[1] == "miss"
+    assert calls["schema"] == 2
@@ -0,0 +1,57 @@
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from excel_to_sql.upsert import HashIndex, upsert_chunks, upsert_dataframe
+
+
+def _df(valores):
+    return pd.DataFrame({
+        "ID": pd.array(range(1, len(valores) + 1), dtype="Int64"),
+        "VALOR": pd.array(valores, dtype="string"),
+    })
+
+
+def test_upsert_stages_only_delta(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'dest.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE DEST (ID INTEGER NOT NULL PRIMARY KEY, VALOR TEXT)"))
+    index = HashIndex(tmp_path / "hash_index.sqlite")
+    kw = dict(schema="main", table="DEST", key_cols=["id"], index=index, index_key="local/main.DEST")
+
+    r1 = upsert_dataframe(engine, _df(["a", "b", "c"]), **kw)
+    assert (r1.rows_staged, r1.rows_inserted, r1.rows_updated) == (3, 3, 0)
+
+    r2 = upsert_dataframe(engine, _df(["a", "B", "c", "d"]), **kw)
+    assert (r2.rows_unchanged, r2.rows_staged, r2.rows_inserted, r2.rows_updated) == (2, 2, 1, 1)
+
+    r3 = upsert_dataframe(engine, _df(["a", "B", "c", "d"]), **kw)
+    assert r3.rows_staged == 0
+
+    with engine.connect() as conn:
+        got = conn.execute(text("SELECT VALOR FROM DEST ORDER BY ID")).scalars().all()
+    assert got == ["a", "B", "c", "d"]
+    index.close()
+
+
+def test_upsert_key_repeated_across_chunks(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'dest.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE DEST (ID INTEGER NOT NULL PRIMARY KEY, VALOR TEXT)"))
+    index = HashIndex(tmp_path / "hash_index.sqlite")
+    kw = dict(schema="main", table="DEST", key_cols=["id"], index=index, index_key="local/main.DEST")
+    upsert_dataframe(engine, _df(["a", "b"]), **kw)
+
+    # --stream: la llave 2 viene en los dos bloques; la llave 1 cambia en el primero y vuelve al valor original
+    c1 = _df(["x", "c1", "c"])
+    c2 = pd.DataFrame({"ID": pd.array([2, 1, 4], dtype="Int64"), "VALOR": pd.array(["c2", "a", "d"], dtype="string")})
+    r = upsert_chunks(engine, [c1, c2], **kw)
+    assert (r.rows_staged, r.rows_inserted, r.rows_updated) == (4, 2, 2)
+
+    with engine.connect() as conn:
+        got = conn.execute(text("SELECT ID, VALOR FROM DEST ORDER BY ID")).all()
+    assert got == [(1, "a"), (2, "c2"), (3, "c"), (4, "d")]
+
+    # el índice quedó con la última versión de cada llave
+    r2 = upsert_dataframe(engine, pd.concat([c1.iloc[2:], c2], ignore_index=True), **kw)
+    assert r2.rows_staged == 0
+    index.close()
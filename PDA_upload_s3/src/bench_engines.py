@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: motor de hilos (boto3) vs motor asyncio (aiobotocore).
+
+Genera un set sintético (muchos archivos chicos + algunos grandes) y lo sube con cada motor contra un S3 local:
+por defecto levanta `moto` en modo servidor (pip install -r requirements-dev.txt); con --endpoint-url se puede
+apuntar a MinIO. Cada motor sube a su propio prefijo con un manifest nuevo, así ninguno se salta archivos.
+
+    python src/bench_engines.py --small 2000 --small-kb 16 --large 4 --large-mb 48
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import socket
+import tempfile
+import time
+from pathlib import Path
+
+import boto3
+
+from pda_s3_uploader.aio_engine import run_async_upload
+from pda_s3_uploader.retry import RetryPolicy
+from pda_s3_uploader.scanner import scan_files
+from pda_s3_uploader.telemetry import Telemetry
+from pda_s3_uploader.uploader import upload_files
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _make_dataset(root: Path, small: int, small_kb: int, large: int, large_mb: int) -> int:
+    total = 0
+    for i in range(small):
+        p = root / "chicos" / f"{i // 500:03d}" / f"doc_{i:06d}.bin"
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(os.urandom(small_kb * 1024))  # contenido único: sin copias por hash
+        total += small_kb * 1024
+    for i in range(large):
+        p = root / "grandes" / f"grande_{i:03d}.bin"
+        p.parent.mkdir(parents=True, exist_ok=True)
+        with open(p, "wb") as fh:
+            for _ in range(large_mb):
+                fh.write(os.urandom(1024 * 1024))
+        total += large_mb * 1024 * 1024
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara los motores de subida (hilos vs asyncio) contra un S3 local.")
+    parser.add_argument("--small", type=int, default=2000, help="Cantidad de archivos chicos.")
+    parser.add_argument("--small-kb", type=int, default=16)
+    parser.add_argument("--large", type=int, default=4, help="Cantidad de archivos grandes (multipart).")
+    parser.add_argument("--large-mb", type=int, default=48)
+    parser.add_argument("--concurrency", type=int, default=64, help="Requests simultáneos (asyncio) / tope AIMD (hilos).")
+    parser.add_argument("--endpoint-url", default=os.environ.get("S3_ENDPOINT_URL"), help="S3 local ya levantado (MinIO).")
+    parser.add_argument("--bucket", default="bench-engines")
+    args = parser.parse_args()
+
+    server = None
+    endpoint = args.endpoint_url
+    if not endpoint:
+        from moto.server import ThreadedMotoServer
+
+        os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+        os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+        port = _free_port()
+        server = ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+        server.start()
+        endpoint = f"http://127.0.0.1:{port}"
+    region = os.environ.get("AWS_REGION") or "us-east-1"
+
+    work = Path(tempfile.mkdtemp(prefix="bench_engines_"))
+    try:
+        s3 = boto3.client("s3", region_name=region, endpoint_url=endpoint)
+        try:
+            s3.create_bucket(Bucket=args.bucket)
+        except s3.exceptions.BucketAlreadyOwnedByYou:
+            pass
+
+        data = work / "data"
+        total_bytes = _make_dataset(data, args.small, args.small_kb, args.large, args.large_mb)
+        n_files = args.small + args.large
+        print(f"📦 Dataset: {n_files:,} archivos ({total_bytes / 1024 ** 2:,.1f} MB) | S3: {endpoint}")
+
+        common = dict(
+            bucket=args.bucket, local_dir=data, region=region, endpoint_url=endpoint,
+            multipart_threshold_mb=16, multipart_chunksize_mb=8, large_file_workers=2, multipart_concurrency=8,
+            retry=RetryPolicy(),
+        )
+        runs = {
+            "threads": lambda tel: upload_files(
+                prefix="threads", files=scan_files(data, "*"), manifest_path=work / "threads.sqlite",
+                max_workers=8, max_workers_limit=args.concurrency, telemetry=tel, **common,
+            ),
+            "asyncio": lambda tel: run_async_upload(
+                prefix="asyncio", files=scan_files(data, "*"), manifest_path=work / "asyncio.sqlite",
+                max_concurrency=args.concurrency, telemetry=tel, **common,
+            ),
+        }
+
+        print("\n⏱️  Resultados")
+        for name, run in runs.items():
+            tel = Telemetry()
+            t0 = time.perf_counter()
+            stats = run(tel)
+            secs = time.perf_counter() - t0
+            lat = tel.report()["latency_uploaded"]
+            print(
+                f"   {name:<8} {secs:8.2f} s | {n_files / secs:8.1f} archivos/s | "
+                f"{stats.bytes_uploaded / 1024 ** 2 / secs:8.1f} MB/s | p95={lat['p95_s'] or 0:.3f}s | "
+                f"subidos={stats.uploaded:,} fallidos={stats.failed:,}"
+            )
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+        if server is not None:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1 @@
-__all__ = ["config", "scanner", "manifest", "uploader"]
+__all__ = ["config", "scanner", "manifest", "hashing", "uploader"]
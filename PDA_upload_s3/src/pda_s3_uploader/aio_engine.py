@@ -0,0 +1,414 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import math
+import mmap
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple, Union
+
+from botocore.exceptions import ClientError
+from tqdm import tqdm
+
+from .hashing import file_digests
+from .manifest import Manifest
+from .multipart import part_size_for
+from .remote import RemoteIndex
+from .retry import RetryPolicy, aretry_call
+from .scanner import ScannedFile, make_s3_key
+from .telemetry import FileRecord, Telemetry
+from .throttle import Throttle, describe_rate
+from .uploader import UploadStats, _is_not_found, _outcome
+
+COPY_OBJECT_MAX = 5 * 1024 ** 3  # CopyObject en un solo request admite hasta 5 GB
+
+# FileRecord del archivo que procesa la tarea actual (las subtareas de partes heredan el contexto)
+_current: ContextVar[Optional[FileRecord]] = ContextVar("current_file", default=None)
+
+
+class _ViewReader(io.RawIOBase):
+    """
+    Body de solo lectura sobre un memoryview (archivo mapeado con mmap): `read(n)` devuelve slices del mapa,
+    sin copiar a bytes. Es seekable porque botocore calcula el checksum y rebobina antes de enviar.
+    """
+
+    def __init__(self, view: memoryview):
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, min(len(self._view), base + offset))
+        return self._pos
+
+    def read(self, n: int = -1):
+        end = len(self._view) if n is None or n < 0 else min(len(self._view), self._pos + n)
+        chunk = self._view[self._pos:end]
+        self._pos = end
+        return chunk
+
+    def readinto(self, b) -> int:
+        chunk = self.read(len(b))
+        b[: len(chunk)] = chunk
+        return len(chunk)
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+
+@contextmanager
+def _mapped(path: Path, size: int) -> Iterator[memoryview]:
+    """Archivo mapeado en memoria (las páginas las lee el SO bajo demanda; no hay buffer propio por request)."""
+    if size == 0:
+        yield memoryview(b"")  # mmap no admite archivos vacíos
+        return
+    with open(path, "rb") as fh:
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mm)
+    try:
+        yield view
+    finally:
+        view.release()
+        try:
+            mm.close()
+        except BufferError:
+            pass  # algún slice sigue referenciado por el cliente HTTP: lo cierra el GC
+
+
+def _client(region: Optional[str], endpoint_url: Optional[str], max_pool: int):
+    try:
+        from aiobotocore.config import AioConfig
+        from aiobotocore.session import get_session
+    except ImportError as e:  # dependencia opcional
+        raise RuntimeError("El motor asyncio requiere aiobotocore: pip install aiobotocore") from e
+    cfg = AioConfig(max_pool_connections=max_pool)
+    return get_session().create_client("s3", region_name=region, endpoint_url=endpoint_url, config=cfg)
+
+
+async def _snapshot(s3, bucket: str, prefix: str) -> RemoteIndex:
+    pref = (prefix or "").strip("/")
+    pref = f"{pref}/" if pref else ""
+    idx = RemoteIndex(bucket=bucket, prefix=pref)
+    async for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=pref):
+        for obj in page.get("Contents", []):
+            idx.objects[obj["Key"]] = (int(obj["Size"]), obj["ETag"].strip('"'))
+    return idx
+
+
+async def upload_files_async(
+    *,
+    bucket: str,
+    prefix: str,
+    local_dir: Path,
+    files: Iterable[Union[Path, ScannedFile]],
+    manifest_path: Path,
+    region: Optional[str] = None,
+    endpoint_url: Optional[str] = None,
+    max_concurrency: int = 64,
+    large_file_workers: int = 2,
+    multipart_threshold_mb: int = 64,
+    multipart_chunksize_mb: int = 16,
+    multipart_concurrency: int = 8,
+    dry_run: bool = False,
+    skip_if_exists_in_s3: bool = False,
+    retry: Optional[RetryPolicy] = None,
+    telemetry: Optional[Telemetry] = None,
+    throttle: Optional[Throttle] = None,
+) -> UploadStats:
+    """
+    Motor asyncio (aiobotocore): un solo event loop y un pool de conexiones HTTP, sin hilos esperando la red.
+
+    Mismas decisiones que `uploader.upload_files` (precheck por size/mtime, hash, sin cambios, copia de
+    duplicados, `--skip-if-exists`, bitácora de fallos, multipart reanudable), con otro modelo de concurrencia:
+
+    - `max_concurrency` requests a S3 a la vez (un `asyncio.Semaphore` global, igual al pool de conexiones)
+    - archivos grandes: hasta `large_file_workers` a la vez, cada uno con `multipart_concurrency` partes
+    - los cuerpos son slices de un memoryview sobre el archivo mapeado (mmap): no se copia a bytes por request
+    - el hash (CPU + disco) corre en `asyncio.to_thread` para no bloquear el loop
+
+    No empaqueta shards (`pack_small_kb`); para eso se usa el motor de hilos. `telemetry` igual que en
+    `upload_files` (acá los bytes se cuentan al terminar cada PUT / parte). Con `throttle` cada PUT / parte
+    pide su crédito al token bucket (`aconsume`) antes de enviarse, sin bloquear el loop.
+    """
+    if not bucket:
+        raise ValueError("S3_BUCKET está vacío. Configura tu bucket en .env o variables de entorno.")
+
+    threshold = multipart_threshold_mb * 1024 * 1024
+    policy = retry or RetryPolicy()
+    manifest = Manifest.load(manifest_path)
+    stats = UploadStats(total=0, uploaded=0, skipped=0, failed=0)
+    requests = asyncio.Semaphore(max(1, max_concurrency))
+    large_files = asyncio.Semaphore(max(1, large_file_workers))
+    leaders: Dict[str, asyncio.Event] = {}
+    remote: Optional[RemoteIndex] = None
+    tel = telemetry or Telemetry()
+    tel.workers = tel.workers or max_concurrency
+    throttled_before = throttle.waited_s if throttle else 0.0
+    active_requests = active_large = 0
+
+    def _on_retry(attempt: int, e: BaseException) -> None:
+        stats.retries += 1
+        rec = _current.get()
+        if rec is not None:
+            rec.retries += 1
+
+    async def _call(make_coro):
+        """Un request con reintentos; cada intento ocupa un cupo del semáforo global."""
+        async def _attempt():
+            nonlocal active_requests
+            async with requests:
+                active_requests += 1
+                stats.peak_small_workers = max(stats.peak_small_workers, active_requests)  # medido, no el tope
+                try:
+                    return await make_coro()
+                finally:
+                    active_requests -= 1
+
+        return await aretry_call(_attempt, policy, on_retry=_on_retry)
+
+    async def _send(nbytes: int, make_coro):
+        """Request que lleva `nbytes` de cuerpo: espera que la ventana esté abierta y el crédito del bucket."""
+        async def _paced():
+            if throttle:
+                await throttle.await_open()
+                await throttle.aconsume(nbytes)
+            return await make_coro()
+
+        return await _call(_paced)
+
+    async def _put(s3, f: ScannedFile, key: str, h: str) -> None:
+        with _mapped(f.path, f.size) as view:
+            await _send(f.size, lambda: s3.put_object(
+                Bucket=bucket, Key=key, Body=_ViewReader(view), ContentLength=f.size, Metadata={"sha256": h},
+            ))
+        tel.add_bytes(f.size)
+
+    async def _multipart(s3, f: ScannedFile, key: str, h: str) -> int:
+        """Versión async de `multipart.resumable_upload` (mismo estado en el manifest, se retoma con cualquiera)."""
+        part_size = part_size_for(f.size, multipart_chunksize_mb * 1024 * 1024)
+        n_parts = max(1, math.ceil(f.size / part_size))
+        parts: Dict[int, str] = {}
+        upload_id: Optional[str] = None
+
+        state = manifest.get_multipart(f.path)
+        if state is not None:
+            same = (state["bucket"], state["key"], state["size"], state["mtime_ns"], state["part_size"]) == (
+                bucket, key, f.size, f.mtime_ns, part_size
+            )
+            if not same:
+                try:
+                    await _call(lambda: s3.abort_multipart_upload(
+                        Bucket=state["bucket"], Key=state["key"], UploadId=state["upload_id"],
+                    ))
+                except ClientError:
+                    pass
+                manifest.clear_multipart(f.path)
+            else:
+                async def _list_parts() -> Dict[int, str]:
+                    found: Dict[int, str] = {}
+                    async for page in s3.get_paginator("list_parts").paginate(
+                        Bucket=bucket, Key=key, UploadId=state["upload_id"]
+                    ):
+                        for p in page.get("Parts", []):
+                            found[int(p["PartNumber"])] = p["ETag"]
+                    return found
+
+                try:
+                    parts = await _call(_list_parts)  # S3 manda: se relista completo en cada intento
+                    upload_id = state["upload_id"]
+                except ClientError as e:
+                    if e.response.get("Error", {}).get("Code") != "NoSuchUpload":
+                        raise
+                    manifest.clear_multipart(f.path)
+        reused = len(parts)
+
+        if upload_id is None:
+            resp = await _call(lambda: s3.create_multipart_upload(Bucket=bucket, Key=key, Metadata={"sha256": h}))
+            upload_id = resp["UploadId"]
+            manifest.start_multipart(
+                f.path, bucket=bucket, key=key, upload_id=upload_id, size=f.size, mtime_ns=f.mtime_ns, part_size=part_size
+            )
+
+        part_slots = asyncio.Semaphore(max(1, multipart_concurrency))
+        with _mapped(f.path, f.size) as view:
+
+            async def _part(n: int) -> None:
+                offset = (n - 1) * part_size
+                chunk = view[offset:offset + part_size]
+                async with part_slots:
+                    t0 = time.perf_counter()
+                    resp = await _send(len(chunk), lambda: s3.upload_part(
+                        Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=n,
+                        Body=_ViewReader(chunk), ContentLength=len(chunk),
+                    ))
+                manifest.add_part(f.path, n, resp["ETag"])
+                parts[n] = resp["ETag"]
+                tel.add_bytes(len(chunk))
+                rec = _current.get()
+                if rec is not None:
+                    rec.parts.append(time.perf_counter() - t0)
+
+            todo = [n for n in range(1, n_parts + 1) if n not in parts]
+            results = await asyncio.gather(*(_part(n) for n in todo), return_exceptions=True)
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            raise errors[0]  # las partes que sí subieron quedan guardadas para la próxima corrida
+
+        await _call(lambda: s3.complete_multipart_upload(
+            Bucket=bucket, Key=key, UploadId=upload_id,
+            MultipartUpload={"Parts": [{"PartNumber": n, "ETag": parts[n]} for n in sorted(parts)]},
+        ))
+        manifest.clear_multipart(f.path)
+        return reused
+
+    async def _upload(s3, f: ScannedFile, key: str, h: str) -> Tuple[str, int]:
+        nonlocal active_large
+        if dry_run:
+            return f"DRY_RUN -> s3://{bucket}/{key}", 0
+        if f.size >= threshold:
+            async with large_files:
+                active_large += 1
+                stats.peak_large_workers = max(stats.peak_large_workers, active_large)
+                try:
+                    stats.resumed_parts += await _multipart(s3, f, key, h)
+                finally:
+                    active_large -= 1
+        else:
+            await _put(s3, f, key, h)
+        _current.get().bytes_sent = f.size
+        manifest.mark_uploaded(f.path, bucket=bucket, key=key, size=f.size, mtime_ns=f.mtime_ns, sha256=h)
+        return f"UPLOADED -> s3://{bucket}/{key}", f.size
+
+    async def _copy_or_upload(s3, f: ScannedFile, h: str, md5: Optional[str]) -> Tuple[str, int]:
+        key = make_s3_key(prefix, local_dir, f.path)
+        if remote is not None and remote.matches(key, f.size, md5):
+            manifest.mark_uploaded(f.path, bucket=bucket, key=key, size=f.size, mtime_ns=f.mtime_ns, sha256=h)
+            return "SKIP(s3 exists)", 0
+        source = manifest.find_by_hash(h)
+        if source is None or f.size > COPY_OBJECT_MAX:
+            return await _upload(s3, f, key, h)
+        if source["bucket"] == bucket and source["key"] == key:
+            manifest.mark_uploaded(f.path, bucket=bucket, key=key, size=f.size, mtime_ns=f.mtime_ns, sha256=h)
+            return "SKIP(same key)", 0
+        if dry_run:
+            return f"DRY_RUN COPY s3://{source['bucket']}/{source['key']} -> s3://{bucket}/{key}", 0
+        try:
+            await _call(lambda: s3.copy_object(
+                Bucket=bucket, Key=key, CopySource={"Bucket": source["bucket"], "Key": source["key"]},
+            ))
+        except ClientError as e:
+            if not _is_not_found(e):
+                raise
+            return await _upload(s3, f, key, h)  # el origen ya no está en S3
+        manifest.mark_uploaded(f.path, bucket=bucket, key=key, size=f.size, mtime_ns=f.mtime_ns, sha256=h)
+        return f"COPIED -> s3://{bucket}/{key}", f.size
+
+    async def _process(s3, f: ScannedFile) -> Tuple[str, int]:
+        h, md5 = await asyncio.to_thread(file_digests, f.path, md5=remote is not None)
+        entry = manifest.get(f.path)
+        if entry and (entry.get("sha256") == h or (entry.get("sha256") is None and entry.get("size") == f.size)):
+            if not dry_run:
+                manifest.mark_uploaded(
+                    f.path, bucket=entry["bucket"], key=entry["key"], size=f.size, mtime_ns=f.mtime_ns,
+                    sha256=h, member=entry.get("member"),
+                )
+            return "UNCHANGED", f.size
+
+        first = leaders.get(h)
+        if first is not None:
+            await first.wait()  # el primero ya está subiendo; este se copia desde ese objeto
+            return await _copy_or_upload(s3, f, h, md5)
+        leaders[h] = asyncio.Event()
+        try:
+            return await _copy_or_upload(s3, f, h, md5)
+        finally:
+            leaders[h].set()
+
+    async def _one(s3, f: ScannedFile) -> Tuple[str, int]:
+        rec = FileRecord(path=f.path.as_posix(), size=f.size)
+        _current.set(rec)  # cada tarea tiene su propia copia del contexto
+        t0 = time.perf_counter()
+        try:
+            result = await _process(s3, f)
+        except Exception as e:
+            manifest.record_failure(f.path, e)
+            result = ("FAILED", 0)
+        rec.seconds = time.perf_counter() - t0
+        rec.outcome = _outcome(result[0])
+        tel.record(rec)
+        tel.expect(rec.bytes_sent - f.size)
+        return result
+
+    def _collect(task: "asyncio.Task[Tuple[str, int]]") -> None:
+        msg, nbytes = task.result()
+        if msg == "FAILED":
+            stats.failed += 1
+        elif msg == "UNCHANGED":
+            stats.skipped += 1
+            stats.unchanged += 1
+            stats.bytes_saved += nbytes
+        elif msg.startswith("SKIP"):
+            stats.skipped += 1
+        elif msg.startswith("COPIED"):
+            stats.copied += 1
+            stats.bytes_saved += nbytes
+        else:
+            stats.uploaded += 1
+            stats.bytes_uploaded += nbytes
+        bar.update(1)
+        bar.set_postfix(
+            vistos=stats.total, **tel.postfix(), **({"límite": describe_rate(throttle.rate)} if throttle else {}),
+            refresh=False,
+        )
+
+    bar = tqdm(total=0, desc="Subiendo a S3 (asyncio)")
+    max_in_flight = max(1, max_concurrency) * 4
+    in_flight: Set[asyncio.Task] = set()
+    try:
+        async with _client(region, endpoint_url, max(1, max_concurrency)) as s3:
+            if skip_if_exists_in_s3:
+                remote = await _snapshot(s3, bucket, prefix)
+                stats.remote_objects = len(remote)
+
+            for f in files:
+                f = ScannedFile.of(f)
+                stats.total += 1
+                if manifest.is_unchanged(f.path, size=f.size, mtime_ns=f.mtime_ns):
+                    stats.skipped += 1
+                    continue
+                bar.total += 1
+                bar.refresh()
+                tel.expect(f.size)
+                in_flight.add(asyncio.create_task(_one(s3, f)))
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for t in done:
+                        _collect(t)
+                else:
+                    await asyncio.sleep(0)  # deja avanzar las tareas mientras se recorre la carpeta
+            if in_flight:
+                done, _ = await asyncio.wait(in_flight)
+                for t in done:
+                    _collect(t)
+    finally:
+        bar.close()
+        manifest.close()
+    stats.throttled_s = (throttle.waited_s - throttled_before) if throttle else 0.0
+    return stats
+
+
+def run_async_upload(**kwargs) -> UploadStats:
+    """Punto de entrada síncrono (CLI / notebooks sin loop corriendo)."""
+    return asyncio.run(upload_files_async(**kwargs))
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .hashing import BLOCK_SIZE
+from .scanner import _normalize_pattern
+
+CODECS = ("gzip", "zstd")
+MIN_SAVING = 0.10  # si comprimido no ahorra al menos 10 %, se sube el original (PDFs, imágenes, zips)
+
+
+@dataclass(frozen=True)
+class CompressionRule:
+    pattern: str
+    codec: str          # "gzip" | "zstd" (también es el Content-Encoding)
+    level: int
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as e:  # dependencia opcional
+        raise RuntimeError("La compresión zstd requiere zstandard: pip install zstandard") from e
+    return zstandard
+
+
+def parse_rules(spec: str) -> List[CompressionRule]:
+    """
+    "*.csv=gzip;*.txt=zstd:3;**/*.json=gzip:9" → reglas (la primera que coincide gana).
+    Nivel por defecto: gzip 6, zstd 3.
+    """
+    rules: List[CompressionRule] = []
+    for item in (spec or "").replace(",", ";").split(";"):
+        if not item.strip():
+            continue
+        pattern, _, codec = item.partition("=")
+        codec, _, level = codec.strip().lower().partition(":")
+        if not pattern.strip() or codec not in CODECS:
+            raise ValueError(f"Regla de compresión inválida '{item}' (formato patrón=gzip|zstd[:nivel])")
+        if codec == "zstd":
+            _zstd()  # error claro al arrancar, no en el primer archivo
+        default = 6 if codec == "gzip" else 3
+        rules.append(CompressionRule(_normalize_pattern(pattern.strip()), codec, int(level) if level else default))
+    return rules
+
+
+def rule_for(rules: List[CompressionRule], rel_path: Path) -> Optional[CompressionRule]:
+    for r in rules:
+        if rel_path.match(r.pattern):
+            return r
+    return None
+
+
+@dataclass
+class Compressed:
+    """Archivo comprimido temporal listo para subir (borrarlo con `discard`)."""
+    path: Path
+    size: int
+    md5: str        # del comprimido: es el ETag de un PUT simple (sirve para --skip-if-exists)
+    codec: str
+    raw_size: int
+
+    @property
+    def worth_it(self) -> bool:
+        return self.size <= self.raw_size * (1 - MIN_SAVING)
+
+    def discard(self) -> None:
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class _HashingWriter:
+    """Destino del compresor: escribe al archivo temporal y va calculando md5 y tamaño del comprimido."""
+
+    def __init__(self, fh):
+        self._fh = fh
+        self.md5 = hashlib.md5()
+        self.size = 0
+
+    def write(self, data) -> int:
+        self._fh.write(data)
+        self.md5.update(data)
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        self._fh.flush()
+
+
+def compress_with_digests(
+    src: Path, rule: CompressionRule, *, md5: bool = False, block_size: int = BLOCK_SIZE
+) -> Tuple[str, Optional[str], Compressed]:
+    """
+    Una sola lectura del original: cada bloque actualiza sha256 (y md5) del original y entra al compresor.
+    Devuelve (sha256, md5 del original, Compressed). zlib y zstandard sueltan el GIL: en el pool de hilos
+    del uploader varios archivos se comprimen en paralelo mientras otros suben.
+    """
+    h = hashlib.sha256()
+    m = hashlib.md5() if md5 else None
+    fd, tmp = tempfile.mkstemp(suffix=f".{rule.codec}")
+    raw_size = 0
+    try:
+        with os.fdopen(fd, "wb") as out, open(src, "rb") as fh:
+            writer = _HashingWriter(out)
+            if rule.codec == "gzip":
+                # mtime=0 y sin nombre: mismo contenido → mismos bytes (y mismo ETag) en cada corrida
+                comp = gzip.GzipFile(filename="", mode="wb", fileobj=writer, compresslevel=rule.level, mtime=0)
+            else:
+                comp = _zstd().ZstdCompressor(level=rule.level).stream_writer(writer, closefd=False)
+            with comp:
+                for block in iter(lambda: fh.read(block_size), b""):
+                    h.update(block)
+                    if m is not None:
+                        m.update(block)
+                    comp.write(block)
+                    raw_size += len(block)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    packed = Compressed(Path(tmp), writer.size, writer.md5.hexdigest(), rule.codec, raw_size)
+    return h.hexdigest(), (m.hexdigest() if m is not None else None), packed
+
+
+def decompress(data: bytes, content_encoding: Optional[str]) -> bytes:
+    """Para leer de vuelta un objeto subido comprimido (`get_object(...)["ContentEncoding"]`)."""
+    if content_encoding == "gzip":
+        return gzip.decompress(data)
+    if content_encoding == "zstd":
+        return _zstd().ZstdDecompressor().decompressobj().decompress(data)  # el frame no trae el tamaño
+    return data
+
+
+def read_object(s3, bucket: str, key: str) -> bytes:
+    """GET + descompresión según Content-Encoding (boto3 no descomprime solo)."""
+    obj = s3.get_object(Bucket=bucket, Key=key)
+    return decompress(obj["Body"].read(), obj.get("ContentEncoding"))
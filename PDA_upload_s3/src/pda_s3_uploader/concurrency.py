@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from .retry import is_retryable
+
+
+class AIMDLimiter:
+    """
+    Límite de transferencias simultáneas que se ajusta solo (AIMD, como el control de congestión de TCP):
+
+    - cada `limit` transferencias completas se mide el throughput (bytes/s) de esa ventana
+    - sin errores y sin caída de throughput (más de `tolerance`) → `limit += 1`  (aumento aditivo)
+    - un error de congestión (timeout, SlowDown/503, conexión) → `limit //= 2` de inmediato (disminución multiplicativa);
+      otros errores (archivo local, Ctrl+C) solo liberan el cupo, sin tocar el límite ni la ventana
+
+    Los hilos del pool pueden ser más que `limit`: el limitador decide cuántos están usando la red.
+    """
+
+    def __init__(self, initial: int, *, minimum: int = 1, maximum: int = 64, tolerance: float = 0.05):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = max(self.minimum, min(initial, self.maximum))
+        self.tolerance = tolerance
+        self.peak = self.limit
+        self.history: List[int] = [self.limit]
+
+        self._cond = threading.Condition()
+        self._active = 0
+        self._prev_rate = 0.0
+        self._reset_window()
+
+    def _reset_window(self) -> None:
+        self._win_start = time.perf_counter()
+        self._win_bytes = 0
+        self._win_count = 0
+
+    def _set_limit(self, value: int) -> None:
+        value = max(self.minimum, min(value, self.maximum))
+        if value != self.limit:
+            self.limit = value
+            self.peak = max(self.peak, value)
+            self.history.append(value)
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._active >= self.limit:
+                self._cond.wait()
+            self._active += 1
+
+    def release(self, *, ok: bool = True, nbytes: int = 0) -> None:
+        with self._cond:
+            self._active -= 1
+            if not ok:
+                self._set_limit(self.limit // 2)
+                self._prev_rate = 0.0
+                self._reset_window()
+            else:
+                self._win_bytes += nbytes
+                self._win_count += 1
+                if self._win_count >= self.limit:
+                    elapsed = max(time.perf_counter() - self._win_start, 1e-6)
+                    rate = self._win_bytes / elapsed
+                    if rate >= self._prev_rate * (1 - self.tolerance):
+                        self._set_limit(self.limit + 1)
+                    self._prev_rate = rate
+                    self._reset_window()
+            self._cond.notify_all()
+
+    def _free(self) -> None:
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, nbytes: int = 0) -> Iterator[None]:
+        self.acquire()
+        try:
+            yield
+        except BaseException as e:
+            if is_retryable(e):
+                self.release(ok=False)
+            else:
+                self._free()
+            raise
+        self.release(ok=True, nbytes=nbytes)
@@ -12,10 +12,26 @@ class S3UploadConfig:
     local_dir: Path
     pattern: str = "*"
     region: str | None = None
-    manifest_path: Path = Path("outputs/manifest.json")
+    manifest_path: Path = Path("outputs/manifest.sqlite")
     max_workers: int = 8
     multipart_threshold_mb: int = 64
     multipart_chunksize_mb: int = 16
+    max_workers_limit: int = 64
+    large_file_workers: int = 2
+    multipart_concurrency: int = 8
+    pack_small_kb: int = 0
+    shard_mb: int = 64
+    retry_attempts: int = 5
+    retry_base_s: float = 0.5
+    retry_max_s: float = 30.0
+    engine: str = "threads"
+    endpoint_url: str | None = None
+    report_path: Path = Path("outputs/upload_report.json")
+    bandwidth_mb_s: float = 0.0
+    bandwidth_schedule: str = ""
+    watch_debounce_s: float = 2.0
+    watch_reconcile_min: float = 15.0
+    compress: str = ""
     dry_run: bool = False
 
 
@@ -30,9 +46,25 @@ def load_from_env() -> S3UploadConfig:
         local_dir=local_dir,
         pattern=os.environ.get("FILE_PATTERN", "*").strip() or "*",
         region=os.environ.get("AWS_REGION") or None,
-        manifest_path=Path(os.environ.get("MANIFEST_PATH", "outputs/manifest.json")),
+        manifest_path=Path(os.environ.get("MANIFEST_PATH", "outputs/manifest.sqlite")),
         max_workers=int(os.environ.get("MAX_WORKERS", "8")),
         multipart_threshold_mb=int(os.environ.get("MULTIPART_THRESHOLD_MB", "64")),
         multipart_chunksize_mb=int(os.environ.get("MULTIPART_CHUNKSIZE_MB", "16")),
+        max_workers_limit=int(os.environ.get("MAX_WORKERS_LIMIT", "64")),
+        large_file_workers=int(os.environ.get("LARGE_FILE_WORKERS", "2")),
+        multipart_concurrency=int(os.environ.get("MULTIPART_CONCURRENCY", "8")),
+        pack_small_kb=int(os.environ.get("PACK_SMALL_KB", "0")),
+        shard_mb=int(os.environ.get("SHARD_MB", "64")),
+        retry_attempts=int(os.environ.get("RETRY_ATTEMPTS", "5")),
+        retry_base_s=float(os.environ.get("RETRY_BASE_S", "0.5")),
+        retry_max_s=float(os.environ.get("RETRY_MAX_S", "30")),
+        engine=os.environ.get("UPLOAD_ENGINE", "threads").strip().lower() or "threads",
+        endpoint_url=os.environ.get("S3_ENDPOINT_URL") or None,
+        report_path=Path(os.environ.get("REPORT_PATH", "outputs/upload_report.json")),
+        bandwidth_mb_s=float(os.environ.get("BANDWIDTH_MB_S", "0") or 0),
+        bandwidth_schedule=os.environ.get("BANDWIDTH_SCHEDULE", "").strip(),
+        watch_debounce_s=float(os.environ.get("WATCH_DEBOUNCE_S", "2")),
+        watch_reconcile_min=float(os.environ.get("WATCH_RECONCILE_MIN", "15")),
+        compress=os.environ.get("COMPRESS", "").strip(),
         dry_run=os.environ.get("DRY_RUN", "no").lower() in {"1","true","yes","y"},
     )
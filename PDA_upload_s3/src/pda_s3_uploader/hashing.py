@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Optional, Tuple
+
+BLOCK_SIZE = 1024 * 1024
+
+
+def file_digests(path: Path, *, md5: bool = False, block_size: int = BLOCK_SIZE) -> Tuple[str, Optional[str]]:
+    """
+    sha256 (y opcionalmente md5, para comparar con el ETag de S3) en una sola lectura por bloques
+    (memoria constante, sirve para archivos de GB).
+    """
+    h = hashlib.sha256()
+    m = hashlib.md5() if md5 else None
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(block_size), b""):
+            h.update(block)
+            if m is not None:
+                m.update(block)
+    return h.hexdigest(), (m.hexdigest() if m is not None else None)
+
+
+def sha256_file(path: Path, block_size: int = BLOCK_SIZE) -> str:
+    return file_digests(path, block_size=block_size)[0]
+
@@ -1,29 +1,232 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+import sqlite3
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+
+from .retry import root_cause
+
+# (bucket, key, size, mtime_ns, sha256, member) — member: nombre dentro del shard .tar si se empaquetó
+_Row = Tuple[str, str, int, Optional[int], Optional[str], Optional[str]]
+_FIELDS = ("bucket", "key", "size", "mtime_ns", "sha256", "member")
+
+
+def _entry(row: _Row) -> Dict[str, Any]:
+    return dict(zip(_FIELDS, row))
 
 
-@dataclass
 class Manifest:
-    uploaded: Dict[str, Any]
+    """
+    Manifest en SQLite (WAL): qué archivo local ya está en S3.
+
+    - lecturas O(1) desde un índice en memoria (ruta → fila, sha256 → ruta)
+    - `mark_uploaded` es thread-safe y solo encola; `flush()` escribe el delta en una transacción
+      (cada `batch_size` marcas, o al final), en vez de reescribir todo el archivo
+    - `compact()` hace VACUUM (y opcionalmente borra entradas de archivos que ya no existen)
+    - bitácora de fallos (`failed`) y estado de multipart reanudables (`multipart`, `multipart_part`)
+
+    Al crear el SQLite se importa una vez el `manifest.json` del formato anterior: `path` si apunta a un .json, si no
+    el JSON hermano (`manifest.sqlite` → `manifest.json`, el default viejo). El JSON importado queda como
+    `manifest.json.migrated`.
+    """
+
+    def __init__(self, path: Path, *, batch_size: int = 500):
+        path = Path(path)
+        is_json = path.suffix.lower() == ".json"
+        self.path = path.with_suffix(".sqlite") if is_json else path
+        legacy_json = path if is_json else path.with_suffix(".json")
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending: Dict[str, _Row] = {}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not self.path.exists()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS uploaded ("
+            " path TEXT PRIMARY KEY, bucket TEXT NOT NULL, key TEXT NOT NULL,"
+            " size INTEGER NOT NULL, mtime_ns INTEGER, sha256 TEXT, member TEXT)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS failed ("
+            " path TEXT PRIMARY KEY, error_class TEXT, message TEXT, runs INTEGER NOT NULL DEFAULT 1, ts TEXT)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS multipart ("
+            " path TEXT PRIMARY KEY, bucket TEXT, key TEXT, upload_id TEXT,"
+            " size INTEGER, mtime_ns INTEGER, part_size INTEGER)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS multipart_part ("
+            " path TEXT, part_number INTEGER, etag TEXT, PRIMARY KEY (path, part_number))"
+        )
+        cols = {r[1] for r in self._conn.execute("PRAGMA table_info(uploaded)")}
+        if "member" not in cols:
+            self._conn.execute("ALTER TABLE uploaded ADD COLUMN member TEXT")
+        self._conn.commit()
+
+        if is_new and legacy_json.exists():
+            data = json.loads(legacy_json.read_text(encoding="utf-8")).get("uploaded", {})
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO uploaded VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(p, e["bucket"], e["key"], e["size"], e.get("mtime_ns"), e.get("sha256"), None) for p, e in data.items()],
+                )
+            # ya importado: que nadie lo vuelva a usar como manifest vigente
+            legacy_json.replace(legacy_json.with_name(legacy_json.name + ".migrated"))
+
+        self._rows: Dict[str, _Row] = {}
+        self._by_hash: Dict[str, str] = {}
+        for p, *row in self._conn.execute("SELECT path, bucket, key, size, mtime_ns, sha256, member FROM uploaded"):
+            self._rows[p] = tuple(row)
+            if row[4] and not row[5]:
+                self._by_hash[row[4]] = p
 
     @staticmethod
     def load(path: Path) -> "Manifest":
-        if path.exists():
-            data = json.loads(path.read_text(encoding="utf-8"))
-            return Manifest(uploaded=data.get("uploaded", {}))
-        return Manifest(uploaded={})
+        return Manifest(path)
 
-    def save(self, path: Path) -> None:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        payload = {"uploaded": self.uploaded}
-        path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get(self, local_path: Path) -> Optional[Dict[str, Any]]:
+        row = self._rows.get(local_path.as_posix())
+        return _entry(row) if row else None
 
     def is_uploaded(self, local_path: Path) -> bool:
-        return local_path.as_posix() in self.uploaded
+        return local_path.as_posix() in self._rows
+
+    def is_unchanged(self, local_path: Path, *, size: int, mtime_ns: int) -> bool:
+        """Chequeo barato (sin leer el archivo): mismo tamaño y mtime que cuando se subió."""
+        row = self._rows.get(local_path.as_posix())
+        return bool(row) and row[2] == size and row[3] == mtime_ns
+
+    def find_by_hash(self, sha256: str) -> Optional[Dict[str, Any]]:
+        p = self._by_hash.get(sha256)
+        return self.get(Path(p)) if p else None
+
+    def mark_uploaded(
+        self,
+        local_path: Path,
+        *,
+        bucket: str,
+        key: str,
+        size: int,
+        mtime_ns: Optional[int] = None,
+        sha256: Optional[str] = None,
+        member: Optional[str] = None,
+    ) -> None:
+        p = local_path.as_posix()
+        row: _Row = (bucket, key, size, mtime_ns, sha256, member)
+        with self._lock:
+            old = self._rows.get(p)
+            if old and old[4] and self._by_hash.get(old[4]) == p:
+                del self._by_hash[old[4]]  # ese key ya no tiene el contenido anterior
+            self._rows[p] = row
+            if sha256 and not member:  # un archivo dentro de un .tar no sirve de origen para CopyObject
+                self._by_hash[sha256] = p
+            self._pending[p] = row
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def _flush_locked(self) -> int:
+        if not self._pending:
+            return 0
+        batch: List[tuple] = [(p, *row) for p, row in self._pending.items()]
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO uploaded VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+            self._conn.executemany("DELETE FROM failed WHERE path = ?", [(b[0],) for b in batch])  # ya subió
+        self._pending.clear()
+        return len(batch)
+
+    def flush(self) -> int:
+        """Escribe las marcas pendientes (O(delta)). Devuelve cuántas filas se escribieron."""
+        with self._lock:
+            return self._flush_locked()
+
+    def save(self, path: Optional[Path] = None) -> None:
+        # compatibilidad con el manifest JSON: ahora solo persiste el delta
+        self.flush()
+
+    # ---- bitácora de fallos -------------------------------------------------
+
+    def record_failure(self, local_path: Path, error: BaseException) -> None:
+        """Guarda (de inmediato) la clase y el mensaje del error; `runs` cuenta en cuántas corridas falló."""
+        p = local_path.as_posix()
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO failed (path, error_class, message, runs, ts) VALUES (?, ?, ?, 1, ?)"
+                    " ON CONFLICT(path) DO UPDATE SET error_class = excluded.error_class,"
+                    " message = excluded.message, runs = runs + 1, ts = excluded.ts",
+                    (p, type(root_cause(error)).__name__, str(error)[:2000], time.strftime("%Y-%m-%dT%H:%M:%S")),
+                )
+
+    def failures(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._flush_locked()
+            cur = self._conn.execute("SELECT path, error_class, message, runs, ts FROM failed ORDER BY path")
+            return [dict(zip(("path", "error_class", "message", "runs", "ts"), r)) for r in cur]
+
+    # ---- multipart reanudable ------------------------------------------------
+
+    def get_multipart(self, local_path: Path) -> Optional[Dict[str, Any]]:
+        p = local_path.as_posix()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT bucket, key, upload_id, size, mtime_ns, part_size FROM multipart WHERE path = ?", (p,)
+            ).fetchone()
+            if row is None:
+                return None
+            parts = dict(self._conn.execute("SELECT part_number, etag FROM multipart_part WHERE path = ?", (p,)))
+        state = dict(zip(("bucket", "key", "upload_id", "size", "mtime_ns", "part_size"), row))
+        state["parts"] = parts
+        return state
+
+    def start_multipart(
+        self, local_path: Path, *, bucket: str, key: str, upload_id: str, size: int, mtime_ns: int, part_size: int
+    ) -> None:
+        p = local_path.as_posix()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM multipart_part WHERE path = ?", (p,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO multipart VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (p, bucket, key, upload_id, size, mtime_ns, part_size),
+            )
+
+    def add_part(self, local_path: Path, part_number: int, etag: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO multipart_part VALUES (?, ?, ?)", (local_path.as_posix(), part_number, etag)
+            )
+
+    def clear_multipart(self, local_path: Path) -> None:
+        p = local_path.as_posix()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM multipart_part WHERE path = ?", (p,))
+            self._conn.execute("DELETE FROM multipart WHERE path = ?", (p,))
+
+    def compact(self, *, prune_missing: bool = False) -> int:
+        """VACUUM del archivo; con `prune_missing` borra entradas cuyo archivo local ya no existe."""
+        with self._lock:
+            self._flush_locked()
+            gone = [p for p in self._rows if not Path(p).exists()] if prune_missing else []
+            if gone:
+                with self._conn:
+                    self._conn.executemany("DELETE FROM uploaded WHERE path = ?", [(p,) for p in gone])
+                for p in gone:
+                    del self._rows[p]
+                self._by_hash = {row[4]: p for p, row in self._rows.items() if row[4] and not row[5]}
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.execute("VACUUM")
+            return len(gone)
 
-    def mark_uploaded(self, local_path: Path, *, bucket: str, key: str, size: int) -> None:
-        self.uploaded[local_path.as_posix()] = {"bucket": bucket, "key": key, "size": size}
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from botocore.exceptions import ClientError
+
+from .manifest import Manifest
+from .scanner import ScannedFile
+
+MAX_PARTS = 10_000
+
+
+def part_size_for(size: int, part_size: int) -> int:
+    # S3 admite hasta 10.000 partes: en archivos enormes se agranda la parte
+    return max(part_size, math.ceil(size / MAX_PARTS))
+
+
+def _list_parts(s3, bucket: str, key: str, upload_id: str) -> Dict[int, str]:
+    parts: Dict[int, str] = {}
+    for page in s3.get_paginator("list_parts").paginate(Bucket=bucket, Key=key, UploadId=upload_id):
+        for p in page.get("Parts", []):
+            parts[int(p["PartNumber"])] = p["ETag"]
+    return parts
+
+
+def _abort(s3, bucket: str, key: str, upload_id: str) -> None:
+    try:
+        s3.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+    except ClientError:
+        pass  # ya no existe: nada que limpiar
+
+
+def resumable_upload(
+    s3,
+    *,
+    bucket: str,
+    key: str,
+    f: ScannedFile,
+    store: Manifest,
+    part_size: int,
+    concurrency: int = 8,
+    extra_args: Optional[dict] = None,
+    call: Callable = lambda fn: fn(),
+    on_part: Optional[Callable[[int, int, float], None]] = None,
+    pace: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Multipart que sobrevive a un corte: el UploadId y cada parte completada quedan en el manifest.
+    En la siguiente corrida se consulta `list_parts` (S3 manda) y solo se suben las partes faltantes.
+    Si el archivo cambió (size/mtime) o el upload expiró, se aborta y se empieza de cero.
+
+    `call` envuelve cada request (reintentos con backoff); `on_part(n, bytes, segundos)` se llama al terminar
+    cada parte (telemetría) y `pace(bytes)` antes de enviarla (límite de ancho de banda).
+    Devuelve cuántas partes se reutilizaron.
+    """
+    part_size = part_size_for(f.size, part_size)
+    n_parts = max(1, math.ceil(f.size / part_size))
+    extra_args = extra_args or {}
+
+    state = store.get_multipart(f.path)
+    parts: Dict[int, str] = {}
+    upload_id: Optional[str] = None
+    if state is not None:
+        same = (state["bucket"], state["key"], state["size"], state["mtime_ns"], state["part_size"]) == (
+            bucket, key, f.size, f.mtime_ns, part_size
+        )
+        if not same:
+            _abort(s3, state["bucket"], state["key"], state["upload_id"])
+            store.clear_multipart(f.path)
+        else:
+            try:
+                parts = call(lambda: _list_parts(s3, bucket, key, state["upload_id"]))
+                upload_id = state["upload_id"]
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") != "NoSuchUpload":
+                    raise
+                store.clear_multipart(f.path)  # expiró o lo abortó una regla de ciclo de vida
+    reused = len(parts)
+
+    if upload_id is None:
+        upload_id = call(lambda: s3.create_multipart_upload(Bucket=bucket, Key=key, **extra_args))["UploadId"]
+        store.start_multipart(
+            f.path, bucket=bucket, key=key, upload_id=upload_id, size=f.size, mtime_ns=f.mtime_ns, part_size=part_size
+        )
+
+    def _part(n: int) -> None:
+        offset = (n - 1) * part_size
+        t0 = time.perf_counter()
+        with open(f.path, "rb") as fh:
+            fh.seek(offset)
+            body = fh.read(min(part_size, f.size - offset))
+        if pace:
+            pace(len(body))
+        resp = call(lambda: s3.upload_part(Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=n, Body=body))
+        store.add_part(f.path, n, resp["ETag"])
+        parts[n] = resp["ETag"]
+        if on_part:
+            on_part(n, len(body), time.perf_counter() - t0)
+
+    todo = [n for n in range(1, n_parts + 1) if n not in parts]
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as ex:
+        list(ex.map(_part, todo))  # propaga el primer error; las partes ya subidas quedan guardadas
+
+    call(lambda: s3.complete_multipart_upload(
+        Bucket=bucket,
+        Key=key,
+        UploadId=upload_id,
+        MultipartUpload={"Parts": [{"PartNumber": n, "ETag": parts[n]} for n in sorted(parts)]},
+    ))
+    store.clear_multipart(f.path)
+    return reused
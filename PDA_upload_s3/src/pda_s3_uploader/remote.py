@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+
+@dataclass
+class RemoteIndex:
+    """
+    Foto del prefijo destino en S3: key → (size, ETag), armada con una sola pasada paginada de
+    ListObjectsV2 (1 request por cada 1000 objetos, en vez de un head_object por archivo).
+    """
+    bucket: str
+    prefix: str
+    objects: Dict[str, Tuple[int, str]] = field(default_factory=dict)
+
+    @staticmethod
+    def snapshot(s3, bucket: str, prefix: str = "") -> "RemoteIndex":
+        pref = (prefix or "").strip("/")
+        pref = f"{pref}/" if pref else ""
+        idx = RemoteIndex(bucket=bucket, prefix=pref)
+        for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=pref):
+            for obj in page.get("Contents", []):
+                idx.objects[obj["Key"]] = (int(obj["Size"]), obj["ETag"].strip('"'))
+        return idx
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def matches(self, key: str, size: int, md5: Optional[str] = None) -> bool:
+        """
+        True si el objeto existe con el mismo tamaño. Si además hay md5 local y el ETag es de un PUT simple
+        (sin "-N" de multipart), también se exige ETag == md5.
+        """
+        obj = self.objects.get(key)
+        if obj is None or obj[0] != size:
+            return False
+        etag = obj[1]
+        if md5 is None or "-" in etag:
+            return True
+        return etag == md5
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from boto3.exceptions import S3UploadFailedError
+from botocore.exceptions import (
+    ClientError,
+    ConnectionClosedError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    ReadTimeoutError,
+)
+
+T = TypeVar("T")
+
+RETRYABLE_CODES = {
+    "SlowDown", "Throttling", "ThrottlingException", "RequestTimeout", "RequestTimeTooSkewed",
+    "InternalError", "ServiceUnavailable", "500", "502", "503", "504",
+}
+
+
+@dataclass
+class RetryPolicy:
+    attempts: int = 5
+    base_s: float = 0.5
+    max_s: float = 30.0
+
+    def delay(self, attempt: int) -> float:
+        # "full jitter": espera aleatoria en [0, min(max, base * 2^n)] para no reintentar todos a la vez
+        return random.uniform(0, min(self.max_s, self.base_s * (2 ** attempt)))
+
+
+def root_cause(e: BaseException) -> BaseException:
+    """`upload_file` envuelve el ClientError en S3UploadFailedError: se mira el error original."""
+    if isinstance(e, S3UploadFailedError):
+        inner = e.__cause__ or e.__context__
+        if inner is not None:
+            return inner
+    return e
+
+
+def is_retryable(e: BaseException) -> bool:
+    e = root_cause(e)
+    if isinstance(e, (EndpointConnectionError, ConnectionClosedError, ReadTimeoutError, ConnectTimeoutError)):
+        return True
+    if isinstance(e, ClientError):
+        err = e.response.get("Error", {})
+        status = str(e.response.get("ResponseMetadata", {}).get("HTTPStatusCode", ""))
+        return err.get("Code", "") in RETRYABLE_CODES or status in RETRYABLE_CODES
+    # errores de red a nivel socket (VPN caída); los de archivo local (no existe / permisos) no se reintentan
+    return isinstance(e, (ConnectionError, TimeoutError))
+
+
+def retry_call(
+    fn: Callable[[], T],
+    policy: RetryPolicy,
+    *,
+    on_retry: Optional[Callable[[int, BaseException], None]] = None,
+) -> T:
+    """Ejecuta `fn` con reintentos y backoff exponencial con jitter; errores no transitorios se propagan de una."""
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            attempt += 1
+            if attempt >= policy.attempts or not is_retryable(e):
+                raise
+            if on_retry:
+                on_retry(attempt, e)
+            time.sleep(policy.delay(attempt))
+
+
+async def aretry_call(
+    fn: Callable[[], Awaitable[T]],
+    policy: RetryPolicy,
+    *,
+    on_retry: Optional[Callable[[int, BaseException], None]] = None,
+) -> T:
+    """Igual que `retry_call` para el motor asyncio: `fn` devuelve una corrutina nueva en cada intento."""
+    attempt = 0
+    while True:
+        try:
+            return await fn()
+        except Exception as e:
+            attempt += 1
+            if attempt >= policy.attempts or not is_retryable(e):
+                raise
+            if on_retry:
+                on_retry(attempt, e)
+            await asyncio.sleep(policy.delay(attempt))
@@ -1,12 +1,71 @@
 from __future__ import annotations
 
+import os
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterator, Union
 
 
-def iter_files(local_dir: Path, pattern: str) -> list[Path]:
+@dataclass(frozen=True)
+class ScannedFile:
+    """Archivo encontrado + stat del DirEntry (en Windows scandir ya trae size/mtime sin otra llamada)."""
+    path: Path
+    size: int
+    mtime_ns: int
+
+    @staticmethod
+    def of(path: Union[Path, "ScannedFile"]) -> "ScannedFile":
+        if isinstance(path, ScannedFile):
+            return path
+        st = path.stat()
+        return ScannedFile(path, st.st_size, st.st_mtime_ns)
+
+
+def _normalize_pattern(pattern: str) -> str:
+    # rglob ya es recursivo: "**/*.pdf" equivale a "*.pdf" (y también debe incluir la raíz)
+    pattern = (pattern or "*").replace("\\", "/")
+    while pattern.startswith("**/"):
+        pattern = pattern[3:]
+    return pattern or "*"
+
+
+def scan_files(local_dir: Path, pattern: str) -> Iterator[ScannedFile]:
+    """
+    Recorre `local_dir` con os.scandir y entrega cada archivo apenas se encuentra (no arma la lista completa).
+    Mismo criterio que `rglob(pattern)`: el patrón se compara contra la ruta relativa desde la derecha.
+    """
     if not local_dir.exists():
         raise FileNotFoundError(f"No existe la carpeta local: {local_dir}")
-    return sorted([p for p in local_dir.rglob(pattern) if p.is_file()])
+
+    pat = _normalize_pattern(pattern)
+    stack = [local_dir]
+    while stack:
+        current = stack.pop()
+        try:
+            it = os.scandir(current)
+        except OSError:
+            continue  # carpeta sin permisos / borrada durante el recorrido
+        with it:
+            subdirs = []
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(Path(entry.path))
+                        continue
+                    if not entry.is_file():
+                        continue
+                    path = Path(entry.path)
+                    if not path.relative_to(local_dir).match(pat):  # mismo sabor de ruta que rglob (en Windows sin mayúsculas)
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                yield ScannedFile(path, st.st_size, st.st_mtime_ns)
+        stack.extend(sorted(subdirs, reverse=True))
+
+
+def iter_files(local_dir: Path, pattern: str) -> list[Path]:
+    return sorted(f.path for f in scan_files(local_dir, pattern))
 
 
 def make_s3_key(prefix: str, local_dir: Path, file_path: Path) -> str:
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import json
+import tarfile
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+INDEX_SUFFIX = ".index.json"
+
+
+def write_shard(members: List[Tuple[Path, str]], tar_path: Path) -> Dict[str, Dict[str, Any]]:
+    """
+    Empaqueta archivos chicos en un .tar sin comprimir (los offsets quedan fijos para leer con Range).
+    `members` = [(ruta local, nombre dentro del tar)]. Devuelve {nombre: {"offset": .., "size": ..}}.
+    """
+    index: Dict[str, Dict[str, Any]] = {}
+    with tarfile.open(tar_path, "w", format=tarfile.PAX_FORMAT) as tar:
+        for path, name in members:
+            tar.add(str(path), arcname=name, recursive=False)
+    # los offsets reales (después de los headers PAX) se leen del archivo ya escrito
+    with tarfile.open(tar_path, "r") as tar:
+        for info in tar:
+            index[info.name] = {"offset": info.offset_data, "size": info.size}
+    return index
+
+
+def index_key(shard_key: str) -> str:
+    return shard_key + INDEX_SUFFIX
+
+
+def upload_shard(
+    s3, bucket: str, shard_key: str, tar_path: Path, index: Dict[str, Dict[str, Any]], *, config=None, callback=None
+) -> None:
+    """Sube el .tar y, al lado, su índice JSON (nombre → offset/size) para recuperar archivos sueltos."""
+    s3.upload_file(Filename=str(tar_path), Bucket=bucket, Key=shard_key, Config=config, Callback=callback)
+    body = json.dumps({"shard": shard_key, "members": index}, ensure_ascii=False).encode("utf-8")
+    s3.put_object(Bucket=bucket, Key=index_key(shard_key), Body=body, ContentType="application/json")
+
+
+def read_member(s3, bucket: str, shard_key: str, member: str) -> bytes:
+    """Recupera un archivo de un shard con un GET por rango (sin bajar el .tar completo)."""
+    idx = json.loads(s3.get_object(Bucket=bucket, Key=index_key(shard_key))["Body"].read())
+    if member not in idx["members"]:
+        raise KeyError(f"'{member}' no está en s3://{bucket}/{shard_key}")
+    m = idx["members"][member]
+    if m["size"] == 0:
+        return b""
+    rng = f"bytes={m['offset']}-{m['offset'] + m['size'] - 1}"
+    return s3.get_object(Bucket=bucket, Key=shard_key, Range=rng)["Body"].read()
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import json
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# (etiqueta, tamaño máximo en bytes) — el último cubre todo lo demás
+SIZE_BUCKETS: List[Tuple[str, float]] = [
+    ("<64KB", 64 * 1024),
+    ("64KB-1MB", 1024 ** 2),
+    ("1-16MB", 16 * 1024 ** 2),
+    ("16-256MB", 256 * 1024 ** 2),
+    (">=256MB", math.inf),
+]
+
+
+def size_bucket(size: int) -> str:
+    for label, limit in SIZE_BUCKETS:
+        if size < limit:
+            return label
+    return SIZE_BUCKETS[-1][0]
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Percentil por rango más cercano (sin numpy); None si no hay datos."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _latency(values: List[float]) -> Dict[str, Any]:
+    return {
+        "count": len(values),
+        "p50_s": percentile(values, 50),
+        "p95_s": percentile(values, 95),
+        "p99_s": percentile(values, 99),
+        "max_s": max(values) if values else None,
+    }
+
+
+@dataclass
+class FileRecord:
+    """Lo que costó un archivo (o un shard): bytes enviados, duración, reintentos y partes multipart."""
+    path: str
+    size: int
+    outcome: str = ""
+    bytes_sent: int = 0
+    seconds: float = 0.0
+    retries: int = 0
+    parts: List[float] = field(default_factory=list)  # duración de cada parte multipart (s)
+    codec: Optional[str] = None  # si se subió comprimido: `size` es el original y `bytes_sent` el comprimido
+
+
+class Telemetry:
+    """
+    Telemetría de una corrida (thread-safe, la comparten los hilos o las tareas asyncio):
+
+    - `add_bytes(n)` desde los callbacks de transferencia → bytes/s en vivo (ventana deslizante) y ETA
+    - `expect(n)` suma bytes por procesar a medida que el recorrido encuentra archivos
+    - `record(FileRecord)` al terminar cada archivo → percentiles de latencia y ancho de banda por tamaño
+    - `report()` / `write_report(path)` arman el JSON de la corrida
+    """
+
+    def __init__(self, *, window_s: float = 10.0, workers: int = 0):
+        self.window_s = window_s
+        self.workers = workers
+        self.started = time.perf_counter()
+        self.started_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.bytes_done = 0
+        self.bytes_expected = 0
+        self.records: List[FileRecord] = []
+        self._samples: Deque[Tuple[float, int]] = deque([(self.started, 0)])
+        self._lock = threading.Lock()
+
+    def expect(self, nbytes: int) -> None:
+        with self._lock:
+            self.bytes_expected += nbytes
+
+    def add_bytes(self, nbytes: int) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            self.bytes_done += nbytes
+            self._samples.append((now, self.bytes_done))
+            while len(self._samples) > 2 and now - self._samples[0][0] > self.window_s:
+                self._samples.popleft()
+
+    def record(self, rec: FileRecord) -> None:
+        with self._lock:
+            self.records.append(rec)
+
+    def rate(self) -> float:
+        """bytes/s de los últimos `window_s` segundos."""
+        now = time.perf_counter()
+        with self._lock:
+            t0, b0 = self._samples[0]
+            done = self.bytes_done
+        elapsed = now - t0
+        return (done - b0) / elapsed if elapsed > 0 else 0.0
+
+    def eta_s(self) -> Optional[float]:
+        """Segundos estimados para terminar lo encontrado hasta ahora (el total crece mientras se recorre)."""
+        rate = self.rate()
+        remaining = max(0, self.bytes_expected - self.bytes_done)
+        if remaining == 0:
+            return 0.0
+        return remaining / rate if rate > 0 else None
+
+    def postfix(self) -> Dict[str, str]:
+        """Texto corto para `tqdm.set_postfix`: MB/s y ETA."""
+        eta = self.eta_s()
+        eta_txt = "?" if eta is None else time.strftime("%H:%M:%S", time.gmtime(eta))
+        return {"MB/s": f"{self.rate() / 1024 ** 2:.1f}", "ETA": eta_txt}
+
+    def report(self, **context: Any) -> Dict[str, Any]:
+        wall = time.perf_counter() - self.started
+        with self._lock:
+            records = list(self.records)
+            done = self.bytes_done
+
+        sent = [r for r in records if r.bytes_sent > 0]
+        buckets: Dict[str, Dict[str, Any]] = {}
+        for label, _ in SIZE_BUCKETS:
+            rs = [r for r in sent if size_bucket(r.size) == label]
+            if not rs:
+                continue
+            secs = sum(r.seconds for r in rs)
+            nbytes = sum(r.bytes_sent for r in rs)
+            buckets[label] = {
+                "files": len(rs),
+                "bytes": nbytes,
+                "seconds": round(secs, 3),
+                "mb_per_s_per_file": round(nbytes / secs / 1024 ** 2, 3) if secs > 0 else None,
+                "latency": _latency([r.seconds for r in rs]),
+            }
+
+        outcomes: Dict[str, int] = {}
+        for r in records:
+            outcomes[r.outcome] = outcomes.get(r.outcome, 0) + 1
+        zipped = [r for r in records if r.codec]
+        raw_zipped = sum(r.size for r in zipped)
+        sent_zipped = sum(r.bytes_sent for r in zipped)
+        logical = done + raw_zipped - sent_zipped  # bytes "de archivo" que quedaron en S3
+        compression = {
+            "files": len(zipped),
+            "raw_bytes": raw_zipped,
+            "sent_bytes": sent_zipped,
+            "saved_bytes": raw_zipped - sent_zipped,
+            "ratio": round(raw_zipped / sent_zipped, 2) if sent_zipped else None,
+            # throughput en bytes originales vs bytes en la red: la ganancia neta de comprimir
+            "effective_mb_per_s": round(logical / wall / 1024 ** 2, 3) if wall > 0 else None,
+            "throughput_gain": round(logical / done, 3) if done else None,
+        }
+        busy = sum(r.seconds for r in records)
+        parts = [p for r in records for p in r.parts]
+        return {
+            **context,
+            "started_at": self.started_at,
+            "wall_s": round(wall, 3),
+            "files": len(records),
+            "outcomes": outcomes,
+            "bytes_sent": done,
+            "mb_per_s": round(done / wall / 1024 ** 2, 3) if wall > 0 else None,
+            "retries": sum(r.retries for r in records),
+            # archivos en curso en promedio (y fracción del pool ocupada, si se conoce el tamaño del pool)
+            "avg_in_flight": round(busy / wall, 2) if wall > 0 else None,
+            "worker_utilization": round(busy / wall / self.workers, 3) if wall > 0 and self.workers else None,
+            "latency": _latency([r.seconds for r in records]),
+            "latency_uploaded": _latency([r.seconds for r in sent]),
+            "multipart_parts": _latency(parts),
+            "by_size": buckets,
+            "compression": compression,
+            "slowest": [asdict(r) for r in sorted(records, key=lambda r: r.seconds, reverse=True)[:10]],
+        }
+
+    def write_report(self, path: Path, **context: Any) -> Dict[str, Any]:
+        data = self.report(**context)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        return data
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from datetime import time as dtime
+from typing import Callable, List, Optional, Tuple
+
+MB = 1024 * 1024
+PAUSE = 0.0  # rate de una ventana en pausa (None = sin límite)
+PAUSE_DRAIN = 64 * 1024  # bytes/s con que avanza lo que ya estaba en vuelo durante una pausa
+_POLL_S = 1.0
+
+
+def _parse_hhmm(text: str) -> dtime:
+    h, m = text.strip().split(":")
+    return dtime(int(h), int(m))
+
+
+def _parse_rate(text: str) -> Optional[float]:
+    """"full" → None (sin límite) | "pause" → 0 | "2.5" → 2.5 MB/s en bytes/s."""
+    t = text.strip().lower()
+    if t in {"full", "max", "libre"}:
+        return None
+    if t in {"pause", "pausa"}:
+        return PAUSE
+    mb = float(t)
+    if mb <= 0:
+        raise ValueError(f"Límite inválido '{text}': usa un número > 0 (MB/s), 'full' o 'pause'")
+    return mb * MB
+
+
+@dataclass
+class BandwidthSchedule:
+    """
+    Ventanas horarias → límite. Formato (`BANDWIDTH_SCHEDULE`): "20:00-06:00=full;12:00-13:00=pause;07:00-20:00=2"
+    (la primera ventana que coincide gana; las que cruzan medianoche se permiten). Fuera de toda ventana
+    rige `default` (bytes/s; None = sin límite).
+    """
+    windows: List[Tuple[dtime, dtime, Optional[float]]] = field(default_factory=list)
+    default: Optional[float] = None
+
+    @staticmethod
+    def parse(spec: str, default_mb_s: float = 0.0) -> "BandwidthSchedule":
+        sched = BandwidthSchedule(default=default_mb_s * MB if default_mb_s and default_mb_s > 0 else None)
+        for item in (spec or "").replace(",", ";").split(";"):
+            if not item.strip():
+                continue
+            span, _, rate = item.partition("=")
+            start, _, end = span.partition("-")
+            if not rate or not end:
+                raise ValueError(f"Ventana inválida '{item}' (formato HH:MM-HH:MM=valor)")
+            sched.windows.append((_parse_hhmm(start), _parse_hhmm(end), _parse_rate(rate)))
+        return sched
+
+    def rate_at(self, now: dtime) -> Optional[float]:
+        for start, end, rate in self.windows:
+            inside = start <= now < end if start <= end else (now >= start or now < end)
+            if inside:
+                return rate
+        return self.default
+
+
+def describe_rate(rate: Optional[float]) -> str:
+    if rate is None:
+        return "sin límite"
+    if rate == PAUSE:
+        return "pausa"
+    return f"{rate / MB:.1f} MB/s"
+
+
+class Throttle:
+    """
+    Token bucket compartido por todos los hilos (o tareas asyncio) de una corrida, con el límite que dicta
+    `BandwidthSchedule` en cada momento.
+
+    - `consume(n)` (callbacks de `upload_file`, partes multipart) bloquea hasta que hay `n` bytes de crédito;
+      pedidos mayores que `burst` se conceden y dejan deuda, así el promedio se respeta con partes grandes
+    - en pausa no arrancan transferencias nuevas (`wait_open`); las que ya están en curso siguen a `pause_drain`
+      (64 KB/s): casi detenidas, pero el socket no queda inactivo hasta el timeout de S3
+    - `aconsume` / `await_open` son lo mismo sin bloquear el event loop
+    """
+
+    def __init__(
+        self,
+        schedule: BandwidthSchedule,
+        *,
+        burst_s: float = 1.0,
+        clock: Callable[[], dtime] = lambda: datetime.now().time(),
+        on_change: Optional[Callable[[Optional[float]], None]] = None,
+        pause_drain: float = PAUSE_DRAIN,
+    ):
+        self.schedule = schedule
+        self.burst_s = burst_s
+        self.pause_drain = pause_drain
+        self.clock = clock
+        self.on_change = on_change
+        self.waited_s = 0.0  # tiempo total que los workers esperaron por el límite
+        self._lock = threading.Lock()
+        self._tokens = 0.0
+        self._last = time.monotonic()
+        self._rate: Optional[float] = schedule.rate_at(clock())
+
+    @staticmethod
+    def from_config(default_mb_s: float, schedule: str = "", **kwargs) -> Optional["Throttle"]:
+        """None si no hay límite ni horario configurado (sin costo en el camino caliente)."""
+        if not (default_mb_s and default_mb_s > 0) and not (schedule or "").strip():
+            return None
+        return Throttle(BandwidthSchedule.parse(schedule, default_mb_s), **kwargs)
+
+    @property
+    def rate(self) -> Optional[float]:
+        return self._rate
+
+    @property
+    def paused(self) -> bool:
+        return self._rate == PAUSE
+
+    def _refresh_locked(self, now: float) -> None:
+        rate = self.schedule.rate_at(self.clock())
+        if rate != self._rate:
+            self._rate = rate
+            self._tokens = min(self._tokens, 0.0)  # al cambiar de ventana no se arrastra crédito acumulado
+            if self.on_change:
+                self.on_change(rate)
+        rate = self._effective_rate()
+        if rate:
+            self._tokens = min(rate * self.burst_s, self._tokens + (now - self._last) * rate)
+        self._last = now
+
+    def _effective_rate(self) -> Optional[float]:
+        return self.pause_drain if self._rate == PAUSE else self._rate
+
+    def _reserve(self, nbytes: int) -> float:
+        """Toma crédito si alcanza y devuelve 0; si no, cuántos segundos conviene esperar antes de reintentar."""
+        with self._lock:
+            self._refresh_locked(time.monotonic())
+            rate = self._effective_rate()
+            if rate is None:
+                return 0.0
+            need = min(nbytes, rate * self.burst_s)
+            if self._tokens >= need:
+                self._tokens -= nbytes  # puede quedar negativo: deuda que pagan los siguientes
+                return 0.0
+            return min(_POLL_S, (need - self._tokens) / rate)
+
+    def consume(self, nbytes: int) -> None:
+        while True:
+            wait = self._reserve(nbytes)
+            if wait <= 0:
+                return
+            with self._lock:
+                self.waited_s += wait
+            time.sleep(wait)
+
+    async def aconsume(self, nbytes: int) -> None:
+        while True:
+            wait = self._reserve(nbytes)
+            if wait <= 0:
+                return
+            with self._lock:
+                self.waited_s += wait
+            await asyncio.sleep(wait)
+
+    def _is_paused(self) -> bool:
+        with self._lock:
+            self._refresh_locked(time.monotonic())
+            return self._rate == PAUSE
+
+    def wait_open(self, stop: Optional[threading.Event] = None) -> bool:
+        """Bloquea mientras la ventana actual sea pausa. False si `stop` se activó mientras esperaba."""
+        while self._is_paused():
+            if stop is not None and stop.wait(_POLL_S):
+                return False
+            if stop is None:
+                time.sleep(_POLL_S)
+        return True
+
+    async def await_open(self) -> None:
+        while self._is_paused():
+            await asyncio.sleep(_POLL_S)
@@ -1,17 +1,32 @@
 from __future__ import annotations
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import itertools
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
 
 import boto3
 from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 from tqdm import tqdm
 
+from .compression import Compressed, CompressionRule, compress_with_digests, rule_for
+from .concurrency import AIMDLimiter
+from .hashing import file_digests
 from .manifest import Manifest
-from .scanner import make_s3_key
+from .multipart import resumable_upload
+from .remote import RemoteIndex
+from .retry import RetryPolicy, retry_call
+from .scanner import ScannedFile, make_s3_key
+from .shards import upload_shard, write_shard
+from .telemetry import FileRecord, Telemetry
+from .throttle import Throttle, describe_rate
 
 
 @dataclass
@@ -20,11 +35,34 @@ class UploadStats:
     uploaded: int
     skipped: int
     failed: int
+    copied: int = 0       # duplicados: copia server-side en vez de subir
+    unchanged: int = 0    # mtime cambió pero el contenido (hash) no
+    bytes_uploaded: int = 0
+    bytes_saved: int = 0  # bytes que no se subieron gracias al hash (copias + sin cambios)
+    compressed: int = 0   # archivos subidos comprimidos (gzip / zstd)
+    bytes_compression_saved: int = 0  # original - comprimido, de esos archivos
+    remote_objects: int = 0  # objetos en el snapshot del prefijo (--skip-if-exists)
+    packed: int = 0       # archivos chicos empaquetados en shards .tar
+    shards: int = 0
+    peak_small_workers: int = 0  # máximo alcanzado por el limitador AIMD
+    peak_large_workers: int = 0
+    retries: int = 0         # reintentos (backoff) de requests a S3
+    resumed_parts: int = 0   # partes multipart reutilizadas de una corrida anterior
+    throttled_s: float = 0.0  # segundos que los workers esperaron por el límite de ancho de banda
 
 
-def _s3_client(region: Optional[str] = None):
+def _s3_client(region: Optional[str] = None, endpoint_url: Optional[str] = None):
     session = boto3.session.Session(region_name=region)
-    return session.client("s3")
+    return session.client("s3", endpoint_url=endpoint_url)
+
+
+def _is_not_found(e: ClientError) -> bool:
+    return e.response.get("Error", {}).get("Code", "") in {"404", "NoSuchKey", "NotFound"}
+
+
+def _outcome(msg: str) -> str:
+    """"UPLOADED -> s3://..." → "UPLOADED" (categoría para la telemetría)."""
+    return msg.split(" -> ")[0].split(" s3://")[0]
 
 
 def head_exists(s3, bucket: str, key: str) -> bool:
@@ -32,8 +70,7 @@ def head_exists(s3, bucket: str, key: str) -> bool:
         s3.head_object(Bucket=bucket, Key=key)
         return True
     except ClientError as e:
-        code = e.response.get("Error", {}).get("Code", "")
-        if code in {"404", "NoSuchKey", "NotFound"}:
+        if _is_not_found(e):
             return False
         raise
 
@@ -43,7 +80,7 @@ def upload_files(
     bucket: str,
     prefix: str,
     local_dir: Path,
-    files: list[Path],
+    files: Iterable[Union[Path, ScannedFile]],
     manifest_path: Path,
     region: Optional[str] = None,
     max_workers: int = 8,
@@ -51,63 +88,429 @@ def upload_files(
     multipart_chunksize_mb: int = 16,
     dry_run: bool = False,
     skip_if_exists_in_s3: bool = False,
+    max_workers_limit: int = 64,
+    large_file_workers: int = 2,
+    multipart_concurrency: int = 8,
+    pack_small_kb: int = 0,
+    shard_mb: int = 64,
+    retry: Optional[RetryPolicy] = None,
+    endpoint_url: Optional[str] = None,
+    telemetry: Optional[Telemetry] = None,
+    throttle: Optional[Throttle] = None,
+    manifest: Optional[Manifest] = None,
+    progress: bool = True,
+    compress: Optional[List[CompressionRule]] = None,
 ) -> UploadStats:
+    """
+    Sube `files` a S3 detectando cambios por contenido. `files` puede ser un iterador (p.ej. `scan_files`):
+    cada archivo se despacha apenas aparece, sin esperar a que termine el recorrido de la carpeta.
+
+    1. precheck barato: mismo (size, mtime) que en el manifest → se salta sin leer el archivo ni llamar a S3
+    2. el resto se hashea (sha256 por bloques) dentro del pool de hilos
+    3. mismo hash que lo registrado para esa ruta → sin cambios (solo se actualiza el mtime)
+    4. hash ya subido bajo otra ruta → copia server-side (CopyObject), no se re-sube
+    5. contenido nuevo → upload_file (un duplicado de la misma corrida espera al primero y se copia)
+
+    Con `skip_if_exists_in_s3` se lista el prefijo destino una vez (ListObjectsV2 paginado) y cada archivo
+    se decide localmente: existe con el mismo tamaño (y ETag == md5 en objetos no multipart) → se salta.
+
+    Concurrencia (ver `concurrency.AIMDLimiter`):
+
+    - archivos chicos (< multipart_threshold): un PUT cada uno, en abanico; arranca en `max_workers`
+      transferencias y se ajusta según throughput/errores hasta `max_workers_limit`
+    - archivos grandes: pocos a la vez (`large_file_workers`, también AIMD) y cada uno con
+      `multipart_concurrency` partes en paralelo
+    - `pack_small_kb > 0`: los archivos de hasta ese tamaño se empaquetan en shards .tar de ~`shard_mb`
+      (`<prefijo>/_shards/...tar` + `.index.json`); se recuperan con `shards.read_member`
+
+    Fallos: cada request se reintenta con backoff exponencial + jitter (`retry`); si aun así falla, el archivo
+    queda en la bitácora `failed` del manifest (clase + mensaje). Los archivos grandes usan multipart
+    reanudable (`multipart.resumable_upload`): una corrida cortada retoma desde las partes ya subidas.
+
+    `endpoint_url` apunta a un S3 compatible (MinIO, moto server) en vez de AWS.
+
+    `telemetry` (opcional) recibe bytes en vivo (callbacks de transferencia) y un `FileRecord` por archivo
+    (duración, bytes enviados, reintentos, tiempos de cada parte multipart) para el reporte de la corrida.
+
+    `throttle` (opcional, ver `throttle.Throttle`) limita el ancho de banda total: un solo token bucket para
+    todos los hilos, alimentado por los callbacks de transferencia y por cada parte multipart. En una ventana
+    de pausa no se arranca ningún request nuevo.
+
+    `manifest` (opcional): un `Manifest` ya abierto que sobrevive a la llamada (modo watch: no se recarga el
+    índice en cada lote); al terminar solo se hace `flush()`. Si no se pasa, se abre `manifest_path` y se cierra.
+    `progress=False` apaga la barra (lotes chicos del modo watch).
+
+    `compress` (ver `compression.parse_rules`): los archivos que coinciden se comprimen (gzip / zstd) en la misma
+    lectura que calcula el sha256, dentro del pool de hilos, y se suben con `Content-Encoding`. El key no cambia;
+    si la compresión no ahorra al menos 10 % se sube el original. No se empaquetan en shards.
+    """
     if not bucket:
         raise ValueError("S3_BUCKET está vacío. Configura tu bucket en .env o variables de entorno.")
 
-    s3 = _s3_client(region)
+    s3 = _s3_client(region, endpoint_url)
 
-    cfg = TransferConfig(
-        multipart_threshold=multipart_threshold_mb * 1024 * 1024,
+    threshold = multipart_threshold_mb * 1024 * 1024
+    # archivo chico = un solo PUT: sin hilos extra del transfer manager
+    small_cfg = TransferConfig(multipart_threshold=threshold, use_threads=False)
+    large_cfg = TransferConfig(
+        multipart_threshold=threshold,
         multipart_chunksize=multipart_chunksize_mb * 1024 * 1024,
-        max_concurrency=max_workers,
+        max_concurrency=multipart_concurrency,
         use_threads=True,
     )
+    small_lane = AIMDLimiter(max_workers, maximum=max_workers_limit)
+    large_lane = AIMDLimiter(1, maximum=large_file_workers)
+
+    def _lane(size: int) -> Tuple[AIMDLimiter, TransferConfig]:
+        return (large_lane, large_cfg) if size >= threshold else (small_lane, small_cfg)
+
+    own_manifest = manifest is None
+    if own_manifest:
+        manifest = Manifest.load(manifest_path)
+    stats = UploadStats(total=0, uploaded=0, skipped=0, failed=0)
+
+    remote: Optional[RemoteIndex] = None
+    if skip_if_exists_in_s3:
+        remote = RemoteIndex.snapshot(s3, bucket, prefix)
+        stats.remote_objects = len(remote)
 
-    manifest = Manifest.load(manifest_path)
+    lock = threading.Lock()
+    leaders: Dict[str, threading.Event] = {}  # sha256 → terminó el primer archivo con ese contenido
+    policy = retry or RetryPolicy()
+    # hay más hilos que transferencias: el hash no espera a la red y los limitadores deciden cuántos suben
+    pool_size = max_workers_limit + large_file_workers
+    tel = telemetry or Telemetry()
+    tel.workers = tel.workers or pool_size
+    current = threading.local()  # FileRecord del archivo que procesa este hilo
+    throttled_before = throttle.waited_s if throttle else 0.0
 
-    total = len(files)
-    uploaded = skipped = failed = 0
+    def _progress(nbytes: int) -> None:
+        """Callback de transferencia: descuenta del token bucket (bloquea si hay límite) y alimenta la telemetría."""
+        if throttle:
+            throttle.consume(nbytes)
+        tel.add_bytes(nbytes)
 
-    def _one(file_path: Path) -> Tuple[str, bool, str]:
-        key = make_s3_key(prefix, local_dir, file_path)
-        size = file_path.stat().st_size
+    def _pace(nbytes: int) -> None:
+        # entre partes: si empezó una ventana de pausa, el multipart espera acá (ningún request queda abierto)
+        throttle.wait_open()
+        throttle.consume(nbytes)
 
-        if manifest.is_uploaded(file_path):
-            return (file_path.as_posix(), True, "SKIP(manifest)")
+    def _call(fn, rec: Optional[FileRecord] = None):
+        rec = rec or getattr(current, "rec", None)
 
-        if skip_if_exists_in_s3 and head_exists(s3, bucket, key):
-            manifest.mark_uploaded(file_path, bucket=bucket, key=key, size=size)
-            return (file_path.as_posix(), True, "SKIP(s3 exists)")
+        def _on_retry(attempt: int, e: BaseException) -> None:
+            with lock:
+                stats.retries += 1
+                if rec is not None:
+                    rec.retries += 1
 
+        return retry_call(fn, policy, on_retry=_on_retry)
+
+    def _transfer(size: int, fn):
+        """Un request a S3 con reintentos; cada intento ocupa un cupo del carril (los errores lo achican)."""
+        limiter, _ = _lane(size)
+
+        def _attempt():
+            if throttle:
+                throttle.wait_open()  # en pausa no se ocupa cupo del carril
+            with limiter.slot(size):
+                return fn()
+
+        return _call(_attempt)
+
+    def _upload(f: ScannedFile, key: str, h: str, packed: Optional[Compressed] = None) -> Tuple[str, int]:
         if dry_run:
-            return (file_path.as_posix(), True, f"DRY_RUN -> s3://{bucket}/{key}")
+            return f"DRY_RUN -> s3://{bucket}/{key}", 0
+        rec: FileRecord = current.rec
+        if packed is not None:
+            # el temporal cambia en cada corrida: multipart administrado (no reanudable) si es grande
+            _, cfg = _lane(packed.size)
+            _transfer(packed.size, lambda: s3.upload_file(
+                Filename=str(packed.path),
+                Bucket=bucket,
+                Key=key,
+                Config=cfg,
+                ExtraArgs={
+                    "ContentEncoding": packed.codec,
+                    "Metadata": {"sha256": h, "uncompressed-size": str(packed.raw_size)},
+                },
+                Callback=_progress,
+            ))
+            rec.bytes_sent, rec.codec = packed.size, packed.codec
+            with lock:
+                stats.compressed += 1
+                stats.bytes_compression_saved += packed.raw_size - packed.size
+            manifest.mark_uploaded(f.path, bucket=bucket, key=key, size=f.size, mtime_ns=f.mtime_ns, sha256=h)
+            return f"UPLOADED -> s3://{bucket}/{key}", packed.size
+        if f.size >= threshold:
 
-        s3.upload_file(
-            Filename=str(file_path),
-            Bucket=bucket,
-            Key=key,
-            Config=cfg,
-        )
-        manifest.mark_uploaded(file_path, bucket=bucket, key=key, size=size)
-        return (file_path.as_posix(), True, f"UPLOADED -> s3://{bucket}/{key}")
+            def _on_part(n: int, nbytes: int, seconds: float) -> None:
+                tel.add_bytes(nbytes)
+                with lock:
+                    rec.parts.append(seconds)
 
-    with ThreadPoolExecutor(max_workers=max_workers) as ex:
-        futures = [ex.submit(_one, fp) for fp in files]
-        for fut in tqdm(as_completed(futures), total=total, desc="Subiendo a S3"):
+            with large_lane.slot(f.size):
+                reused = resumable_upload(
+                    s3, bucket=bucket, key=key, f=f, store=manifest,
+                    part_size=multipart_chunksize_mb * 1024 * 1024, concurrency=multipart_concurrency,
+                    extra_args={"Metadata": {"sha256": h}}, call=lambda fn: _call(fn, rec), on_part=_on_part,
+                    pace=_pace if throttle else None,
+                )
+            if reused:
+                with lock:
+                    stats.resumed_parts += reused
+        else:
+            _transfer(f.size, lambda: s3.upload_file(
+                Filename=str(f.path),
+                Bucket=bucket,
+                Key=key,
+                Config=small_cfg,
+                ExtraArgs={"Metadata": {"sha256": h}},
+                Callback=_progress,
+            ))
+        rec.bytes_sent = f.size
+        manifest.mark_uploaded(f.path, bucket=bucket, key=key, size=f.size, mtime_ns=f.mtime_ns, sha256=h)
+        return f"UPLOADED -> s3://{bucket}/{key}", f.size
+
+    def _copy_or_upload(
+        f: ScannedFile, h: str, md5: Optional[str], packed: Optional[Compressed] = None
+    ) -> Tuple[str, int]:
+        key = make_s3_key(prefix, local_dir, f.path)
+        # comprimido: en S3 está el .gz/.zst (determinístico), se compara su tamaño y md5
+        size, etag = (packed.size, packed.md5) if packed is not None else (f.size, md5)
+        if remote is not None and remote.matches(key, size, etag):
+            manifest.mark_uploaded(f.path, bucket=bucket, key=key, size=f.size, mtime_ns=f.mtime_ns, sha256=h)
+            return "SKIP(s3 exists)", 0
+        source = manifest.find_by_hash(h)
+        if source is None:
+            return _upload(f, key, h, packed)
+        if source["bucket"] == bucket and source["key"] == key:
+            manifest.mark_uploaded(f.path, bucket=bucket, key=key, size=f.size, mtime_ns=f.mtime_ns, sha256=h)
+            return "SKIP(same key)", 0
+        if dry_run:
+            return f"DRY_RUN COPY s3://{source['bucket']}/{source['key']} -> s3://{bucket}/{key}", 0
+        _, cfg = _lane(f.size)
+        try:
+            # copia administrada: usa UploadPartCopy si el objeto supera el umbral multipart
+            _transfer(f.size, lambda: s3.copy({"Bucket": source["bucket"], "Key": source["key"]}, bucket, key, Config=cfg))
+        except ClientError as e:
+            if not _is_not_found(e):
+                raise
+            missing = True
+        else:
+            missing = False
+        if missing:
+            return _upload(f, key, h, packed)  # el origen ya no está en S3
+        manifest.mark_uploaded(f.path, bucket=bucket, key=key, size=f.size, mtime_ns=f.mtime_ns, sha256=h)
+        return f"COPIED -> s3://{bucket}/{key}", f.size
+
+    def _unchanged(f: ScannedFile, h: str) -> bool:
+        entry = manifest.get(f.path)
+        # entradas viejas (sin sha256) con el mismo tamaño se asumen subidas: solo se completa el hash
+        if entry and (entry.get("sha256") == h or (entry.get("sha256") is None and entry.get("size") == f.size)):
+            if not dry_run:
+                manifest.mark_uploaded(
+                    f.path, bucket=entry["bucket"], key=entry["key"], size=f.size, mtime_ns=f.mtime_ns,
+                    sha256=h, member=entry.get("member"),
+                )
+            return True
+        return False
+
+    def _one(f: ScannedFile) -> List[Tuple[str, int]]:
+        rec = current.rec = FileRecord(path=f.path.as_posix(), size=f.size)
+        t0 = time.perf_counter()
+        try:
+            results = _process(f)
+        except Exception as e:
+            manifest.record_failure(f.path, e)
+            results = [("FAILED", 0)]
+        rec.seconds = time.perf_counter() - t0
+        rec.outcome = _outcome(results[0][0])
+        tel.record(rec)
+        tel.expect(rec.bytes_sent - f.size)  # lo que no viajó (copias, sin cambios) sale del ETA
+        current.rec = None
+        return results
+
+    def _compress_rule(f: ScannedFile) -> Optional[CompressionRule]:
+        return rule_for(compress, f.path.relative_to(local_dir)) if compress else None
+
+    def _process(f: ScannedFile) -> List[Tuple[str, int]]:
+        rule = _compress_rule(f)
+        packed: Optional[Compressed] = None
+        if rule is not None:
+            h, md5, packed = compress_with_digests(f.path, rule, md5=remote is not None)
+            if not packed.worth_it:
+                packed.discard()
+                packed = None
+        else:
+            h, md5 = file_digests(f.path, md5=remote is not None)
+        try:
+            if _unchanged(f, h):
+                return [("UNCHANGED", f.size)]
+
+            with lock:
+                first = leaders.get(h)
+                if first is None:
+                    leaders[h] = threading.Event()
+            if first is not None:
+                first.wait()  # el primero ya está subiendo; este se copia desde ese objeto
+                return [_copy_or_upload(f, h, md5, packed)]
+            try:
+                return [_copy_or_upload(f, h, md5, packed)]
+            finally:
+                leaders[h].set()
+        finally:
+            if packed is not None:
+                packed.discard()
+
+    pref = (prefix or "").strip("/")
+    shard_prefix = f"{pref}/_shards" if pref else "_shards"
+    run_id = time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+    shard_seq = itertools.count(1)
+
+    def _pack(batch: List[ScannedFile]) -> List[Tuple[str, int]]:
+        t0 = time.perf_counter()
+        batch_bytes = sum(f.size for f in batch)
+        rec = current.rec = FileRecord(path="", size=0, outcome="PACKED")
+        try:
+            return _pack_batch(batch, rec)
+        finally:
+            rec.seconds = time.perf_counter() - t0
+            if rec.path:  # se armó (o intentó) un shard
+                tel.record(rec)
+            tel.expect(rec.bytes_sent - batch_bytes)
+            current.rec = None
+
+    def _pack_batch(batch: List[ScannedFile], rec: FileRecord) -> List[Tuple[str, int]]:
+        results: List[Tuple[str, int]] = []
+        members: List[Tuple[ScannedFile, str, str]] = []
+        for f in batch:
             try:
-                _, ok, msg = fut.result()
-                if msg.startswith("SKIP"):
-                    skipped += 1
-                elif msg.startswith("UPLOADED") or msg.startswith("DRY_RUN"):
-                    uploaded += 1
-                else:
-                    uploaded += 1
-            except Exception:
-                failed += 1
-
-            if (uploaded + skipped + failed) % 25 == 0:
-                manifest.save(manifest_path)
-
-    manifest.save(manifest_path)
-    return UploadStats(total=total, uploaded=uploaded, skipped=skipped, failed=failed)
+                h, md5 = file_digests(f.path, md5=remote is not None)
+            except OSError as e:
+                manifest.record_failure(f.path, e)
+                results.append(("FAILED", 0))
+                continue
+            key = make_s3_key(prefix, local_dir, f.path)
+            if _unchanged(f, h):
+                results.append(("UNCHANGED", f.size))
+            elif remote is not None and remote.matches(key, f.size, md5):
+                manifest.mark_uploaded(f.path, bucket=bucket, key=key, size=f.size, mtime_ns=f.mtime_ns, sha256=h)
+                results.append(("SKIP(s3 exists)", 0))
+            else:
+                members.append((f, h, f.path.relative_to(local_dir).as_posix()))
+        if not members:
+            return results
+
+        shard_key = f"{shard_prefix}/{run_id}-{next(shard_seq):05d}.tar"
+        rec.path = shard_key
+        if dry_run:
+            return results + [(f"DRY_RUN SHARD -> s3://{bucket}/{shard_key}", 0)] * len(members)
+
+        fd, tmp = tempfile.mkstemp(suffix=".tar")
+        os.close(fd)
+        try:
+            index = write_shard([(f.path, name) for f, _, name in members], Path(tmp))
+            for f, h, name in members:
+                index[name]["sha256"] = h
+            size = rec.size = Path(tmp).stat().st_size
+            _, cfg = _lane(size)
+            _transfer(size, lambda: upload_shard(
+                s3, bucket, shard_key, Path(tmp), index, config=cfg, callback=_progress
+            ))
+            rec.bytes_sent = size
+        except Exception as e:
+            rec.outcome = "FAILED"
+            for f, _, _ in members:
+                manifest.record_failure(f.path, e)
+            return results + [("FAILED", 0)] * len(members)
+        finally:
+            os.remove(tmp)
+
+        for f, h, name in members:
+            manifest.mark_uploaded(f.path, bucket=bucket, key=shard_key, size=f.size, mtime_ns=f.mtime_ns, sha256=h, member=name)
+            results.append((f"PACKED -> s3://{bucket}/{shard_key}", f.size))
+        with lock:
+            stats.shards += 1
+        return results
+
+    def _collect(fut) -> None:
+        try:
+            results = fut.result()
+        except Exception:
+            results = [("FAILED", 0)]
+        for msg, nbytes in results:
+            if msg == "FAILED":
+                stats.failed += 1
+            elif msg == "UNCHANGED":
+                stats.skipped += 1
+                stats.unchanged += 1
+                stats.bytes_saved += nbytes
+            elif msg.startswith("SKIP"):
+                stats.skipped += 1
+            elif msg.startswith("COPIED"):
+                stats.copied += 1
+                stats.bytes_saved += nbytes
+            else:
+                stats.uploaded += 1
+                stats.bytes_uploaded += nbytes
+                if msg.startswith("PACKED"):
+                    stats.packed += 1
+        bar.update(len(results))
+        bar.set_postfix(
+            vistos=stats.total, chicos=small_lane.limit, grandes=large_lane.limit, **tel.postfix(),
+            **({"límite": describe_rate(throttle.rate)} if throttle else {}), refresh=False,
+        )
+
+    pack_limit = pack_small_kb * 1024
+    shard_bytes = shard_mb * 1024 * 1024
+    to_pack: List[ScannedFile] = []
+    to_pack_bytes = 0
+
+    # el total de la barra crece a medida que el recorrido encuentra archivos por procesar
+    bar = tqdm(total=0, desc="Subiendo a S3", disable=not progress)
+    max_in_flight = pool_size * 2
+    in_flight: Set[Future] = set()
+    try:
+        with ThreadPoolExecutor(max_workers=pool_size) as ex:
+
+            def _submit(fn, arg) -> None:
+                nonlocal in_flight
+                in_flight.add(ex.submit(fn, arg))
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        _collect(fut)
+
+            for f in files:
+                f = ScannedFile.of(f)
+                stats.total += 1
+                if manifest.is_unchanged(f.path, size=f.size, mtime_ns=f.mtime_ns):
+                    stats.skipped += 1
+                    continue
+                bar.total += 1
+                bar.refresh()
+                tel.expect(f.size)
+                if pack_limit and f.size <= pack_limit and _compress_rule(f) is None:
+                    to_pack.append(f)
+                    to_pack_bytes += f.size
+                    if to_pack_bytes >= shard_bytes:
+                        _submit(_pack, to_pack)
+                        to_pack, to_pack_bytes = [], 0
+                    continue
+                _submit(_one, f)
+            if to_pack:
+                _submit(_pack, to_pack)
+            for fut in as_completed(in_flight):
+                _collect(fut)
+    finally:
+        bar.close()
+        # el manifest se persiste por lotes; aquí se escribe el último delta
+        if own_manifest:
+            manifest.close()
+        else:
+            manifest.flush()
+    stats.peak_small_workers = small_lane.peak
+    stats.peak_large_workers = large_lane.peak
+    stats.throttled_s = (throttle.waited_s - throttled_before) if throttle else 0.0
+    return stats
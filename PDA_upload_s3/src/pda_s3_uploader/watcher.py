@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .scanner import ScannedFile, _normalize_pattern, scan_files
+from .telemetry import percentile
+from .uploader import UploadStats
+
+# archivos a medio escribir por navegadores / Office / editores: nunca se suben
+IGNORED_SUFFIXES = (".tmp", ".part", ".partial", ".crdownload", ".download", ".swp")
+IGNORED_PREFIXES = ("~$", ".~")
+
+
+@dataclass
+class WatchStats:
+    batches: int = 0
+    reconciles: int = 0
+    files: int = 0
+    uploaded: int = 0
+    failed: int = 0
+    # desde el primer evento hasta terminar la subida (últimos 10.000 archivos: el proceso corre por meses)
+    latency_s: Deque[float] = field(default_factory=lambda: deque(maxlen=10_000))
+
+
+@dataclass
+class _Pending:
+    first_seen: float        # reloj de pared: para medir la latencia de punta a punta
+    last_event: float        # reloj monotónico del último evento / cambio visto
+    signature: Optional[Tuple[int, int]]  # (size, mtime_ns) de la última observación
+
+
+class FolderWatcher:
+    """
+    Modo continuo: sube los archivos nuevos segundos después de que aparecen en `local_dir`.
+
+    - eventos del sistema de archivos (watchdog: inotify / ReadDirectoryChangesW / FSEvents) marcan rutas
+      como pendientes; sin watchdog instalado queda solo la reconciliación periódica
+    - un archivo pendiente se sube cuando pasaron `debounce_s` sin eventos **y** su (size, mtime) no cambió desde
+      la última observación **y** se puede abrir para lectura (en Windows el que escribe lo tiene bloqueado)
+    - cada `reconcile_s` se recorre la carpeta completa (eventos perdidos, carpeta de red, reinicios): lo que no
+      cambió lo salta el precheck del manifest; lo modificado hace menos de `debounce_s` pasa a pendiente
+
+    `upload` recibe los `ScannedFile` listos y devuelve `UploadStats` (en el CLI: `upload_files` con el
+    manifest abierto una sola vez).
+    """
+
+    def __init__(
+        self,
+        local_dir: Path,
+        pattern: str,
+        upload: Callable[[Iterable[ScannedFile]], UploadStats],
+        *,
+        debounce_s: float = 2.0,
+        reconcile_s: float = 900.0,
+        tick_s: float = 0.5,
+        use_events: bool = True,
+        log: Callable[[str], None] = print,
+    ):
+        self.local_dir = Path(local_dir)
+        self.pattern = _normalize_pattern(pattern)
+        self.upload = upload
+        self.debounce_s = debounce_s
+        self.reconcile_s = reconcile_s
+        self.tick_s = tick_s
+        self.use_events = use_events
+        self.log = log
+        self.stats = WatchStats()
+        self._pending: Dict[Path, _Pending] = {}
+        self._lock = threading.Lock()
+
+    # ---- eventos ---------------------------------------------------------------
+
+    def matches(self, path: Path) -> bool:
+        name = path.name
+        if name.startswith(IGNORED_PREFIXES) or name.lower().endswith(IGNORED_SUFFIXES):
+            return False
+        try:
+            return path.relative_to(self.local_dir).match(self.pattern)
+        except ValueError:
+            return False  # fuera de la carpeta vigilada
+
+    def notify(self, path: Path) -> None:
+        """Un evento (creado / modificado / movido hacia acá / cerrado) sobre `path`."""
+        path = Path(path)
+        if not self.matches(path):
+            return
+        sig = _signature(path)
+        now = time.monotonic()
+        with self._lock:
+            p = self._pending.get(path)
+            if p is None:
+                self._pending[path] = _Pending(first_seen=time.time(), last_event=now, signature=sig)
+            else:
+                p.last_event = now
+                p.signature = sig
+
+    def forget(self, path: Path) -> None:
+        with self._lock:
+            self._pending.pop(Path(path), None)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def ready(self) -> List[Tuple[ScannedFile, float]]:
+        """Pendientes que ya están estables: [(archivo, first_seen)]. Los que siguen cambiando esperan otro debounce."""
+        now = time.monotonic()
+        out: List[Tuple[ScannedFile, float]] = []
+        with self._lock:
+            for path, p in list(self._pending.items()):
+                if now - p.last_event < self.debounce_s:
+                    continue
+                sig = _signature(path)
+                if sig is None:
+                    del self._pending[path]  # se borró o se movió antes de subirlo
+                    continue
+                if sig != p.signature or not _readable(path):
+                    p.signature, p.last_event = sig, now  # sigue escribiéndose: otra vuelta de debounce
+                    continue
+                del self._pending[path]
+                out.append((ScannedFile(path, sig[0], sig[1]), p.first_seen))
+        return out
+
+    # ---- ciclo principal --------------------------------------------------------
+
+    def _start_observer(self):
+        if not self.use_events:
+            return None
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:  # dependencia opcional
+            self.log("⚠️  watchdog no está instalado: solo reconciliación periódica (pip install watchdog)")
+            return None
+
+        watcher = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_created(self, event):
+                if not event.is_directory:
+                    watcher.notify(Path(event.src_path))
+
+            on_modified = on_created
+            on_closed = on_created
+
+            def on_moved(self, event):
+                if not event.is_directory:
+                    watcher.forget(Path(event.src_path))
+                    watcher.notify(Path(event.dest_path))
+
+            def on_deleted(self, event):
+                watcher.forget(Path(event.src_path))
+
+        observer = Observer()
+        observer.schedule(_Handler(), str(self.local_dir), recursive=True)
+        observer.start()
+        return observer
+
+    def _upload(self, files: Iterable[ScannedFile]) -> UploadStats:
+        stats = self.upload(files)
+        self.stats.files += stats.total
+        self.stats.uploaded += stats.uploaded + stats.copied
+        self.stats.failed += stats.failed
+        return stats
+
+    def reconcile(self) -> UploadStats:
+        """Recorrido completo; lo modificado hace menos de `debounce_s` se deja a los pendientes."""
+        cutoff_ns = time.time_ns() - int(self.debounce_s * 1e9)
+        fresh: List[Path] = []
+
+        def _settled():
+            for f in scan_files(self.local_dir, self.pattern):
+                if not self.matches(f.path):
+                    continue
+                if f.mtime_ns > cutoff_ns:
+                    fresh.append(f.path)
+                    continue
+                yield f
+
+        stats = self._upload(_settled())
+        for path in fresh:
+            self.notify(path)
+        self.stats.reconciles += 1
+        return stats
+
+    def run_once(self) -> Optional[UploadStats]:
+        """Sube los pendientes que ya están estables (un lote). None si no había nada listo."""
+        batch = self.ready()
+        if not batch:
+            return None
+        stats = self._upload([f for f, _ in batch])
+        done = time.time()
+        lat = [done - first for _, first in batch]
+        self.stats.latency_s.extend(lat)
+        self.stats.batches += 1
+        self.log(
+            f"⚡ Lote: {len(batch):,} archivo(s) | subidos={stats.uploaded + stats.copied:,} fallidos={stats.failed:,}"
+            f" | latencia p50={percentile(lat, 50):.1f}s máx={max(lat):.1f}s"
+        )
+        return stats
+
+    def run(self, stop: Optional[threading.Event] = None) -> WatchStats:
+        """Bloquea hasta que `stop` se active (o Ctrl+C). Arranca con una reconciliación completa."""
+        stop = stop or threading.Event()
+        observer = self._start_observer()
+        reconcile_every = self.reconcile_s if observer is not None else min(self.reconcile_s, 60.0)
+        next_reconcile = 0.0
+        try:
+            while not stop.is_set():
+                if time.monotonic() >= next_reconcile:
+                    st = self.reconcile()
+                    if st.uploaded or st.copied or st.failed:
+                        self.log(f"🔄 Reconciliación: subidos={st.uploaded + st.copied:,} fallidos={st.failed:,}")
+                    next_reconcile = time.monotonic() + reconcile_every
+                self.run_once()
+                stop.wait(self.tick_s)
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+        return self.stats
+
+
+def _signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _readable(path: Path) -> bool:
+    try:
+        with open(path, "rb"):
+            return True
+    except OSError:
+        return False
@@ -1,16 +1,84 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+from dataclasses import asdict
 from pathlib import Path
 from dotenv import load_dotenv
+from tqdm import tqdm
 
+from pda_s3_uploader.aio_engine import run_async_upload
+from pda_s3_uploader.compression import parse_rules
 from pda_s3_uploader.config import load_from_env
-from pda_s3_uploader.scanner import iter_files
+from pda_s3_uploader.manifest import Manifest
+from pda_s3_uploader.retry import RetryPolicy
+from pda_s3_uploader.scanner import ScannedFile, scan_files
+from pda_s3_uploader.telemetry import Telemetry, percentile
+from pda_s3_uploader.throttle import Throttle, describe_rate
 from pda_s3_uploader.uploader import upload_files
+from pda_s3_uploader.watcher import FolderWatcher
 
 load_dotenv()
 
 
+def _fmt_bytes(n: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024:
+            return f"{n:,.1f} {unit}" if unit != "B" else f"{n:,} B"
+        n /= 1024
+    return f"{n:,.1f} TB"
+
+
+def _run_watch(cfg, retry: RetryPolicy, throttle, compress) -> None:
+    """Modo daemon: el manifest y la config se abren una vez; cada lote estable se sube con el motor de hilos."""
+    manifest = Manifest.load(cfg.manifest_path)
+
+    def _upload(files):
+        return upload_files(
+            bucket=cfg.bucket,
+            prefix=cfg.prefix,
+            local_dir=cfg.local_dir,
+            files=files,
+            manifest_path=cfg.manifest_path,
+            manifest=manifest,
+            region=cfg.region,
+            endpoint_url=cfg.endpoint_url,
+            max_workers=cfg.max_workers,
+            multipart_threshold_mb=cfg.multipart_threshold_mb,
+            multipart_chunksize_mb=cfg.multipart_chunksize_mb,
+            max_workers_limit=cfg.max_workers_limit,
+            large_file_workers=cfg.large_file_workers,
+            multipart_concurrency=cfg.multipart_concurrency,
+            pack_small_kb=cfg.pack_small_kb,
+            shard_mb=cfg.shard_mb,
+            retry=retry,
+            throttle=throttle,
+            dry_run=cfg.dry_run,
+            progress=False,
+            compress=compress,
+        )
+
+    watcher = FolderWatcher(
+        cfg.local_dir, cfg.pattern, _upload,
+        debounce_s=cfg.watch_debounce_s, reconcile_s=cfg.watch_reconcile_min * 60,
+    )
+    print(
+        f"👀 Vigilando '{cfg.local_dir}' (pattern='{cfg.pattern}') | estable tras {cfg.watch_debounce_s:g}s | "
+        f"reconciliación cada {cfg.watch_reconcile_min:g} min | Ctrl+C para salir"
+    )
+    try:
+        ws = watcher.run()
+    except KeyboardInterrupt:
+        ws = watcher.stats
+    finally:
+        manifest.close()
+    lat = list(ws.latency_s)
+    print("\n✅ Watch detenido")
+    print(f"   Lotes: {ws.batches:,} | reconciliaciones: {ws.reconciles:,}")
+    print(f"   Subidos: {ws.uploaded:,} | fallidos: {ws.failed:,}")
+    if lat:
+        print(f"   Latencia (aparece → en S3): p50={percentile(lat, 50):.1f}s p95={percentile(lat, 95):.1f}s")
+
+
 def main():
     import argparse
 
@@ -19,13 +87,35 @@ def main():
     parser.add_argument("--pattern", default=None, help="Ej: *.pdf | **/*.pdf | *.xlsx")
     parser.add_argument("--bucket", default=None)
     parser.add_argument("--prefix", default=None)
-    parser.add_argument("--max-workers", type=int, default=None)
+    parser.add_argument("--max-workers", type=int, default=None, help="Transferencias simultáneas iniciales (se ajusta solo).")
+    parser.add_argument("--max-workers-limit", type=int, default=None, help="Tope del ajuste adaptativo para archivos chicos.")
+    parser.add_argument("--pack-small-kb", type=int, default=None, help="Empaqueta archivos de hasta N KB en shards .tar (0 = no).")
+    parser.add_argument("--engine", choices=["threads", "asyncio"], default=None, help="Motor de subida (asyncio requiere aiobotocore).")
+    parser.add_argument("--endpoint-url", default=None, help="S3 compatible (MinIO, moto server) en vez de AWS.")
+    parser.add_argument("--bandwidth-mb-s", type=float, default=None, help="Límite de subida total en MB/s (0 = sin límite).")
+    parser.add_argument("--schedule", default=None, help='Ventanas horarias, ej: "20:00-06:00=full;12:00-13:00=pause".')
+    parser.add_argument("--compress", default=None, help='Compresión por patrón, ej: "*.csv=gzip;*.txt=zstd:3".')
+    parser.add_argument("--watch", action="store_true", help="Modo continuo: sube archivos nuevos apenas quedan estables.")
+    parser.add_argument("--report", default=None, help="Ruta del reporte JSON de la corrida (default: REPORT_PATH).")
     parser.add_argument("--dry-run", action="store_true")
-    parser.add_argument("--skip-if-exists", action="store_true")
+    parser.add_argument("--skip-if-exists", action="store_true", help="Lista el prefijo en S3 una vez y salta lo que ya existe (mismo tamaño/ETag).")
+    parser.add_argument("--compact-manifest", action="store_true", help="Compacta el manifest (VACUUM) y termina.")
+    parser.add_argument("--prune-missing", action="store_true", help="Con --compact-manifest: borra entradas de archivos locales que ya no existen.")
+    parser.add_argument("--retry-failed", action="store_true", help="Solo reintenta los archivos de la bitácora de fallos.")
+    parser.add_argument("--list-failed", action="store_true", help="Muestra la bitácora de fallos y termina.")
     args = parser.parse_args()
 
     cfg = load_from_env()
 
+    if args.compact_manifest:
+        manifest = Manifest.load(cfg.manifest_path)
+        try:
+            removed = manifest.compact(prune_missing=args.prune_missing)
+            print(f"🧹 Manifest compactado: {manifest.path} | entradas={len(manifest):,} | borradas={removed:,}")
+        finally:
+            manifest.close()
+        return
+
     if args.local_dir:
         cfg.local_dir = Path(args.local_dir)
     if args.pattern:
@@ -36,35 +126,157 @@ def main():
         cfg.prefix = args.prefix
     if args.max_workers:
         cfg.max_workers = int(args.max_workers)
+    if args.max_workers_limit:
+        cfg.max_workers_limit = int(args.max_workers_limit)
+    if args.pack_small_kb is not None:
+        cfg.pack_small_kb = int(args.pack_small_kb)
+    if args.engine:
+        cfg.engine = args.engine
+    if args.endpoint_url:
+        cfg.endpoint_url = args.endpoint_url
+    if args.bandwidth_mb_s is not None:
+        cfg.bandwidth_mb_s = float(args.bandwidth_mb_s)
+    if args.schedule is not None:
+        cfg.bandwidth_schedule = args.schedule
+    if args.compress is not None:
+        cfg.compress = args.compress
+    if args.report:
+        cfg.report_path = Path(args.report)
     if args.dry_run:
         cfg.dry_run = True
 
-    files = iter_files(cfg.local_dir, cfg.pattern)
-    print(f"📂 Archivos encontrados: {len(files):,} | pattern='{cfg.pattern}' | dir='{cfg.local_dir}'")
-
-    stats = upload_files(
-        bucket=cfg.bucket,
-        prefix=cfg.prefix,
-        local_dir=cfg.local_dir,
-        files=files,
-        manifest_path=cfg.manifest_path,
-        region=cfg.region,
-        max_workers=cfg.max_workers,
-        multipart_threshold_mb=cfg.multipart_threshold_mb,
-        multipart_chunksize_mb=cfg.multipart_chunksize_mb,
-        dry_run=cfg.dry_run,
-        skip_if_exists_in_s3=args.skip_if_exists,
+    if args.list_failed or args.retry_failed:
+        manifest = Manifest.load(cfg.manifest_path)
+        try:
+            failures = manifest.failures()
+        finally:
+            manifest.close()
+
+    if args.list_failed:
+        for f in failures:
+            print(f"❌ {f['path']} | {f['error_class']} (corridas={f['runs']}, {f['ts']}) | {f['message'][:200]}")
+        print(f"Total fallidos: {len(failures):,}")
+        return
+
+    retry = RetryPolicy(attempts=cfg.retry_attempts, base_s=cfg.retry_base_s, max_s=cfg.retry_max_s)
+    throttle = Throttle.from_config(
+        cfg.bandwidth_mb_s, cfg.bandwidth_schedule,
+        on_change=lambda rate: tqdm.write(f"🕒 Cambio de ventana horaria: {describe_rate(rate)}"),
     )
+    if throttle:
+        print(f"🚦 Ancho de banda: {describe_rate(throttle.rate)} (ahora)")
+    compress = parse_rules(cfg.compress)
+    if compress:
+        print("🗜️  Compresión: " + ", ".join(f"{r.pattern}→{r.codec}:{r.level}" for r in compress))
+        if cfg.engine == "asyncio":
+            print("⚠️  El motor asyncio no comprime: esos archivos se suben sin comprimir")
+
+    if args.watch:
+        _run_watch(cfg, retry, throttle, compress)
+        return
 
-    done = stats.uploaded + stats.skipped
+    if args.retry_failed:
+        files = [ScannedFile.of(Path(f["path"])) for f in failures if Path(f["path"]).is_file()]
+        print(f"🔁 Reintentando fallidos: {len(files):,} de {len(failures):,} en la bitácora")
+    else:
+        # recorrido en streaming: la subida arranca con los primeros archivos encontrados
+        files = scan_files(cfg.local_dir, cfg.pattern)
+        print(f"📂 Recorriendo: pattern='{cfg.pattern}' | dir='{cfg.local_dir}'")
+
+    telemetry = Telemetry()
+    if cfg.engine == "asyncio":
+        print(f"⚡ Motor asyncio: hasta {cfg.max_workers_limit} requests simultáneos en un solo event loop")
+        stats = run_async_upload(
+            bucket=cfg.bucket,
+            prefix=cfg.prefix,
+            local_dir=cfg.local_dir,
+            files=files,
+            manifest_path=cfg.manifest_path,
+            region=cfg.region,
+            endpoint_url=cfg.endpoint_url,
+            max_concurrency=cfg.max_workers_limit,
+            large_file_workers=cfg.large_file_workers,
+            multipart_threshold_mb=cfg.multipart_threshold_mb,
+            multipart_chunksize_mb=cfg.multipart_chunksize_mb,
+            multipart_concurrency=cfg.multipart_concurrency,
+            retry=retry,
+            telemetry=telemetry,
+            throttle=throttle,
+            dry_run=cfg.dry_run,
+            skip_if_exists_in_s3=args.skip_if_exists,
+        )
+    else:
+        stats = upload_files(
+            bucket=cfg.bucket,
+            prefix=cfg.prefix,
+            local_dir=cfg.local_dir,
+            files=files,
+            manifest_path=cfg.manifest_path,
+            region=cfg.region,
+            endpoint_url=cfg.endpoint_url,
+            max_workers=cfg.max_workers,
+            multipart_threshold_mb=cfg.multipart_threshold_mb,
+            multipart_chunksize_mb=cfg.multipart_chunksize_mb,
+            max_workers_limit=cfg.max_workers_limit,
+            large_file_workers=cfg.large_file_workers,
+            multipart_concurrency=cfg.multipart_concurrency,
+            pack_small_kb=cfg.pack_small_kb,
+            shard_mb=cfg.shard_mb,
+            compress=compress,
+            retry=retry,
+            telemetry=telemetry,
+            throttle=throttle,
+            dry_run=cfg.dry_run,
+            skip_if_exists_in_s3=args.skip_if_exists,
+        )
+
+    done = stats.uploaded + stats.copied + stats.skipped
     remaining = max(0, stats.total - done - stats.failed)
 
     print("\n✅ Resumen")
-    print(f"   Total:    {stats.total:,}")
-    print(f"   Subidos:  {stats.uploaded:,}")
-    print(f"   Saltados: {stats.skipped:,}")
-    print(f"   Fallidos: {stats.failed:,}")
+    print(f"   Total:    {stats.total:,} (encontrados)")
+    if args.skip_if_exists:
+        print(f"   En S3:    {stats.remote_objects:,} objetos bajo el prefijo (ListObjectsV2)")
+    print(f"   Subidos:  {stats.uploaded:,} ({_fmt_bytes(stats.bytes_uploaded)})")
+    print(f"   Copiados: {stats.copied:,} (duplicados, copia en S3)")
+    print(f"   Saltados: {stats.skipped:,} (sin cambios por hash: {stats.unchanged:,})")
+    print(f"   Fallidos: {stats.failed:,}" + (" (ver --list-failed / --retry-failed)" if stats.failed else ""))
+    if stats.retries or stats.resumed_parts:
+        print(f"   Reintentos: {stats.retries:,} | partes multipart reanudadas: {stats.resumed_parts:,}")
+    if stats.throttled_s:
+        print(f"   Espera por límite de ancho de banda: {stats.throttled_s:,.1f} s")
+    if stats.shards:
+        print(f"   Shards:   {stats.shards:,} .tar con {stats.packed:,} archivos chicos")
+    print(f"   Concurrencia máx.: chicos={stats.peak_small_workers} | grandes={stats.peak_large_workers}")
     print(f"   Faltan:   {remaining:,}")
+    print(f"   Ahorro:   {_fmt_bytes(stats.bytes_saved)} sin subir")
+
+    report = telemetry.write_report(
+        cfg.report_path, engine=cfg.engine, bucket=cfg.bucket, prefix=cfg.prefix, stats=asdict(stats),
+        config={
+            "max_workers": cfg.max_workers,
+            "max_workers_limit": cfg.max_workers_limit,
+            "large_file_workers": cfg.large_file_workers,
+            "multipart_threshold_mb": cfg.multipart_threshold_mb,
+            "multipart_chunksize_mb": cfg.multipart_chunksize_mb,
+            "multipart_concurrency": cfg.multipart_concurrency,
+            "compress": cfg.compress,
+        },
+    )
+    lat = report["latency_uploaded"]
+    if lat["count"]:
+        print(
+            f"   Velocidad: {report['mb_per_s']:,.2f} MB/s | latencia por archivo p50={lat['p50_s']:.2f}s "
+            f"p95={lat['p95_s']:.2f}s p99={lat['p99_s']:.2f}s"
+        )
+    comp = report["compression"]
+    if comp["files"]:
+        print(
+            f"   Compresión: {comp['files']:,} archivos | {_fmt_bytes(comp['raw_bytes'])} → {_fmt_bytes(comp['sent_bytes'])} "
+            f"(x{comp['ratio']}) | ahorro {_fmt_bytes(comp['saved_bytes'])} | efectivo {comp['effective_mb_per_s']:,.2f} MB/s "
+            f"(x{comp['throughput_gain']} sobre la red)"
+        )
+    print(f"📈 Reporte: {cfg.report_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,18 @@
+import pytest
+
+BUCKET = "bucket-test"
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    """Cliente S3 sobre moto con `bucket-test` creado; sin moto instalado la prueba se salta."""
+    moto = pytest.importorskip("moto")
+    import boto3
+
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
@@ -0,0 +1,69 @@
+import socket
+
+import pytest
+
+pytest.importorskip("aiobotocore")
+server = pytest.importorskip("moto.server")
+
+import boto3  # noqa: E402
+
+from pda_s3_uploader.aio_engine import run_async_upload  # noqa: E402
+from pda_s3_uploader.manifest import Manifest  # noqa: E402
+from pda_s3_uploader.retry import RetryPolicy  # noqa: E402
+from pda_s3_uploader.scanner import scan_files  # noqa: E402
+
+BUCKET = "bucket-aio"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def endpoint(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    monkeypatch.setattr("moto.s3.models.S3_UPLOAD_PART_MIN_SIZE", 1)
+    port = _free_port()
+    srv = server.ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    srv.start()
+    url = f"http://127.0.0.1:{port}"
+    boto3.client("s3", region_name="us-east-1", endpoint_url=url).create_bucket(Bucket=BUCKET)
+    yield url
+    srv.stop()
+
+
+def test_async_engine_uploads_multipart_and_copies_duplicates(endpoint, tmp_path):
+    data = tmp_path / "data"
+    (data / "sub").mkdir(parents=True)
+    (data / "a.txt").write_text("hola")
+    (data / "sub" / "copia.txt").write_text("hola")  # mismo contenido → CopyObject
+    (data / "vacio.txt").write_bytes(b"")
+    big = bytes(range(256)) * 12 * 1024  # 3 MB → multipart con partes de 1 MB
+    (data / "grande.bin").write_bytes(big)
+    manifest_path = tmp_path / "manifest.sqlite"
+
+    kwargs = dict(
+        bucket=BUCKET, prefix="PDA", local_dir=data, manifest_path=manifest_path, region="us-east-1",
+        endpoint_url=endpoint, max_concurrency=4, multipart_threshold_mb=2, multipart_chunksize_mb=1,
+        retry=RetryPolicy(attempts=2, base_s=0, max_s=0),
+    )
+    stats = run_async_upload(files=scan_files(data, "*"), **kwargs)
+
+    assert (stats.total, stats.failed) == (4, 0)
+    assert stats.uploaded + stats.copied == 4 and stats.copied == 1
+    assert 1 <= stats.peak_small_workers <= 4  # requests en vuelo medidos, no el tope configurado
+    assert stats.peak_large_workers == 1
+    s3 = boto3.client("s3", region_name="us-east-1", endpoint_url=endpoint)
+    assert s3.get_object(Bucket=BUCKET, Key="PDA/grande.bin")["Body"].read() == big
+    assert s3.get_object(Bucket=BUCKET, Key="PDA/sub/copia.txt")["Body"].read() == b"hola"
+    assert s3.get_object(Bucket=BUCKET, Key="PDA/vacio.txt")["ContentLength"] == 0
+
+    m = Manifest(manifest_path)
+    assert len(m) == 4 and m.get_multipart(data / "grande.bin") is None
+    m.close()
+
+    again = run_async_upload(files=scan_files(data, "*"), **kwargs)
+    assert again.skipped == 4 and again.uploaded == 0
@@ -0,0 +1,72 @@
+import gzip
+import os
+
+import pytest
+
+from pda_s3_uploader.compression import compress_with_digests, decompress, parse_rules, read_object, rule_for
+from pda_s3_uploader.hashing import file_digests
+from pda_s3_uploader.scanner import scan_files
+from pda_s3_uploader.uploader import upload_files
+
+BUCKET = "bucket-test"
+CSV = ("fecha,programa,estudiantes\n" + "2026-01-15,Ingeniería de Sistemas,1234\n" * 5000).encode("utf-8")
+
+
+def test_rules_and_single_pass_digests(tmp_path):
+    rules = parse_rules("**/*.csv=gzip;*.txt=gzip:9")
+    assert rule_for(rules, tmp_path.joinpath("sub", "a.csv").relative_to(tmp_path)).level == 6
+    assert rule_for(rules, tmp_path.joinpath("a.pdf").relative_to(tmp_path)) is None
+    with pytest.raises(ValueError):
+        parse_rules("*.csv=brotli")
+
+    src = tmp_path / "a.csv"
+    src.write_bytes(CSV)
+    h, md5, packed = compress_with_digests(src, rules[0], md5=True)
+    h2, md52, again = compress_with_digests(src, rules[0])
+    try:
+        assert (h, md5) == file_digests(src, md5=True)  # hash del original en la misma lectura
+        assert h2 == h and md52 is None  # sin md5=True no se calcula el MD5 del original
+        assert packed.worth_it and packed.size < len(CSV) / 5
+        assert packed.md5 == again.md5  # determinístico (gzip sin mtime ni nombre)
+        assert decompress(packed.path.read_bytes(), "gzip") == CSV
+    finally:
+        packed.discard()
+        again.discard()
+
+
+def test_zstd_roundtrip(tmp_path):
+    pytest.importorskip("zstandard")
+    src = tmp_path / "t.txt"
+    src.write_bytes(CSV)
+    _, _, packed = compress_with_digests(src, parse_rules("*.txt=zstd")[0])
+    try:
+        assert decompress(packed.path.read_bytes(), "zstd") == CSV
+    finally:
+        packed.discard()
+
+
+def test_upload_compressed_with_content_encoding(s3, tmp_path):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "export.csv").write_bytes(CSV)
+    (data / "aleatorio.csv").write_bytes(os.urandom(20_000))  # no comprime: se sube tal cual
+    kwargs = dict(
+        bucket=BUCKET, prefix="PDA", local_dir=data, region="us-east-1", max_workers=2,
+        compress=parse_rules("*.csv=gzip"),
+    )
+    st = upload_files(files=scan_files(data, "*"), manifest_path=tmp_path / "m.sqlite", **kwargs)
+
+    assert (st.uploaded, st.compressed, st.failed) == (2, 1, 0)
+    obj = s3.head_object(Bucket=BUCKET, Key="PDA/export.csv")
+    assert obj["ContentEncoding"] == "gzip"
+    assert obj["Metadata"]["uncompressed-size"] == str(len(CSV))
+    assert st.bytes_compression_saved == len(CSV) - obj["ContentLength"]
+    assert read_object(s3, BUCKET, "PDA/export.csv") == CSV
+    assert gzip.decompress(s3.get_object(Bucket=BUCKET, Key="PDA/export.csv")["Body"].read()) == CSV
+    assert "ContentEncoding" not in s3.head_object(Bucket=BUCKET, Key="PDA/aleatorio.csv")
+
+    # manifest nuevo + --skip-if-exists: el comprimido se reconoce por tamaño y ETag del .gz
+    st = upload_files(
+        files=scan_files(data, "*"), manifest_path=tmp_path / "otro.sqlite", skip_if_exists_in_s3=True, **kwargs
+    )
+    assert st.skipped == 2 and st.uploaded == 0
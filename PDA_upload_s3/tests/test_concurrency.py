@@ -0,0 +1,28 @@
+import pytest
+
+from pda_s3_uploader.concurrency import AIMDLimiter
+
+
+def test_aimd_grows_on_success_and_halves_on_error():
+    lim = AIMDLimiter(4, maximum=6)
+    for _ in range(40):
+        with lim.slot(nbytes=1000):
+            pass
+    assert lim.limit == 6 and lim.peak == 6
+
+    with pytest.raises(TimeoutError):
+        with lim.slot():
+            raise TimeoutError("red caída")
+    assert lim.limit == 3
+
+    # errores que no son de red/throttling no indican congestión
+    for exc in (FileNotFoundError("no existe"), PermissionError("bloqueado"), KeyboardInterrupt()):
+        with pytest.raises(type(exc)):
+            with lim.slot():
+                raise exc
+    assert lim.limit == 3 and lim._active == 0
+
+    for _ in range(3):
+        lim.acquire()
+        lim.release(ok=False)
+    assert lim.limit == 1  # nunca baja del mínimo
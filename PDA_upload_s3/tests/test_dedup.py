@@ -0,0 +1,47 @@
+import os
+
+from pda_s3_uploader.manifest import Manifest
+from pda_s3_uploader.scanner import scan_files
+from pda_s3_uploader.uploader import upload_files
+
+BUCKET = "bucket-test"
+
+
+def _run(local_dir, manifest_path):
+    return upload_files(
+        bucket=BUCKET, prefix="PDA", local_dir=local_dir, files=scan_files(local_dir, "*"),
+        manifest_path=manifest_path, region="us-east-1", max_workers=2,
+    )
+
+
+def test_hash_dedup_and_change_detection(s3, tmp_path):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "a.pdf").write_bytes(b"A" * 1000)
+    (data / "a_copia.pdf").write_bytes(b"A" * 1000)
+    (data / "b.pdf").write_bytes(b"B" * 10)
+    manifest_path = tmp_path / "manifest.sqlite"
+
+    st = _run(data, manifest_path)
+    assert (st.uploaded, st.copied, st.failed) == (2, 1, 0)
+    assert st.bytes_saved == 1000
+    assert s3.get_object(Bucket=BUCKET, Key="PDA/a_copia.pdf")["Body"].read() == b"A" * 1000
+
+    # mtime cambia pero el contenido no: no se re-sube
+    os.utime(data / "b.pdf", ns=(1, 1))
+    # renombrado con contenido ya subido: copia server-side
+    (data / "renombrado.pdf").write_bytes(b"B" * 10)
+    # contenido modificado: sí se re-sube
+    (data / "a.pdf").write_bytes(b"C" * 1000)
+
+    st = _run(data, manifest_path)
+    assert (st.uploaded, st.copied, st.unchanged, st.failed) == (1, 1, 1, 0)
+    assert s3.get_object(Bucket=BUCKET, Key="PDA/a.pdf")["Body"].read() == b"C" * 1000
+
+    m = Manifest.load(manifest_path)
+    assert m.get(data / "b.pdf")["mtime_ns"] == 1
+    assert m.find_by_hash(m.get(data / "a.pdf")["sha256"])["key"] == "PDA/a.pdf"
+    m.close()
+
+    st = _run(data, manifest_path)
+    assert st.skipped == st.total == 4
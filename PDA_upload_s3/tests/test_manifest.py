@@ -0,0 +1,64 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from pda_s3_uploader.manifest import Manifest
+
+
+def test_concurrent_marks_are_flushed_in_batches(tmp_path):
+    m = Manifest(tmp_path / "manifest.sqlite", batch_size=64)
+    paths = [Path(f"data/f{i}.pdf") for i in range(1000)]
+
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        list(ex.map(lambda p: m.mark_uploaded(p, bucket="b", key=p.name, size=1, sha256=p.name), paths))
+    assert len(m) == 1000
+    m.close()
+
+    m = Manifest.load(tmp_path / "manifest.sqlite")
+    assert len(m) == 1000
+    assert m.is_uploaded(Path("data/f999.pdf"))
+    assert m.find_by_hash("f10.pdf")["key"] == "f10.pdf"
+    m.close()
+
+
+def test_imports_legacy_json_and_compacts(tmp_path):
+    real = tmp_path / "real.pdf"
+    real.write_bytes(b"x")
+    legacy = tmp_path / "manifest.json"
+    legacy.write_text(json.dumps({"uploaded": {
+        real.as_posix(): {"bucket": "b", "key": "real.pdf", "size": 1},
+        (tmp_path / "borrado.pdf").as_posix(): {"bucket": "b", "key": "borrado.pdf", "size": 2},
+    }}), encoding="utf-8")
+
+    m = Manifest.load(legacy)
+    assert m.path == tmp_path / "manifest.sqlite"
+    assert not legacy.exists() and (tmp_path / "manifest.json.migrated").exists()
+    assert m.get(real) == {"bucket": "b", "key": "real.pdf", "size": 1, "mtime_ns": None, "sha256": None, "member": None}
+    assert m.compact(prune_missing=True) == 1
+    m.close()
+
+    m = Manifest.load(legacy)  # ya migrado: no se vuelve a importar el JSON
+    assert len(m) == 1
+    m.close()
+
+
+def test_default_sqlite_path_imports_sibling_json(tmp_path):
+    # actualización con el default nuevo (MANIFEST_PATH=outputs/manifest.sqlite) y el JSON viejo al lado
+    legacy = tmp_path / "outputs" / "manifest.json"
+    legacy.parent.mkdir()
+    legacy.write_text(json.dumps({"uploaded": {
+        "data/a.pdf": {"bucket": "b", "key": "a.pdf", "size": 1, "mtime_ns": 5, "sha256": "h1"},
+    }}), encoding="utf-8")
+
+    m = Manifest.load(tmp_path / "outputs" / "manifest.sqlite")
+    assert m.is_unchanged(Path("data/a.pdf"), size=1, mtime_ns=5)
+    assert m.find_by_hash("h1")["key"] == "a.pdf"
+    m.close()
+    assert not legacy.exists()
+    assert (tmp_path / "outputs" / "manifest.json.migrated").exists()
+
+    legacy.write_text(json.dumps({"uploaded": {}}), encoding="utf-8")
+    m = Manifest.load(tmp_path / "outputs" / "manifest.sqlite")  # el SQLite ya existe: no se reimporta
+    assert len(m) == 1
+    m.close()
+    assert legacy.exists()
@@ -0,0 +1,57 @@
+import hashlib
+
+from pda_s3_uploader.remote import RemoteIndex
+from pda_s3_uploader.scanner import scan_files
+from pda_s3_uploader.uploader import upload_files
+
+BUCKET = "bucket-test"
+
+
+def test_snapshot_paginates_and_reads_etag(s3):
+    for i in range(1003):
+        s3.put_object(Bucket=BUCKET, Key=f"PDA/f{i}.pdf", Body=b"x" * (i % 7))
+    s3.put_object(Bucket=BUCKET, Key="OTRO/f.pdf", Body=b"x")
+
+    idx = RemoteIndex.snapshot(s3, BUCKET, "PDA/")
+    assert len(idx) == 1003
+    assert idx.matches("PDA/f3.pdf", 3)
+    assert not idx.matches("PDA/f3.pdf", 4)
+    assert idx.matches("PDA/f3.pdf", 3, md5=hashlib.md5(b"xxx").hexdigest())
+    assert not idx.matches("PDA/f3.pdf", 3, md5=hashlib.md5(b"yyy").hexdigest())
+
+
+def test_skip_if_exists_decides_locally(s3, tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "igual.pdf").write_bytes(b"mismo")
+    (data / "distinto.pdf").write_bytes(b"nuevo")
+    (data / "falta.pdf").write_bytes(b"falta")
+    s3.put_object(Bucket=BUCKET, Key="PDA/igual.pdf", Body=b"mismo")
+    s3.put_object(Bucket=BUCKET, Key="PDA/distinto.pdf", Body=b"viejo")  # mismo tamaño, otro contenido
+
+    def _no_head(*a, **k):
+        raise AssertionError("no debe haber head_object por archivo")
+
+    with monkeypatch.context() as m:
+        m.setattr("botocore.client.BaseClient._make_api_call", _guard(_no_head))
+        st = upload_files(
+            bucket=BUCKET, prefix="PDA", local_dir=data, files=scan_files(data, "*"),
+            manifest_path=tmp_path / "manifest.sqlite", region="us-east-1", max_workers=2, skip_if_exists_in_s3=True,
+        )
+
+    assert st.remote_objects == 2
+    assert (st.skipped, st.uploaded, st.failed) == (1, 2, 0)
+    assert s3.get_object(Bucket=BUCKET, Key="PDA/distinto.pdf")["Body"].read() == b"nuevo"
+
+
+def _guard(on_head):
+    from botocore.client import BaseClient
+
+    original = BaseClient._make_api_call
+
+    def _call(self, operation_name, params):
+        if operation_name == "HeadObject":
+            on_head()
+        return original(self, operation_name, params)
+
+    return _call
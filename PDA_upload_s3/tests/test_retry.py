@@ -0,0 +1,103 @@
+import pytest
+from botocore.exceptions import ClientError
+
+from pda_s3_uploader.manifest import Manifest
+from pda_s3_uploader.multipart import resumable_upload
+from pda_s3_uploader.retry import RetryPolicy, retry_call
+from pda_s3_uploader.scanner import ScannedFile, scan_files
+from pda_s3_uploader.uploader import upload_files
+
+BUCKET = "bucket-test"
+NO_WAIT = RetryPolicy(attempts=4, base_s=0, max_s=0)
+
+
+def _err(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "PutObject")
+
+
+def test_retry_only_transient_errors():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise _err("SlowDown")
+        return "ok"
+
+    assert retry_call(flaky, NO_WAIT) == "ok" and len(calls) == 3
+
+    calls.clear()
+
+    def denied():
+        calls.append(1)
+        raise _err("AccessDenied")
+
+    with pytest.raises(ClientError):
+        retry_call(denied, NO_WAIT)
+    assert len(calls) == 1
+
+
+def test_multipart_resumes_from_persisted_parts(s3, tmp_path, monkeypatch):
+    monkeypatch.setattr("moto.s3.models.S3_UPLOAD_PART_MIN_SIZE", 1)
+    src = tmp_path / "grande.bin"
+    payload = bytes(range(256)) * 40  # 10 KB → 10 partes de 1 KB
+    src.write_bytes(payload)
+    f = ScannedFile.of(src)
+    store = Manifest(tmp_path / "manifest.sqlite")
+
+    sent = []
+    real = s3.upload_part
+
+    def cortar_en_la_4(**kw):
+        if kw["PartNumber"] == 4:
+            raise ConnectionError("VPN caída")
+        sent.append(kw["PartNumber"])
+        return real(**kw)
+
+    s3.upload_part = cortar_en_la_4
+    with pytest.raises(ConnectionError):
+        resumable_upload(s3, bucket=BUCKET, key="PDA/grande.bin", f=f, store=store, part_size=1024, concurrency=1)
+    saved = store.get_multipart(src)["parts"]
+    assert 4 not in saved and sorted(saved) == sorted(sent)
+
+    s3.upload_part = real
+    reused = resumable_upload(s3, bucket=BUCKET, key="PDA/grande.bin", f=f, store=store, part_size=1024, concurrency=3)
+    assert reused == len(saved) >= 3
+    assert store.get_multipart(src) is None
+    assert s3.get_object(Bucket=BUCKET, Key="PDA/grande.bin")["Body"].read() == payload
+    store.close()
+
+
+def test_failure_ledger_and_retry_failed(s3, tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "ok.pdf").write_bytes(b"ok")
+    (data / "malo.pdf").write_bytes(b"malo")
+    manifest_path = tmp_path / "manifest.sqlite"
+
+    from botocore.client import BaseClient
+
+    original = BaseClient._make_api_call
+
+    def _denegar_malo(self, op, params):
+        if op == "PutObject" and params.get("Key") == "PDA/malo.pdf":
+            raise _err("AccessDenied")
+        return original(self, op, params)
+
+    kw = dict(bucket=BUCKET, prefix="PDA", local_dir=data, manifest_path=manifest_path, region="us-east-1",
+              max_workers=2, retry=NO_WAIT)
+    with monkeypatch.context() as m:
+        m.setattr(BaseClient, "_make_api_call", _denegar_malo)
+        st = upload_files(files=scan_files(data, "*"), **kw)
+    assert (st.uploaded, st.failed) == (1, 1)
+
+    man = Manifest.load(manifest_path)
+    fails = man.failures()
+    man.close()
+    assert [(x["path"], x["error_class"], x["runs"]) for x in fails] == [((data / "malo.pdf").as_posix(), "ClientError", 1)]
+
+    st = upload_files(files=[ScannedFile.of(data / "malo.pdf")], **kw)
+    assert (st.uploaded, st.failed) == (1, 0)
+    man = Manifest.load(manifest_path)
+    assert man.failures() == []
+    man.close()
@@ -0,0 +1,16 @@
+from pda_s3_uploader.scanner import iter_files, scan_files
+
+
+def test_scan_matches_rglob(tmp_path):
+    for rel in ["a.pdf", "b.txt", "sub/c.pdf", "sub/deep/d.PDF", "sub/deep/e.pdf", "otra/f.pdf"]:
+        p = tmp_path / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(b"x" * len(rel))
+
+    for pattern in ["*", "*.pdf", "**/*.pdf", "sub/*.pdf", "deep/*"]:
+        expected = sorted(p for p in tmp_path.rglob(pattern) if p.is_file())
+        assert iter_files(tmp_path, pattern) == expected, pattern
+
+    found = {f.path.name: f for f in scan_files(tmp_path, "*.pdf")}
+    assert found["c.pdf"].size == len("sub/c.pdf")
+    assert found["c.pdf"].mtime_ns == (tmp_path / "sub/c.pdf").stat().st_mtime_ns
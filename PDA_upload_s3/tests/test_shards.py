@@ -0,0 +1,29 @@
+from pda_s3_uploader.manifest import Manifest
+from pda_s3_uploader.scanner import scan_files
+from pda_s3_uploader.shards import read_member
+from pda_s3_uploader.uploader import upload_files
+
+BUCKET = "bucket-test"
+
+
+def test_small_files_are_packed_and_retrievable(s3, tmp_path):
+    data = tmp_path / "data"
+    (data / "sub").mkdir(parents=True)
+    for i in range(30):
+        (data / "sub" / f"t{i}.txt").write_bytes(f"transcripcion {i}".encode() * (i + 1))
+    (data / "grande.pdf").write_bytes(b"G" * 50_000)
+
+    st = upload_files(
+        bucket=BUCKET, prefix="PDA", local_dir=data, files=scan_files(data, "*"),
+        manifest_path=tmp_path / "manifest.sqlite", region="us-east-1", max_workers=2,
+        pack_small_kb=1, shard_mb=1,
+    )
+    assert (st.uploaded, st.failed) == (31, 0)
+    assert st.packed == 30 and st.shards == 1
+
+    m = Manifest.load(tmp_path / "manifest.sqlite")
+    entry = m.get(data / "sub" / "t7.txt")
+    m.close()
+    assert entry["key"].startswith("PDA/_shards/") and entry["member"] == "sub/t7.txt"
+    assert read_member(s3, BUCKET, entry["key"], entry["member"]) == b"transcripcion 7" * 8
+    assert s3.get_object(Bucket=BUCKET, Key="PDA/grande.pdf")["ContentLength"] == 50_000
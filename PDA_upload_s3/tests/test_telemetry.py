@@ -0,0 +1,49 @@
+import json
+
+from pda_s3_uploader.scanner import scan_files
+from pda_s3_uploader.telemetry import FileRecord, Telemetry, percentile, size_bucket
+from pda_s3_uploader.uploader import upload_files
+
+
+def test_percentile_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 50) is None
+
+
+def test_report_buckets_and_eta(tmp_path):
+    tel = Telemetry(workers=4)
+    tel.expect(3 * 1024 ** 2 + 1000)
+    tel.add_bytes(1000)
+    tel.record(FileRecord(path="a.txt", size=1000, outcome="UPLOADED", bytes_sent=1000, seconds=0.5))
+    tel.record(FileRecord(path="b.bin", size=3 * 1024 ** 2, outcome="UPLOADED", bytes_sent=3 * 1024 ** 2,
+                          seconds=2.0, retries=1, parts=[0.8, 1.1, 0.9]))
+    tel.record(FileRecord(path="c.txt", size=10, outcome="COPIED", seconds=0.1))
+    assert tel.eta_s() is None or tel.eta_s() > 0  # quedan bytes por subir
+
+    data = tel.write_report(tmp_path / "r.json", engine="threads")
+    assert json.loads((tmp_path / "r.json").read_text(encoding="utf-8"))["engine"] == "threads"
+    assert data["outcomes"] == {"UPLOADED": 2, "COPIED": 1}
+    assert data["retries"] == 1
+    assert set(data["by_size"]) == {size_bucket(1000), size_bucket(3 * 1024 ** 2)} == {"<64KB", "1-16MB"}
+    assert data["by_size"]["1-16MB"]["mb_per_s_per_file"] == 1.5
+    assert data["multipart_parts"]["count"] == 3 and data["multipart_parts"]["max_s"] == 1.1
+    assert data["latency_uploaded"]["count"] == 2
+    assert data["slowest"][0]["path"] == "b.bin"
+
+
+def test_uploader_feeds_telemetry(s3, tmp_path):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "a.txt").write_bytes(b"a" * 2048)
+    (data / "b.txt").write_bytes(b"a" * 2048)  # duplicado → copia, sin bytes enviados
+    tel = Telemetry()
+    upload_files(
+        bucket="bucket-test", prefix="", local_dir=data, files=scan_files(data, "*"),
+        manifest_path=tmp_path / "m.sqlite", region="us-east-1", max_workers=2, telemetry=tel,
+    )
+    assert tel.bytes_done == 2048
+    assert sorted(r.outcome for r in tel.records) == ["COPIED", "UPLOADED"]
+    assert tel.bytes_expected == tel.bytes_done and tel.eta_s() == 0.0
@@ -0,0 +1,90 @@
+import threading
+import time
+from datetime import time as dtime
+
+import pytest
+
+from pda_s3_uploader.scanner import scan_files
+from pda_s3_uploader.throttle import MB, PAUSE, BandwidthSchedule, Throttle
+from pda_s3_uploader.uploader import upload_files
+
+
+def test_schedule_windows_cross_midnight():
+    sched = BandwidthSchedule.parse("20:00-06:00=full;12:00-13:00=pause;07:00-20:00=2", default_mb_s=5)
+    assert sched.rate_at(dtime(23, 30)) is None
+    assert sched.rate_at(dtime(5, 59)) is None
+    assert sched.rate_at(dtime(12, 15)) == PAUSE  # la primera ventana que coincide gana
+    assert sched.rate_at(dtime(9, 0)) == 2 * MB
+    assert sched.rate_at(dtime(6, 30)) == 5 * MB  # fuera de toda ventana: default
+    with pytest.raises(ValueError):
+        BandwidthSchedule.parse("08:00-09:00=0")
+
+
+def test_token_bucket_is_shared_across_threads():
+    throttle = Throttle(BandwidthSchedule(default=2 * MB), burst_s=0.1)
+
+    def worker():
+        for _ in range(5):
+            throttle.consume(100 * 1024)
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    # 4 hilos × 5 × 100 KB ≈ 2 MB a 2 MB/s → ~1 s en total (no 1 s por hilo en paralelo sin límite)
+    assert 0.8 <= elapsed < 3
+    assert throttle.waited_s > 0
+
+
+def test_pause_window_blocks_new_transfers():
+    now = {"t": dtime(12, 30)}
+    changes = []
+    throttle = Throttle(
+        BandwidthSchedule.parse("12:00-13:00=pause"), clock=lambda: now["t"], on_change=changes.append
+    )
+    assert throttle.paused
+    stop = threading.Event()
+    stop.set()
+    assert throttle.wait_open(stop) is False  # un daemon que se detiene no queda colgado en la pausa
+
+    now["t"] = dtime(13, 0)
+    assert throttle.wait_open(stop) is True
+    assert changes == [None]
+
+
+def test_pause_without_default_still_holds_in_flight_transfers():
+    # sin BANDWIDTH_MB_S (default None): lo que ya estaba en vuelo no puede seguir a toda velocidad en la pausa
+    throttle = Throttle(
+        BandwidthSchedule.parse("12:00-13:00=pause"), clock=lambda: dtime(12, 30), burst_s=0.1, pause_drain=512 * 1024,
+    )
+    assert throttle.schedule.default is None
+    t0 = time.perf_counter()
+    for _ in range(4):
+        throttle.consume(64 * 1024)
+    assert time.perf_counter() - t0 >= 0.4  # 256 KB a 512 KB/s
+    assert throttle.waited_s > 0
+
+
+def test_from_config_disabled_without_limits():
+    assert Throttle.from_config(0, "") is None
+    assert Throttle.from_config(1.5).rate == 1.5 * MB
+
+
+def test_upload_files_respects_bandwidth_cap(s3, tmp_path):
+    data = tmp_path / "data"
+    data.mkdir()
+    for i in range(4):
+        (data / f"f{i}.bin").write_bytes(bytes([i]) * 256 * 1024)
+    throttle = Throttle(BandwidthSchedule(default=1 * MB), burst_s=0.1)
+    t0 = time.perf_counter()
+    stats = upload_files(
+        bucket="bucket-test", prefix="", local_dir=data, files=scan_files(data, "*"),
+        manifest_path=tmp_path / "m.sqlite", region="us-east-1", max_workers=4, throttle=throttle,
+    )
+    elapsed = time.perf_counter() - t0
+    assert stats.uploaded == 4
+    assert elapsed >= 0.8  # 1 MB a 1 MB/s
+    assert stats.throttled_s > 0
@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+
+import pytest
+
+from pda_s3_uploader.scanner import ScannedFile
+from pda_s3_uploader.uploader import UploadStats
+from pda_s3_uploader.watcher import FolderWatcher
+
+
+class _Recorder:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, files):
+        batch = [ScannedFile.of(f).path.name for f in files]
+        self.batches.append(sorted(batch))
+        return UploadStats(total=len(batch), uploaded=len(batch), skipped=0, failed=0)
+
+
+def test_debounce_waits_until_file_is_stable(tmp_path):
+    rec = _Recorder()
+    w = FolderWatcher(tmp_path, "*.pdf", rec, debounce_s=0.2, use_events=False, log=lambda m: None)
+    f = tmp_path / "a.pdf"
+    f.write_bytes(b"x")
+    w.notify(f)
+    w.notify(tmp_path / "b.pdf.crdownload")  # descarga a medio camino: se ignora
+    w.notify(tmp_path / "c.txt")  # no coincide con el patrón
+    assert w.pending == 1
+
+    assert w.run_once() is None  # todavía dentro del debounce
+    time.sleep(0.25)
+    with open(f, "ab") as fh:
+        fh.write(b"mas")  # sigue escribiéndose (cambió size/mtime sin evento)
+    assert w.run_once() is None and w.pending == 1
+    time.sleep(0.25)
+    assert w.run_once().uploaded == 1
+    assert rec.batches == [["a.pdf"]] and w.pending == 0
+    assert len(w.stats.latency_s) == 1
+
+
+def test_reconcile_skips_fresh_files(tmp_path):
+    rec = _Recorder()
+    w = FolderWatcher(tmp_path, "**/*.pdf", rec, debounce_s=60, use_events=False, log=lambda m: None)
+    (tmp_path / "sub").mkdir()
+    old = tmp_path / "sub" / "viejo.pdf"
+    old.write_bytes(b"1")
+    os.utime(old, (time.time() - 3600, time.time() - 3600))
+    (tmp_path / "nuevo.pdf").write_bytes(b"2")  # recién escrito: queda pendiente, no entra al recorrido
+    w.reconcile()
+    assert rec.batches == [["viejo.pdf"]]
+    assert w.pending == 1
+
+
+def test_events_upload_new_files(tmp_path):
+    pytest.importorskip("watchdog")
+    rec = _Recorder()
+    w = FolderWatcher(tmp_path, "*.pdf", rec, debounce_s=0.2, tick_s=0.05, log=lambda m: None)
+    stop = threading.Event()
+    t = threading.Thread(target=w.run, args=(stop,))
+    t.start()
+    try:
+        time.sleep(0.3)  # reconciliación inicial (carpeta vacía) + observer arriba
+        (tmp_path / "nuevo.pdf").write_bytes(b"pdf")
+        deadline = time.time() + 5
+        while time.time() < deadline and ["nuevo.pdf"] not in rec.batches:
+            time.sleep(0.05)
+    finally:
+        stop.set()
+        t.join()
+    assert ["nuevo.pdf"] in rec.batches
@@ -5,11 +5,10 @@ import os
 from pathlib import Path
 
 import joblib
-import numpy as np
-import pandas as pd
 from dotenv import load_dotenv
 
-from rematricula_models.scoring import apply_topM_flag, ScoringConfig
+from rematricula_models.scoring import ScoringConfig
+from rematricula_models.streaming import SOURCES, iter_input, score_stream, text_dtypes
 
 load_dotenv()
 
@@ -19,39 +18,32 @@ def main():
 
     parser = argparse.ArgumentParser(description="Predice rematrícula usando artefacto .joblib entrenado.")
     parser.add_argument("--model-path", default=os.environ.get("MODEL_PATH", "outputs/models/rematricula_xgb.joblib"))
-    parser.add_argument("--data", default=os.environ.get("PREDICT_DATA_PATH", "data/nuevos.csv"))
-    parser.add_argument("--out", default=os.environ.get("PREDICT_OUT", "outputs/reports/predicciones.csv"))
+    parser.add_argument("--data", default=os.environ.get("PREDICT_DATA_PATH", "data/nuevos.csv"),
+                        help="CSV, Parquet o archivo .sql (con --source sql).")
+    parser.add_argument("--source", choices=SOURCES, default=os.environ.get("PREDICT_SOURCE") or None,
+                        help="Por defecto se infiere de la extensión de --data.")
+    parser.add_argument("--out", default=os.environ.get("PREDICT_OUT", "outputs/reports/predicciones.csv"),
+                        help=".csv (utf-8-sig) o .parquet")
     parser.add_argument("--topM", type=int, default=int(os.environ.get("TOPM", "250")))
+    parser.add_argument("--chunksize", type=int, default=int(os.environ.get("PREDICT_CHUNKSIZE", "200000")),
+                        help="Filas por bloque (0 = todo en memoria de una vez).")
+    parser.add_argument("--tmp-dir", default=os.environ.get("PREDICT_TMP_DIR") or None,
+                        help="Carpeta para los bloques puntuados temporales (defecto: la carpeta de --out).")
     args = parser.parse_args()
 
     bundle = joblib.load(args.model_path)
-    pipe = bundle["pipeline"]
-    platt = bundle["platt"]
-    s = float(bundle.get("count_scalar", 1.0))
-    feature_cols = bundle["feature_cols"]
 
-    df = pd.read_csv(args.data)
-    missing = [c for c in feature_cols if c not in df.columns]
-    if missing:
-        raise ValueError(f"Faltan columnas para predecir: {missing[:20]}{'...' if len(missing)>20 else ''}")
-
-    X = df[feature_cols].copy()
-    p_raw = pipe.predict_proba(X)[:, 1]
-    p_cal = platt.predict(p_raw)
-    p_adj = np.clip(p_cal * s, 0, 1)
-
-    out_df = df.copy()
-    out_df["p_raw"] = p_raw
-    out_df["p_cal"] = p_cal
-    out_df["y_proba"] = p_adj
-
-    out_df = apply_topM_flag(out_df, ScoringConfig(topM=args.topM, proba_col="y_proba", flag_col="gestionar"))
-
-    out_path = Path(args.out)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_df.to_csv(out_path, index=False, encoding="utf-8-sig")
-
-    print(f"✅ Predicciones guardadas: {out_path}")
+    stats = score_stream(
+        bundle,
+        iter_input(args.data, source=args.source, chunksize=args.chunksize, dtype=text_dtypes(bundle)),
+        Path(args.out),
+        ScoringConfig(topM=args.topM, proba_col="y_proba", flag_col="gestionar"),
+        tmp_dir=Path(args.tmp_dir) if args.tmp_dir else None,
+    )
+
+    print(f"📊 {stats.rows:,} filas en {stats.chunks:,} bloque(s) | {stats.rows_per_s:,.0f} filas/s")
+    print(f"🎯 Top-{args.topM}: umbral={stats.threshold:.4f} | gestionar={stats.flagged:,}")
+    print(f"✅ Predicciones guardadas: {args.out}")
 
 
 if __name__ == "__main__":
@@ -5,6 +5,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 from sqlalchemy import create_engine, text
 from urllib.parse import quote_plus
@@ -54,6 +55,24 @@ def compute_label_row(row: pd.Series, cfg: DataConfig, orden_map: Dict[str, int]
     return 0
 
 
+def period_codes(s: pd.Series, orden_map: Dict[str, int]) -> np.ndarray:
+    """Posición de cada periodo en `orden_map` como arreglo int (0 = periodo fuera del orden / nulo)."""
+    keys = pd.Index(list(orden_map))
+    codes = np.fromiter(orden_map.values(), dtype=np.int64, count=len(orden_map))
+    pos = keys.get_indexer(s)
+    return np.where(pos >= 0, codes[pos], 0)
+
+
+def compute_labels(df: pd.DataFrame, cfg: DataConfig, orden_map: Dict[str, int]) -> np.ndarray:
+    """Versión vectorizada de `compute_label_row` (misma etiqueta fila a fila, sin un llamado Python por fila)."""
+    if cfg.col_estado_actual not in df.columns or cfg.col_periodo_paga not in df.columns:
+        return np.zeros(len(df), dtype=int)
+    pago = (df[cfg.col_estado_actual].astype(str).str.upper() == "YA PAGO").to_numpy(dtype=bool, na_value=False)
+    i_cp = period_codes(df[cfg.col_periodo].astype(str), orden_map)
+    i_pp = period_codes(df[cfg.col_periodo_paga].astype(str), orden_map)
+    return (pago & (i_cp > 0) & (i_pp > 0) & (i_pp > i_cp)).astype(int)
+
+
 def build_engine_from_env() -> object:
     """Crea engine SQL Server usando variables de entorno.
 
@@ -126,6 +145,32 @@ def load_dataset(
 def add_label_and_period_order(df: pd.DataFrame, cfg: DataConfig) -> pd.DataFrame:
     orden_map = make_period_map(cfg)
 
+    periodo = norm_periodo(df[cfg.col_periodo])
+    orden = period_codes(periodo, orden_map)
+    keep = orden > 0
+
+    # una sola copia: se filtra primero y se normaliza solo lo que queda
+    df = df.loc[keep].copy()
+    df[cfg.col_periodo] = periodo[keep]
+    if cfg.col_periodo_paga in df.columns:
+        df[cfg.col_periodo_paga] = norm_periodo(df[cfg.col_periodo_paga])
+    df[cfg.col_periodo_orden] = orden[keep]
+
+    # si no existe target, lo crea
+    if cfg.col_target not in df.columns:
+        df[cfg.col_target] = compute_labels(df, cfg, orden_map)
+
+    return df
+
+
+def add_label_and_period_order_legacy(df: pd.DataFrame, cfg: DataConfig) -> pd.DataFrame:
+    """
+    Implementación original (doble copia + `apply` fila a fila con `compute_label_row`).
+
+    Se conserva como referencia para `src/bench_labels.py` y las pruebas de regresión.
+    """
+    orden_map = make_period_map(cfg)
+
     df = df.copy()
     df[cfg.col_periodo] = norm_periodo(df[cfg.col_periodo])
     if cfg.col_periodo_paga in df.columns:
@@ -135,7 +180,6 @@ def add_label_and_period_order(df: pd.DataFrame, cfg: DataConfig) -> pd.DataFram
     df = df[df[cfg.col_periodo_orden].notna()].copy()
     df[cfg.col_periodo_orden] = df[cfg.col_periodo_orden].astype(int)
 
-    # si no existe target, lo crea
     if cfg.col_target not in df.columns:
         df[cfg.col_target] = df.apply(lambda r: compute_label_row(r, cfg, orden_map), axis=1).astype(int)
 
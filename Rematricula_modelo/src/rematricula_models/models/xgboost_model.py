@@ -1,21 +1,31 @@
 from __future__ import annotations
 
 import os
+from typing import Optional
+
 import numpy as np
 import pandas as pd
 from xgboost import XGBClassifier
 
 
-def build_xgb(y_train: np.ndarray, prefer_gpu: bool = True) -> XGBClassifier:
+def build_xgb(
+    y_train: np.ndarray,
+    prefer_gpu: bool = True,
+    n_jobs: Optional[int] = None,
+    enable_categorical: bool = False,
+    n_estimators: int = 1200,
+    early_stopping_rounds: Optional[int] = None,
+) -> XGBClassifier:
     y_train = np.asarray(y_train).astype(int)
     pos = int((y_train == 1).sum())
     neg = int((y_train == 0).sum())
     spw = max(neg / max(pos, 1), 1.0)
 
-    n_jobs = max((os.cpu_count() or 8) - 2, 4)
+    if n_jobs is None:
+        n_jobs = max((os.cpu_count() or 8) - 2, 4)
 
     params = dict(
-        n_estimators=1200,
+        n_estimators=n_estimators,
         max_depth=6,
         learning_rate=0.03,
         subsample=0.8,
@@ -27,6 +37,12 @@ def build_xgb(y_train: np.ndarray, prefer_gpu: bool = True) -> XGBClassifier:
         scale_pos_weight=spw,
         n_jobs=n_jobs,
     )
+    if early_stopping_rounds:
+        # corta cuando el AUC del eval_set no mejora en `early_stopping_rounds` árboles (predict usa el mejor)
+        params.update(dict(early_stopping_rounds=early_stopping_rounds))
+    if enable_categorical:
+        # categóricas nativas (columnas `category` de FixedVocabEncoder encoding="native")
+        params.update(dict(enable_categorical=True))
 
     if prefer_gpu:
         # si no hay GPU/driver CUDA, xgboost lanzará error; el script hace fallback a CPU.
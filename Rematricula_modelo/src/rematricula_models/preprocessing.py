@@ -1,8 +1,16 @@
 from __future__ import annotations
 
-from typing import List, Tuple
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
+import joblib
+import numpy as np
 import pandas as pd
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import OneHotEncoder
 
@@ -28,3 +36,129 @@ def make_preprocessor(num_cols: List[str], cat_cols: List[str]) -> ColumnTransfo
             ("cat", ohe, cat_cols),
         ]
     )
+
+
+ENCODINGS = ("onehot", "native")
+CACHE_KEEP = 3  # matrices codificadas que se conservan en el cache (las más recientes)
+CACHE_FORMAT = 1  # súbelo si cambia FixedVocabEncoder o la forma de la matriz: invalida los enc_*.joblib viejos
+
+
+class FixedVocabEncoder(BaseEstimator, TransformerMixin):
+    """
+    Codificación con vocabulario fijo (se aprende una sola vez sobre todo el train):
+
+    - `encoding="onehot"`: numéricas primero y un one-hot por categoría (nulos = una categoría más, al final;
+      valores nuevos = fila en cero). Mismas columnas y misma salida que `make_preprocessor` ajustado con los mismos
+      datos, incluida la regla de `ColumnTransformer`: CSR si la densidad es < `sparse_threshold`, si no denso
+      (para XGBoost un cero ausente en CSR es "faltante": cambiar de formato cambiaría el modelo)
+    - `encoding="native"`: DataFrame con numéricas float y categóricas `category` de categorías fijas (códigos
+      estables para `enable_categorical` de XGBoost; valores nuevos = nulo)
+
+    Los folds cortan filas de la matriz ya codificada en vez de reajustar el encoder en cada uno.
+    """
+
+    def __init__(self, num_cols: List[str], cat_cols: List[str], encoding: str = "onehot", sparse_threshold: float = 0.3):
+        self.num_cols = num_cols
+        self.cat_cols = cat_cols
+        self.encoding = encoding
+        self.sparse_threshold = sparse_threshold
+
+    def fit(self, X: pd.DataFrame, y=None) -> "FixedVocabEncoder":
+        if self.encoding not in ENCODINGS:
+            raise ValueError(f"encoding debe ser uno de {ENCODINGS}")
+        self.vocab_: Dict[str, list] = {}
+        self.has_na_: Dict[str, bool] = {}
+        for c in self.cat_cols:
+            col = X[c]
+            values = col.dropna().unique()
+            try:
+                values = np.sort(np.asarray(values, dtype=object))
+            except TypeError:  # tipos mezclados: orden por texto
+                values = np.asarray(sorted(values, key=str), dtype=object)
+            self.vocab_[c] = list(values)
+            self.has_na_[c] = bool(col.isna().any())
+        names = list(self.num_cols)
+        for c in self.cat_cols:
+            names += [f"{c}_{v}" for v in self.vocab_[c]] + ([f"{c}_nan"] if self.has_na_[c] else [])
+        self.feature_names_ = names
+        # misma cuenta que ColumnTransformer: los bloques densos cuentan completos
+        nnz = len(X) * len(self.num_cols) + sum(
+            int((self._codes(X, c) >= 0).sum()) + int(X[c].isna().sum()) for c in self.cat_cols
+        )
+        total = len(X) * len(names)
+        self.sparse_output_ = bool(total) and nnz / total < self.sparse_threshold
+        return self
+
+    def _codes(self, X: pd.DataFrame, c: str) -> np.ndarray:
+        """Posición en el vocabulario (-1 = nulo o valor nuevo)."""
+        return pd.Index(self.vocab_[c], dtype=object).get_indexer(X[c].astype(object))
+
+    def transform(self, X: pd.DataFrame):
+        if self.encoding == "native":
+            out = X[self.num_cols].astype(float)
+            for c in self.cat_cols:
+                out[c] = pd.Categorical.from_codes(self._codes(X, c), categories=self.vocab_[c])
+            return out
+
+        n = len(X)
+        blocks = [sp.csr_matrix(X[self.num_cols].to_numpy(dtype=float))] if self.num_cols else []
+        for c in self.cat_cols:
+            codes = self._codes(X, c).astype(np.int64)
+            width = len(self.vocab_[c]) + int(self.has_na_[c])
+            if self.has_na_[c]:
+                codes[X[c].isna().to_numpy()] = width - 1
+            rows = np.flatnonzero(codes >= 0)
+            blocks.append(sp.csr_matrix(
+                (np.ones(len(rows)), (rows, codes[rows])), shape=(n, width)
+            ))
+        if not blocks:
+            return sp.csr_matrix((n, 0))
+        out = sp.hstack(blocks, format="csr")
+        return out if self.sparse_output_ else out.toarray()
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        return np.asarray(self.feature_names_ if self.encoding == "onehot" else self.num_cols + self.cat_cols, dtype=object)
+
+
+def data_key(X: pd.DataFrame, enc: FixedVocabEncoder) -> str:
+    """Hash de contenido + lista de features + parámetros del encoder + versión del formato: clave del cache."""
+    params = {k: v for k, v in enc.get_params().items() if k not in ("num_cols", "cat_cols")}
+    h = hashlib.sha256()
+    h.update(json.dumps(
+        [CACHE_FORMAT, list(map(str, X.columns)), [str(t) for t in X.dtypes], params], sort_keys=True, default=str,
+    ).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    return h.hexdigest()[:24]
+
+
+def encode_cached(
+    X: pd.DataFrame,
+    num_cols: List[str],
+    cat_cols: List[str],
+    *,
+    encoding: str = "onehot",
+    cache_dir: Optional[Path] = None,
+) -> Tuple[FixedVocabEncoder, object, bool]:
+    """
+    Ajusta el encoder y codifica X una sola vez. Con `cache_dir`, guarda (encoder, matriz) en
+    `enc_<hash>.joblib` y lo reutiliza si los datos y las features no cambiaron. Devuelve (encoder, matriz, hit).
+    """
+    X = X[list(num_cols) + list(cat_cols)]
+    enc = FixedVocabEncoder(list(num_cols), list(cat_cols), encoding=encoding)
+    path = None
+    if cache_dir is not None:
+        path = Path(cache_dir) / f"enc_{data_key(X, enc)}.joblib"
+        if path.exists():
+            cached = joblib.load(path)
+            return cached["encoder"], cached["X"], True
+
+    enc.fit(X)
+    Xenc = enc.transform(X)
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        joblib.dump({"encoder": enc, "X": Xenc}, tmp)
+        os.replace(tmp, path)
+        for old in sorted(path.parent.glob("enc_*.joblib"), key=lambda f: f.stat().st_mtime, reverse=True)[CACHE_KEEP:]:
+            old.unlink(missing_ok=True)
+    return enc, Xenc, False
@@ -1,13 +1,61 @@
 from __future__ import annotations
 
+import heapq
 from dataclasses import dataclass
-from typing import Optional
+from typing import Iterable, List, Optional, Union
 
 import numpy as np
 import pandas as pd
 
 
-def threshold_for_topM(p: np.ndarray, topM: int) -> float:
+class TopMHeap:
+    """Los `topM` valores más altos vistos hasta ahora (min-heap): memoria O(topM) sin importar cuántas filas pasen.
+
+    `threshold` es el mismo que `threshold_for_topM` sobre todos los valores empujados: el topM-ésimo más alto
+    (contando repetidos), o el mínimo si no se alcanzan `topM` valores.
+    """
+
+    def __init__(self, topM: int):
+        self.topM = topM
+        self.n = 0
+        self.min = float("inf")
+        self._heap: List[float] = []
+
+    def push(self, p) -> None:
+        p = np.asarray(p, dtype=float).ravel()
+        if not len(p):
+            return
+        self.n += len(p)
+        self.min = min(self.min, float(np.min(p)))
+        if self.topM <= 0:
+            return
+        if len(p) > self.topM:
+            p = np.partition(p, -self.topM)[-self.topM:]  # solo los candidatos del chunk
+        if len(self._heap) >= self.topM:
+            p = p[p > self._heap[0]]
+        for v in p.tolist():
+            if len(self._heap) < self.topM:
+                heapq.heappush(self._heap, v)
+            elif v > self._heap[0]:
+                heapq.heapreplace(self._heap, v)
+
+    @property
+    def threshold(self) -> float:
+        if self.n == 0:
+            raise ValueError("TopMHeap vacío: no hay probabilidades")
+        if self.topM <= 0 or self.topM >= self.n:
+            return self.min
+        return self._heap[0]
+
+
+def threshold_for_topM(p: Union[np.ndarray, Iterable[np.ndarray]], topM: int) -> float:
+    """Umbral Top-M. `p` es un arreglo, o un iterable de arreglos (chunks) que se recorre una sola vez con
+    `TopMHeap` sin juntar todas las probabilidades en memoria."""
+    if not isinstance(p, (np.ndarray, pd.Series, list, tuple)):
+        heap = TopMHeap(topM)
+        for chunk in p:
+            heap.push(chunk)
+        return heap.threshold
     p = np.asarray(p, dtype=float)
     if topM <= 0 or topM >= len(p):
         return float(np.min(p))
@@ -24,6 +72,11 @@ class ScoringConfig:
 def apply_topM_flag(df: pd.DataFrame, cfg: ScoringConfig) -> pd.DataFrame:
     out = df.copy()
     thr = threshold_for_topM(out[cfg.proba_col].values, cfg.topM)
-    out[cfg.flag_col] = (out[cfg.proba_col].values >= thr).astype(int)
-    out["thr_topM"] = thr
-    return out
+    return flag_topM(out, cfg, thr)
+
+
+def flag_topM(df: pd.DataFrame, cfg: ScoringConfig, thr: float) -> pd.DataFrame:
+    """Marca `flag_col` con un umbral ya calculado (en el scoring por chunks, el global de `TopMHeap`). In-place."""
+    df[cfg.flag_col] = (df[cfg.proba_col].values >= thr).astype(int)
+    df["thr_topM"] = thr
+    return df
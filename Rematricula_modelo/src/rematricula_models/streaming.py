@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from .scoring import ScoringConfig, TopMHeap, flag_topM
+
+SOURCES = ("csv", "parquet", "sql")
+
+
+def infer_source(path: str) -> str:
+    suffixes = [s.lower() for s in Path(path).suffixes]
+    if suffixes and suffixes[-1] == ".parquet":
+        return "parquet"
+    if suffixes and suffixes[-1] == ".sql":
+        return "sql"
+    return "csv"
+
+
+def _iter_parquet(path: Path, chunksize: int) -> Iterator[pd.DataFrame]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:  # dependencia opcional
+        raise ImportError("Para leer Parquet instala pyarrow (pip install pyarrow).") from e
+
+    pf = pq.ParquetFile(path)
+    if chunksize <= 0:
+        yield pf.read().to_pandas()
+        return
+    for batch in pf.iter_batches(batch_size=chunksize):
+        yield batch.to_pandas()
+
+
+def _iter_sql(sql_path: Path, chunksize: int) -> Iterator[pd.DataFrame]:
+    from sqlalchemy import text
+
+    from .data import build_engine_from_env
+
+    q = Path(sql_path).read_text(encoding="utf-8")
+    if "SELECT" not in q.upper():
+        raise ValueError(f"El archivo SQL parece vacío: {sql_path}")
+    engine = build_engine_from_env()
+    with engine.connect() as conn:
+        if chunksize <= 0:
+            yield pd.read_sql(text(q), conn)
+            return
+        # pandas trae las filas con fetchmany(chunksize): mssql+pyodbc no tiene cursores del lado del servidor
+        # (stream_results se ignora), pero el driver ODBC las va leyendo de la red a medida que se piden
+        yield from pd.read_sql(text(q), conn, chunksize=chunksize)
+
+
+def iter_input(
+    path: str, *, source: Optional[str] = None, chunksize: int = 200_000, dtype: Optional[Dict[str, object]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Lee la base a predecir por bloques de `chunksize` filas (0 = todo de una vez, como antes).
+
+    - csv: `pd.read_csv(chunksize=..., dtype=dtype)`. Cada bloque infiere sus tipos: sin `dtype`, una categórica
+      como `101`…`A7` sale int64 en un bloque y texto en otro, y el encoder la trata como valor nuevo
+      (ver `text_dtypes`)
+    - parquet: pyarrow `iter_batches`
+    - sql: `path` es el archivo .sql; `pd.read_sql(chunksize=...)` (filas con `fetchmany`)
+    """
+    source = source or infer_source(path)
+    p = Path(path)
+    if source not in SOURCES:
+        raise ValueError(f"source debe ser uno de {SOURCES}")
+    if not p.exists():
+        raise FileNotFoundError(f"No existe {p}.")
+    if source == "csv":
+        if chunksize <= 0:
+            yield pd.read_csv(p, dtype=dtype)
+            return
+        with pd.read_csv(p, chunksize=chunksize, dtype=dtype) as reader:
+            yield from reader
+    elif source == "parquet":
+        yield from _iter_parquet(p, chunksize)
+    else:
+        yield from _iter_sql(p, chunksize)
+
+
+def text_dtypes(bundle: Dict) -> Optional[Dict[str, object]]:
+    """`dtype` para `iter_input`: las categóricas del modelo siempre como texto (así se aprendió el vocabulario)."""
+    cat_cols = bundle.get("cat_cols")
+    if cat_cols is None:  # artefactos viejos: categóricas = features no numéricas
+        num = set(bundle.get("num_cols", []))
+        cat_cols = [c for c in bundle.get("feature_cols", []) if c not in num] if num else []
+    return {c: str for c in cat_cols} or None
+
+
+class BatchWriter:
+    """Escribe la salida por partes: CSV (`utf-8-sig`, encabezado solo en el primer bloque) o Parquet (un row group
+    por bloque, esquema del primero). Escribe a `<out>.tmp` y lo renombra al cerrar: nunca queda un archivo a medias."""
+
+    def __init__(self, out_path: Path):
+        self.out_path = Path(out_path)
+        self.tmp_path = self.out_path.with_name(self.out_path.name + ".tmp")
+        self.parquet = self.out_path.suffix.lower() == ".parquet"
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+        self.out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+            if self._writer is None:
+                self._schema = table.schema
+                self._writer = pq.ParquetWriter(self.tmp_path, self._schema)
+            self._writer.write_table(table)
+        else:
+            first = self._writer is None
+            df.to_csv(
+                self.tmp_path, mode="w" if first else "a", header=first, index=False,
+                encoding="utf-8-sig" if first else "utf-8",  # el BOM va una sola vez, al inicio
+            )
+            self._writer = True
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self.parquet and self._writer is not None:
+            self._writer.close()
+        if self._writer is None:
+            return
+        self.tmp_path.replace(self.out_path)
+
+    def abort(self) -> None:
+        if self.parquet and self._writer is not None:
+            self._writer.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+
+def score_frame(df: pd.DataFrame, bundle: Dict) -> pd.DataFrame:
+    """Agrega p_raw / p_cal / y_proba a un bloque (in-place): pipeline → Platt → escalar de conteo."""
+    feature_cols = bundle["feature_cols"]
+    missing = [c for c in feature_cols if c not in df.columns]
+    if missing:
+        raise ValueError(f"Faltan columnas para predecir: {missing[:20]}{'...' if len(missing)>20 else ''}")
+
+    s = float(bundle.get("count_scalar", 1.0))
+    p_raw = bundle["pipeline"].predict_proba(df[feature_cols])[:, 1]
+    p_cal = bundle["platt"].predict(p_raw)
+    df["p_raw"] = p_raw
+    df["p_cal"] = p_cal
+    df["y_proba"] = np.clip(p_cal * s, 0, 1)
+    return df
+
+
+@dataclass
+class StreamStats:
+    rows: int = 0
+    chunks: int = 0
+    flagged: int = 0
+    threshold: float = float("nan")
+    seconds: float = 0.0
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def score_stream(
+    bundle: Dict,
+    batches: Iterable[pd.DataFrame],
+    out_path: Path,
+    cfg: ScoringConfig,
+    *,
+    tmp_dir: Optional[Path] = None,
+) -> StreamStats:
+    """
+    Scoring por bloques con memoria acotada por el bloque (más O(topM) del heap):
+
+    1. cada bloque pasa por `score_frame`, sus probabilidades entran al `TopMHeap` y el bloque ya puntuado se
+       guarda en un temporal (pickle: conserva los tipos tal cual) en `tmp_dir`; por defecto junto a la salida y
+       no en /tmp, que suele ser tmpfs (RAM) y compartido
+    2. con el umbral Top-M global ya conocido, se releen los temporales en orden, se marca `gestionar` y se
+       escriben a la salida con `BatchWriter`
+
+    El resultado es el mismo archivo que el modo en memoria (`apply_topM_flag` sobre toda la tabla).
+    """
+    t0 = time.perf_counter()
+    stats = StreamStats()
+    heap = TopMHeap(cfg.topM)
+    out_path = Path(out_path)
+    tmp_root = Path(tmp_dir) if tmp_dir is not None else out_path.parent
+    tmp_root.mkdir(parents=True, exist_ok=True)
+    work = Path(tempfile.mkdtemp(prefix=".scoring_", dir=tmp_root))
+    writer = BatchWriter(out_path)
+    try:
+        parts = []
+        for chunk in batches:
+            chunk = score_frame(chunk, bundle)
+            heap.push(chunk[cfg.proba_col].to_numpy())
+            part = work / f"chunk_{stats.chunks:06d}.pkl"
+            chunk.to_pickle(part)
+            parts.append(part)
+            stats.chunks += 1
+            stats.rows += len(chunk)
+
+        stats.threshold = heap.threshold
+        for part in parts:
+            chunk = flag_topM(pd.read_pickle(part), cfg, stats.threshold)
+            stats.flagged += int(chunk[cfg.flag_col].sum())
+            writer.write(chunk)
+            part.unlink()
+        writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    stats.seconds = time.perf_counter() - t0
+    return stats
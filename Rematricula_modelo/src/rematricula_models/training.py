@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.pipeline import Pipeline
+
+
+def worker_budget(n_tasks: int, jobs: int = 0, prefer_gpu: bool = False, cpu: Optional[int] = None) -> Tuple[int, int]:
+    """(ajustes simultáneos, hilos de XGBoost por ajuste) sin pasarse de los núcleos disponibles.
+
+    jobs <= 0 = automático: un ajuste por tarea en CPU; con GPU de a uno (la GPU ya paraleliza por dentro).
+    """
+    cpu = cpu or os.cpu_count() or 1
+    if jobs <= 0:
+        jobs = 1 if prefer_gpu else n_tasks
+    workers = max(1, min(jobs, n_tasks, cpu))
+    return workers, max(1, cpu // workers)
+
+
+def gpu_usable(builder: Callable) -> bool:
+    """Un ajuste de prueba (64 filas, 1 árbol) con `prefer_gpu=True`: True solo si entrenó de verdad en GPU.
+
+    `PREFER_GPU=1` es el default, así que no alcanza con el flag: en un equipo solo-CPU el modo automático
+    correría de a un ajuste y cada ajuste intentaría GPU antes de caer a CPU.
+    """
+    rng = np.random.default_rng(0)
+    X = rng.random((64, 2))
+    y = np.arange(64) % 2
+    try:
+        clf = builder(y, prefer_gpu=True, n_jobs=1, n_estimators=1).fit(X, y)
+        gp = json.loads(clf.get_booster().save_config())["learner"]["generic_param"]
+    except Exception:
+        return False
+    # xgboost >= 2 informa `device` (sin GPU visible cae a "cpu" con un warning); antes, `gpu_id` >= 0
+    device = gp.get("device")
+    return str(device).startswith("cuda") if device is not None else int(gp.get("gpu_id", -1)) >= 0
+
+
+def fit_pipeline(
+    pre, builder: Callable, X, y: np.ndarray, prefer_gpu: bool, n_jobs: Optional[int] = None,
+    eval_set: Optional[Tuple[object, np.ndarray]] = None, **build_kw
+):
+    """prep + clf sobre (X, y); si la GPU falla, reintenta en CPU. `pre` se clona: cada ajuste tiene el suyo.
+
+    Con `pre=None`, X ya viene codificada (matriz compartida por los folds) y se ajusta solo el clasificador.
+    `eval_set=(X_eval, y_eval)` (crudo, se transforma con el mismo `prep`) es el tramo para early stopping.
+    """
+    def _fit(gpu: bool):
+        clf = builder(y, prefer_gpu=gpu, n_jobs=n_jobs, **build_kw)
+        prep = None if pre is None else clone(pre).fit(X, y)
+        Xt = X if prep is None else prep.transform(X)
+        fit_kw = {}
+        if eval_set is not None:
+            X_ev = eval_set[0] if prep is None else prep.transform(eval_set[0])
+            fit_kw = dict(eval_set=[(X_ev, eval_set[1])], verbose=False)
+        clf.fit(Xt, y, **fit_kw)
+        return clf if prep is None else Pipeline([("prep", prep), ("clf", clf)])
+
+    try:
+        return _fit(prefer_gpu)
+    except Exception:
+        # fallback a CPU si GPU falla
+        return _fit(False)
+
+
+def boosting_stats(model) -> Tuple[Optional[int], Optional[int]]:
+    """(árboles construidos, mejor iteración o None si no hubo early stopping) del clasificador del modelo."""
+    clf = model.steps[-1][1] if isinstance(model, Pipeline) else model
+    n_trees = clf.get_booster().num_boosted_rounds() if hasattr(clf, "get_booster") else getattr(clf, "n_estimators", None)
+    return n_trees, getattr(clf, "best_iteration", None)
+
+
+def time_ordered_eval(tr_idx: np.ndarray, y: np.ndarray, frac: float) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Parte los índices de entrenamiento de un fold (ya en orden temporal) en (ajuste, último tramo para
+    early stopping). Sin tramo (None) si queda muy chico o con una sola clase: AUC no está definido."""
+    n_eval = int(len(tr_idx) * frac)
+    if frac <= 0 or n_eval < 2 or len(tr_idx) - n_eval < 2:
+        return tr_idx, None
+    fit_idx, ev_idx = tr_idx[:-n_eval], tr_idx[-n_eval:]
+    if len(np.unique(y[ev_idx])) < 2 or len(np.unique(y[fit_idx])) < 2:
+        return tr_idx, None
+    return fit_idx, ev_idx
+
+
+def take_rows(X, idx: np.ndarray):
+    """Filas `idx` de un DataFrame / ndarray / CSR. Los índices de `TimeSeriesSplit` son tramos contiguos:
+    se cortan con un slice (vista en pandas/numpy, solo el tramo de `indptr`/`data` en CSR) en vez de indexar."""
+    if len(idx) and idx[-1] - idx[0] + 1 == len(idx):
+        sl = slice(int(idx[0]), int(idx[-1]) + 1)
+        return X.iloc[sl] if isinstance(X, pd.DataFrame) else X[sl]
+    return X.iloc[idx] if isinstance(X, pd.DataFrame) else X[idx]
+
+
+@dataclass
+class OOFResult:
+    proba_oof: np.ndarray   # 0 en el primer tramo (nunca cae en un fold de prueba), igual que el loop secuencial
+    model: object           # modelo final (todo el train): Pipeline, o solo el clasificador si X ya venía codificada
+    workers: int
+    threads_per_worker: int
+    wall_s: float = 0.0
+    fit_s: Dict[str, float] = field(default_factory=dict)  # duración de cada ajuste (folds + final)
+    n_trees: Dict[str, int] = field(default_factory=dict)  # árboles construidos en cada ajuste
+    best_iteration: Dict[str, int] = field(default_factory=dict)  # folds con early stopping
+    early_stopping_rounds: int = 0
+    scored: Optional[np.ndarray] = None  # filas que cayeron en algún fold de prueba (las únicas con OOF real)
+    final_n_estimators: Optional[int] = None  # árboles del final (mediana de mejores iteraciones + 1)
+    gpu: bool = False  # prefer_gpu y el ajuste de prueba entrenó en GPU
+
+    def summary(self) -> Dict[str, object]:
+        busy = sum(self.fit_s.values())
+        best = list(self.best_iteration.values())
+        return {
+            "gpu": self.gpu,
+            "workers": self.workers,
+            "threads_per_worker": self.threads_per_worker,
+            "wall_s": round(self.wall_s, 3),
+            "fit_s": {k: round(v, 3) for k, v in self.fit_s.items()},
+            # suma de ajustes / tiempo de pared: ~1 secuencial, ~workers si el paralelismo rinde
+            "speedup": round(busy / self.wall_s, 2) if self.wall_s > 0 else None,
+            "oof_rows": int(self.scored.sum()) if self.scored is not None else None,
+            "boosting": {
+                "early_stopping_rounds": self.early_stopping_rounds,
+                "best_iteration": dict(self.best_iteration),
+                "best_iteration_median": float(np.median(best)) if best else None,
+                "best_iteration_min": min(best) if best else None,
+                "best_iteration_max": max(best) if best else None,
+                "final_n_estimators": self.final_n_estimators,
+                "n_trees": dict(self.n_trees),
+                "trees_per_s": {
+                    k: round(n / self.fit_s[k], 1) for k, n in self.n_trees.items() if n and self.fit_s.get(k)
+                },
+                "trees_total": sum(n for n in self.n_trees.values() if n),
+            },
+        }
+
+
+def _fit_task(name, pre, builder, X, y, tr_idx, te_idx, prefer_gpu, n_jobs, build_kw, es_frac=0.0):
+    t0 = time.perf_counter()
+    if tr_idx is None:
+        model = fit_pipeline(pre, builder, X, y, prefer_gpu, n_jobs, **build_kw)
+        out = model
+    else:
+        fit_idx, ev_idx = time_ordered_eval(tr_idx, y, es_frac) if build_kw.get("early_stopping_rounds") else (tr_idx, None)
+        kw = dict(build_kw)
+        if ev_idx is None:
+            kw.pop("early_stopping_rounds", None)
+        eval_set = None if ev_idx is None else (take_rows(X, ev_idx), y[ev_idx])
+        model = fit_pipeline(pre, builder, take_rows(X, fit_idx), y[fit_idx], prefer_gpu, n_jobs, eval_set=eval_set, **kw)
+        out = model.predict_proba(take_rows(X, te_idx))[:, 1]
+    return name, out, time.perf_counter() - t0, boosting_stats(model)
+
+
+def fit_oof_and_final(
+    X,
+    y: np.ndarray,
+    pre,
+    builder: Callable,
+    *,
+    n_splits: int = 5,
+    prefer_gpu: bool = False,
+    jobs: int = 0,
+    build_kw: Optional[Dict[str, object]] = None,
+    early_stopping_rounds: int = 0,
+    es_frac: float = 0.15,
+) -> OOFResult:
+    """
+    Folds de `TimeSeriesSplit` (probabilidades OOF para Platt) y el modelo final en un mismo pool.
+
+    - el ajuste final no depende de los folds: arranca junto con ellos en vez de esperar al final
+    - las tareas se lanzan de la más grande a la más chica (final, último fold, ...) para acortar la cola
+    - hilos de joblib: XGBoost suelta el GIL al entrenar y X se comparte sin copiar ni serializar;
+      cada ajuste usa `threads_per_worker` hilos de XGBoost para no sobre-suscribir núcleos
+    - XGBoost `hist` en CPU es determinista con cualquier cantidad de hilos: mismo `proba_oof` que secuencial
+    - `pre=None`: X es la matriz ya codificada (`preprocessing.encode_cached`) y los folds solo cortan filas
+    - `prefer_gpu` se confirma con `gpu_usable` (un ajuste de prueba) antes de repartir workers
+
+    Con `early_stopping_rounds > 0`, cada fold separa el último `es_frac` de su train (orden temporal) como
+    tramo de evaluación y corta cuando el AUC no mejora. El final usa la mediana de las mejores iteraciones
+    como `n_estimators`: depende de los folds, así que se entrena después, con todos los hilos.
+    """
+    build_kw = dict(build_kw or {})
+    # el flag no garantiza GPU: se prueba una vez y, si no sirve, todo corre en CPU con los folds en paralelo
+    prefer_gpu = bool(prefer_gpu) and gpu_usable(builder)
+    tscv = TimeSeriesSplit(n_splits=n_splits)
+    folds = list(tscv.split(X, y))
+    tasks: List[Tuple[str, Optional[np.ndarray], Optional[np.ndarray]]] = []
+    if early_stopping_rounds <= 0:
+        tasks.append(("final", None, None))
+    for i, (tr_idx, te_idx) in reversed(list(enumerate(folds, start=1))):
+        tasks.append((f"fold_{i}", tr_idx, te_idx))
+
+    fold_kw = dict(build_kw, early_stopping_rounds=early_stopping_rounds) if early_stopping_rounds > 0 else build_kw
+    workers, threads = worker_budget(len(tasks), jobs, prefer_gpu)
+    t0 = time.perf_counter()
+    results = Parallel(n_jobs=workers, prefer="threads")(
+        delayed(_fit_task)(
+            name, pre, builder, X, y, tr_idx, te_idx, prefer_gpu, threads,
+            build_kw if te_idx is None else fold_kw, es_frac,
+        )
+        for name, tr_idx, te_idx in tasks
+    )
+
+    proba_oof = np.zeros(X.shape[0], dtype=float)
+    scored = np.zeros(X.shape[0], dtype=bool)
+    res = OOFResult(
+        proba_oof, None, workers, threads, early_stopping_rounds=max(early_stopping_rounds, 0), scored=scored,
+        gpu=prefer_gpu,
+    )
+    for (name, _, te_idx), (_, out, secs, (n_trees, best)) in zip(tasks, results):
+        res.fit_s[name] = secs
+        res.n_trees[name] = n_trees
+        if best is not None:
+            res.best_iteration[name] = int(best)
+        if te_idx is None:
+            res.model = out
+        else:
+            proba_oof[te_idx] = out
+            scored[te_idx] = True
+
+    if res.model is None:
+        # final con la mediana de mejores iteraciones (si ningún fold pudo cortar, el n_estimators del builder)
+        final_kw = dict(build_kw)
+        if res.best_iteration:
+            res.final_n_estimators = int(np.median(list(res.best_iteration.values()))) + 1
+            final_kw["n_estimators"] = res.final_n_estimators
+        _, threads_final = worker_budget(1, 1, prefer_gpu)
+        _, model, secs, (n_trees, _) = _fit_task("final", pre, builder, X, y, None, None, prefer_gpu, threads_final, final_kw)
+        res.model = model
+        res.fit_s["final"] = secs
+        res.n_trees["final"] = n_trees
+    res.wall_s = time.perf_counter() - t0
+    return res
@@ -3,20 +3,21 @@ from __future__ import annotations
 
 import json
 import os
+import time
 from pathlib import Path
 
 import joblib
 import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
-from sklearn.model_selection import TimeSeriesSplit
 from sklearn.pipeline import Pipeline
 
 from rematricula_models.data import DataConfig, add_label_and_period_order, load_dataset, time_split_last_period
-from rematricula_models.preprocessing import infer_feature_sets, make_preprocessor
+from rematricula_models.preprocessing import ENCODINGS, encode_cached, infer_feature_sets
 from rematricula_models.models import MODEL_REGISTRY
 from rematricula_models.calibration import fit_platt_from_oof, count_adjustment_scalar
 from rematricula_models.metrics import base_metrics, kpi_block, tabla_control
+from rematricula_models.training import fit_oof_and_final
 
 load_dotenv()
 
@@ -31,6 +32,16 @@ def main():
     parser.add_argument("--out-dir", default=os.environ.get("OUT_DIR", "outputs"))
     parser.add_argument("--topM", type=int, default=int(os.environ.get("TOPM", "250")))
     parser.add_argument("--ts-splits", type=int, default=int(os.environ.get("TS_SPLITS", "5")))
+    parser.add_argument("--oof-jobs", type=int, default=int(os.environ.get("OOF_JOBS", "0")),
+                        help="Ajustes simultáneos (folds + final). 0 = automático (todos en CPU, 1 con GPU).")
+    parser.add_argument("--early-stopping-rounds", type=int, default=int(os.environ.get("EARLY_STOPPING_ROUNDS", "50")),
+                        help="Early stopping por fold (0 = sin early stopping: 1200 árboles en todos los ajustes).")
+    parser.add_argument("--es-frac", type=float, default=float(os.environ.get("ES_FRAC", "0.15")),
+                        help="Fracción final (en orden temporal) del train de cada fold usada como tramo de evaluación.")
+    parser.add_argument("--encoding", choices=ENCODINGS, default=os.environ.get("ENCODING", "onehot"),
+                        help="onehot (CSR) o native (categóricas nativas de XGBoost).")
+    parser.add_argument("--cache-dir", default=os.environ.get("CACHE_DIR", "outputs/cache"),
+                        help="Cache de la matriz codificada (vacío = sin cache).")
     parser.add_argument("--prefer-gpu", action="store_true", default=os.environ.get("PREFER_GPU", "1").lower() in {"1","true","yes","y"})
     args = parser.parse_args()
 
@@ -47,8 +58,6 @@ def main():
     drop_extra = [cfg.col_id, cfg.col_periodo, cfg.col_periodo_paga, cfg.col_periodo_orden]
     feat_cols, num_cols, cat_cols = infer_feature_sets(df_train, cfg.col_target, drop_extra)
 
-    pre = make_preprocessor(num_cols, cat_cols)
-
     # Ordena train por periodo_orden para TimeSeriesSplit
     df_train = df_train.sort_values([cfg.col_periodo_orden, cfg.col_id]).reset_index(drop=True)
 
@@ -63,34 +72,26 @@ def main():
     if builder is None:
         raise ValueError(f"Modelo no soportado: {args.model}. Opciones: {list(MODEL_REGISTRY)}")
 
-    def build_clf(y):
-        return builder(y, prefer_gpu=args.prefer_gpu)
-
-    pipe = Pipeline([("prep", pre), ("clf", build_clf(y_tr))])
-
-    # OOF para Platt (TimeSeriesSplit)
-    tscv = TimeSeriesSplit(n_splits=args.ts_splits)
-    proba_oof = np.zeros(len(X_tr), dtype=float)
-
-    for tr_idx, te_idx in tscv.split(X_tr, y_tr):
-        pipe_fold = Pipeline([("prep", pre), ("clf", build_clf(y_tr[tr_idx]))])
-        try:
-            pipe_fold.fit(X_tr.iloc[tr_idx], y_tr[tr_idx])
-        except Exception:
-            # fallback a CPU si GPU falla
-            pipe_fold = Pipeline([("prep", pre), ("clf", builder(y_tr[tr_idx], prefer_gpu=False))])
-            pipe_fold.fit(X_tr.iloc[tr_idx], y_tr[tr_idx])
-
-        proba_oof[te_idx] = pipe_fold.predict_proba(X_tr.iloc[te_idx])[:, 1]
-
-    platt = fit_platt_from_oof(proba_oof, y_tr)
-
-    # Entrena final
-    try:
-        pipe.fit(X_tr, y_tr)
-    except Exception:
-        pipe = Pipeline([("prep", pre), ("clf", builder(y_tr, prefer_gpu=False))])
-        pipe.fit(X_tr, y_tr)
+    # Codifica una sola vez (vocabulario fijo, con cache en disco): los folds solo cortan filas
+    t0 = time.perf_counter()
+    enc, Xenc_tr, cache_hit = encode_cached(
+        X_tr, num_cols, cat_cols, encoding=args.encoding, cache_dir=Path(args.cache_dir) if args.cache_dir else None,
+    )
+    encode_s = time.perf_counter() - t0
+    print(f"🧮 Matriz codificada ({args.encoding}): {'cache' if cache_hit else 'nueva'} en {encode_s:.1f}s")
+
+    # OOF para Platt (TimeSeriesSplit) + modelo final, en paralelo
+    oof = fit_oof_and_final(
+        Xenc_tr, y_tr, None, builder,
+        n_splits=args.ts_splits, prefer_gpu=args.prefer_gpu, jobs=args.oof_jobs,
+        build_kw={"enable_categorical": True} if args.encoding == "native" else None,
+        early_stopping_rounds=args.early_stopping_rounds, es_frac=args.es_frac,
+    )
+    proba_oof = oof.proba_oof
+    pipe = Pipeline([("prep", enc), ("clf", oof.model)])
+
+    # Platt solo con filas que tienen OOF real: el primer tramo de TimeSeriesSplit nunca se predice (queda en 0)
+    platt = fit_platt_from_oof(proba_oof[oof.scored], y_tr[oof.scored])
 
     proba_valid_raw = pipe.predict_proba(X_va)[:, 1]
     proba_valid_cal = platt.predict(proba_valid_raw)
@@ -115,6 +116,7 @@ def main():
         "feature_cols": feat_cols,
         "num_cols": num_cols,
         "cat_cols": cat_cols,
+        "encoding": args.encoding,
         "periodo_obj": periodo_obj,
         "cfg": cfg,
     }
@@ -146,9 +148,13 @@ def main():
         "n_train": int(len(df_train)),
         "n_valid": int(len(df_valid)),
         "topM": int(args.topM),
+        "training": {**oof.summary(), "encoding": args.encoding, "encode_s": round(encode_s, 3), "cache_hit": cache_hit},
     }
     (out_dir / "reports" / "report.json").write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
 
+    print(f"⏱️  Entrenamiento: {oof.wall_s:.1f}s ({oof.workers} ajuste(s) en paralelo x {oof.threads_per_worker} hilo(s))")
+    if oof.best_iteration:
+        print(f"🌲 Mejor iteración por fold: {oof.best_iteration} → final con {oof.final_n_estimators} árboles")
     print(f"✅ Modelo guardado: {model_path}")
     print(f"📄 Scoring valid:  {scoring_path}")
     print(f"📄 Reporte:       {out_dir / 'reports' / 'report.json'}")
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rematricula_models.data import (
+    DataConfig,
+    add_label_and_period_order,
+    add_label_and_period_order_legacy,
+    compute_label_row,
+    compute_labels,
+    make_period_map,
+)
+
+
+def _history(n: int = 2000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    cfg = DataConfig()
+    # periodos válidos + sucios (minúsculas, espacios, fuera del orden, nulos)
+    periodos = list(cfg.periodo_orden) + [" 2024a ", "24v01", "1999A", None, np.nan]
+    estados = ["YA PAGO", "ya pago", "Ya Pago ", "PENDIENTE", None]
+    return pd.DataFrame({
+        "num_identificacion": rng.integers(1, 500, n),
+        "COD_PERIODO": rng.choice(np.array(periodos, dtype=object), n),
+        "Periodo_Paga": rng.choice(np.array(periodos, dtype=object), n),
+        "ESTADOACTUAL": rng.choice(np.array(estados, dtype=object), n),
+        "Programa": rng.choice(["ING", "ADM"], n),
+    })
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_matches_legacy(seed):
+    cfg = DataConfig()
+    df = _history(seed=seed)
+    ref = add_label_and_period_order_legacy(df, cfg)
+    new = add_label_and_period_order(df, cfg)
+    pd.testing.assert_frame_equal(ref, new)
+    assert new[cfg.col_target].sum() > 0
+
+
+def test_matches_row_reference():
+    cfg = DataConfig()
+    orden_map = make_period_map(cfg)
+    df = add_label_and_period_order(_history(seed=3).drop(columns=[cfg.col_target], errors="ignore"), cfg)
+    ref = df.apply(lambda r: compute_label_row(r, cfg, orden_map), axis=1).to_numpy()
+    np.testing.assert_array_equal(compute_labels(df, cfg, orden_map), ref)
+
+
+def test_missing_columns_and_existing_target():
+    cfg = DataConfig()
+    df = _history(n=300).drop(columns=["Periodo_Paga"])
+    pd.testing.assert_frame_equal(add_label_and_period_order_legacy(df, cfg), add_label_and_period_order(df, cfg))
+    assert add_label_and_period_order(df, cfg)[cfg.col_target].sum() == 0
+
+    df = _history(n=300)
+    df[cfg.col_target] = 7  # si el target ya viene, no se recalcula
+    out = add_label_and_period_order(df, cfg)
+    assert (out[cfg.col_target] == 7).all()
+
+
+def test_does_not_mutate_input():
+    cfg = DataConfig()
+    df = _history(n=100)
+    before = df.copy()
+    add_label_and_period_order(df, cfg)
+    pd.testing.assert_frame_equal(df, before)
@@ -0,0 +1,3 @@
+def test_imports():
+    from rematricula_models.data import DataConfig, add_label_and_period_order  # noqa: F401
+    from rematricula_models.models import MODEL_REGISTRY  # noqa: F401
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.pipeline import Pipeline
+
+from rematricula_models.models.xgboost_model import build_xgb
+from rematricula_models import preprocessing
+from rematricula_models.preprocessing import FixedVocabEncoder, data_key, encode_cached, make_preprocessor
+from rematricula_models.training import fit_oof_and_final, take_rows
+
+NUM = ["promedio", "creditos"]
+CAT = ["programa", "sede"]
+
+
+def _frame(n=800, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "promedio": rng.random(n) * 5,
+        "creditos": rng.integers(0, 20, n),
+        "programa": rng.choice(np.array(["ING", "ADM", None, "CON"], dtype=object), n),
+        "sede": rng.choice(["BOG", "CAL"], n),
+    })
+
+
+def test_onehot_matches_column_transformer():
+    X = _frame()
+    ref = make_preprocessor(NUM, CAT).fit_transform(X)
+    ref = ref.toarray() if sp.issparse(ref) else ref
+    enc = FixedVocabEncoder(NUM, CAT).fit(X)
+    out = enc.transform(X)
+    assert sp.issparse(out) == sp.issparse(make_preprocessor(NUM, CAT).fit_transform(X))
+    out = out.toarray() if sp.issparse(out) else out
+    np.testing.assert_array_equal(out, ref)
+    assert len(enc.get_feature_names_out()) == out.shape[1]
+
+    # valores nuevos: fila en cero para esa variable (como handle_unknown="ignore")
+    new = enc.transform(X.head(3).assign(sede="PEREIRA"))
+    np.testing.assert_array_equal(new[:, -2:], 0)
+
+
+def test_native_codes_are_fixed():
+    X = _frame()
+    enc = FixedVocabEncoder(NUM, CAT, encoding="native").fit(X)
+    out = enc.transform(X.head(5).assign(sede="PEREIRA"))
+    assert list(out["sede"].cat.categories) == ["BOG", "CAL"]
+    assert out["sede"].isna().all()
+
+
+def test_encode_cached_hit(tmp_path):
+    X = _frame()
+    _, m1, hit1 = encode_cached(X, NUM, CAT, cache_dir=tmp_path)
+    _, m2, hit2 = encode_cached(X, NUM, CAT, cache_dir=tmp_path)
+    _, _, hit3 = encode_cached(X.assign(promedio=X["promedio"] + 1), NUM, CAT, cache_dir=tmp_path)
+    assert (hit1, hit2, hit3) == (False, True, False)
+    np.testing.assert_array_equal(m1, m2)
+    assert len(list(tmp_path.glob("enc_*.joblib"))) == 2
+
+
+def test_cache_key_includes_encoder_settings(monkeypatch):
+    X = _frame()[NUM + CAT]
+    key = data_key(X, FixedVocabEncoder(NUM, CAT))
+    assert key == data_key(X, FixedVocabEncoder(NUM, CAT))
+    assert key != data_key(X, FixedVocabEncoder(NUM, CAT, sparse_threshold=0.5))
+    assert key != data_key(X, FixedVocabEncoder(NUM, CAT, encoding="native"))
+    monkeypatch.setattr(preprocessing, "CACHE_FORMAT", preprocessing.CACHE_FORMAT + 1)
+    assert key != data_key(X, FixedVocabEncoder(NUM, CAT))
+
+
+def test_fold_keeps_full_train_vocabulary():
+    # comportamiento buscado: los folds usan el vocabulario de todo el train; una categoría que solo aparece en
+    # tramos posteriores es una columna en cero en el fold (no es el mismo OOF que reajustar por fold)
+    X = _frame()
+    X.loc[600:, "programa"] = "NUEVO"
+    enc, Xenc, _ = encode_cached(X, NUM, CAT)
+    names = list(enc.get_feature_names_out())
+    tr = np.arange(0, 400)
+    fold = take_rows(Xenc, tr)
+    fold = fold.toarray() if sp.issparse(fold) else np.asarray(fold)
+
+    assert fold.shape[1] == len(names)
+    assert not fold[:, names.index("programa_NUEVO")].any()
+    ref = make_preprocessor(NUM, CAT).fit_transform(X.iloc[tr])
+    ref = ref.toarray() if sp.issparse(ref) else ref
+    assert ref.shape[1] == len(names) - 1
+    np.testing.assert_array_equal(np.delete(fold, names.index("programa_NUEVO"), axis=1), ref)
+
+
+def test_take_rows_contiguous_slice():
+    X = _frame()
+    m = sp.csr_matrix(FixedVocabEncoder(NUM, CAT).fit(X).transform(X))
+    idx = np.arange(100, 300)
+    assert (take_rows(m, idx) != m[idx]).nnz == 0
+    assert take_rows(X, idx).equals(X.iloc[idx])
+    gaps = np.array([1, 5, 9])
+    assert take_rows(X, gaps).equals(X.iloc[gaps])
+
+
+def test_final_model_on_shared_matrix_matches_pipeline():
+    X = _frame(seed=1)
+    y = (X["promedio"] > 2.5).astype(int).to_numpy()
+
+    def small(y, prefer_gpu=False, n_jobs=None, **kw):
+        return build_xgb(y, prefer_gpu=prefer_gpu, n_jobs=n_jobs, **kw).set_params(n_estimators=30)
+
+    enc, Xenc, _ = encode_cached(X, NUM, CAT)
+    res = fit_oof_and_final(Xenc, y, None, small, n_splits=3, jobs=1)
+    model = Pipeline([("prep", enc), ("clf", res.model)])
+    ref = Pipeline([("prep", make_preprocessor(NUM, CAT)), ("clf", small(y))]).fit(X, y)
+    np.testing.assert_array_equal(model.predict_proba(X), ref.predict_proba(X))
+    assert res.proba_oof.shape == (len(X),)
+
+    enc_n, Xn, _ = encode_cached(X, NUM, CAT, encoding="native")
+    res_n = fit_oof_and_final(Xn, y, None, small, n_splits=3, jobs=1, build_kw={"enable_categorical": True})
+    assert Pipeline([("prep", enc_n), ("clf", res_n.model)]).predict_proba(X).shape == (len(X), 2)
+
+
+def test_onehot_sparse_output_when_low_density():
+    rng = np.random.default_rng(4)
+    X = pd.DataFrame({
+        "promedio": rng.random(500),
+        "creditos": rng.integers(0, 3, 500),
+        "programa": rng.choice([f"P{i:02d}" for i in range(40)], 500),
+        "sede": rng.choice([f"S{i}" for i in range(15)], 500),
+    })
+    ref = make_preprocessor(NUM, CAT).fit_transform(X)
+    out = FixedVocabEncoder(NUM, CAT).fit(X).transform(X)
+    assert sp.isspmatrix_csr(out) and sp.issparse(ref)
+    np.testing.assert_array_equal(out.toarray(), ref.toarray())
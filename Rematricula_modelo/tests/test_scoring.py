@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from rematricula_models.calibration import fit_platt_from_oof
+from rematricula_models.preprocessing import FixedVocabEncoder
+from rematricula_models.scoring import ScoringConfig, TopMHeap, apply_topM_flag, threshold_for_topM
+from rematricula_models.streaming import iter_input, score_frame, score_stream, text_dtypes
+
+
+@pytest.mark.parametrize("topM", [0, 1, 7, 250, 999, 1000, 5000])
+def test_heap_threshold_matches_partition(topM):
+    rng = np.random.default_rng(topM)
+    p = np.round(rng.random(1000), 2)  # con repetidos
+    chunks = iter(np.array_split(p, 9))
+    assert threshold_for_topM(chunks, topM) == threshold_for_topM(p, topM)
+
+
+def test_heap_empty():
+    with pytest.raises(ValueError):
+        _ = TopMHeap(10).threshold
+    with pytest.raises(ValueError):
+        threshold_for_topM(iter([]), 10)
+
+
+def _bundle_and_data(n=1200, programas=("ING", "ADM", "CON")):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "num_identificacion": np.arange(n),
+        "promedio": rng.random(n) * 5,
+        "programa": rng.choice(list(programas), n),
+    })
+    y = (df["promedio"] + rng.random(n) > 3).astype(int).to_numpy()
+    pipe = Pipeline([
+        ("prep", FixedVocabEncoder(["promedio"], ["programa"])),
+        ("clf", LogisticRegression()),
+    ]).fit(df, y)
+    bundle = {
+        "pipeline": pipe,
+        "platt": fit_platt_from_oof(pipe.predict_proba(df)[:, 1], y),
+        "count_scalar": 0.9,
+        "feature_cols": ["promedio", "programa"],
+        "num_cols": ["promedio"],
+        "cat_cols": ["programa"],
+    }
+    return bundle, df
+
+
+def _in_memory(bundle, df, topM):
+    out = score_frame(df.copy(), bundle)
+    return apply_topM_flag(out, ScoringConfig(topM=topM))
+
+
+@pytest.mark.parametrize("chunksize", [0, 100, 1000])
+def test_stream_csv_matches_in_memory(tmp_path, chunksize):
+    bundle, df = _bundle_and_data()
+    src = tmp_path / "nuevos.csv"
+    df.to_csv(src, index=False)
+    ref_path = tmp_path / "ref.csv"
+    _in_memory(bundle, pd.read_csv(src), 50).to_csv(ref_path, index=False, encoding="utf-8-sig")
+
+    out = tmp_path / "pred.csv"
+    stats = score_stream(bundle, iter_input(str(src), chunksize=chunksize), out, ScoringConfig(topM=50))
+    assert out.read_bytes() == ref_path.read_bytes()
+    assert stats.rows == len(df) and stats.flagged == 50
+    assert not (tmp_path / "pred.csv.tmp").exists()
+
+
+def test_stream_csv_keeps_categorical_dtype_across_chunks(tmp_path):
+    bundle, df = _bundle_and_data(programas=("101", "102", "A7"))
+    df = df.sort_values("programa", ignore_index=True)  # primeros bloques solo con códigos numéricos
+    src = tmp_path / "nuevos.csv"
+    df.to_csv(src, index=False)
+    assert pd.read_csv(src, nrows=100)["programa"].dtype == "int64"  # lo que inferiría el primer bloque
+
+    out = tmp_path / "pred.csv"
+    dtype = text_dtypes(bundle)
+    score_stream(bundle, iter_input(str(src), chunksize=100, dtype=dtype), out, ScoringConfig(topM=50))
+    got = pd.read_csv(out, dtype=dtype)
+    np.testing.assert_allclose(got["p_raw"], _in_memory(bundle, df, 50)["p_raw"])
+    assert (got["programa"] == df["programa"]).all()
+
+
+def test_text_dtypes_for_old_bundles():
+    bundle, _ = _bundle_and_data()
+    assert text_dtypes(bundle) == {"programa": str}
+    del bundle["cat_cols"]
+    assert text_dtypes(bundle) == {"programa": str}
+    del bundle["num_cols"]
+    assert text_dtypes(bundle) is None
+
+
+def test_stream_parquet_roundtrip(tmp_path):
+    pytest.importorskip("pyarrow")
+    bundle, df = _bundle_and_data()
+    src = tmp_path / "nuevos.parquet"
+    df.to_parquet(src, index=False)
+    out = tmp_path / "pred.parquet"
+    score_stream(bundle, iter_input(str(src), chunksize=250), out, ScoringConfig(topM=30))
+    got = pd.read_parquet(out)
+    pd.testing.assert_frame_equal(got, _in_memory(bundle, df, 30), check_dtype=False)
+
+
+def test_stream_spills_next_to_output(tmp_path):
+    bundle, df = _bundle_and_data()
+    out = tmp_path / "reports" / "pred.csv"
+    seen = []
+
+    def batches():
+        yield df.iloc[:600].copy()
+        seen.extend(out.parent.glob(".scoring_*/chunk_*.pkl"))  # el primer bloque ya está en el temporal
+        yield df.iloc[600:].copy()
+
+    score_stream(bundle, batches(), out, ScoringConfig(topM=10))
+    assert len(seen) == 1
+    assert [p.name for p in out.parent.iterdir()] == ["pred.csv"]  # el temporal se borra al terminar
+
+
+def test_stream_failure_leaves_no_output(tmp_path):
+    bundle, df = _bundle_and_data()
+
+    def batches():
+        yield df.iloc[:100].copy()
+        yield df.iloc[100:200].drop(columns=["programa"])  # falta una feature
+
+    out = tmp_path / "pred.csv"
+    with pytest.raises(ValueError, match="Faltan columnas"):
+        score_stream(bundle, batches(), out, ScoringConfig(topM=10))
+    assert not out.exists() and not (tmp_path / "pred.csv.tmp").exists()
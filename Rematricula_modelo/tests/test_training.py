@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.pipeline import Pipeline
+
+from rematricula_models.calibration import fit_platt_from_oof
+from rematricula_models.models.xgboost_model import build_xgb
+from rematricula_models.preprocessing import make_preprocessor
+from rematricula_models import training
+from rematricula_models.training import fit_oof_and_final, gpu_usable, worker_budget
+
+
+def _small_xgb(y, prefer_gpu=False, n_jobs=None, **kw):
+    return build_xgb(y, prefer_gpu=prefer_gpu, n_jobs=n_jobs, **{"n_estimators": 40, **kw})
+
+
+def _train(n=1500, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "promedio": rng.random(n) * 5,
+        "creditos": rng.integers(0, 20, n),
+        "programa": rng.choice(["ING", "ADM", "CON"], n),
+        "sede": rng.choice(["BOG", "CAL"], n),
+    })
+    logit = X["promedio"] - 2.5 + (X["programa"] == "ING") * 0.8
+    y = (rng.random(n) < 1 / (1 + np.exp(-logit))).astype(int).to_numpy()
+    return X, y
+
+
+def test_worker_budget():
+    assert worker_budget(6, 0, cpu=12) == (6, 2)
+    assert worker_budget(6, 0, cpu=4) == (4, 1)
+    assert worker_budget(6, 0, prefer_gpu=True, cpu=12) == (1, 12)
+    assert worker_budget(6, 2, cpu=12) == (2, 6)
+
+
+def test_prefer_gpu_without_usable_gpu_runs_folds_in_parallel(monkeypatch):
+    def sin_gpu(y, prefer_gpu=False, n_jobs=None, **kw):
+        if prefer_gpu:
+            raise RuntimeError("no CUDA-capable device")
+        return _small_xgb(y, n_jobs=n_jobs, **kw)
+
+    assert gpu_usable(sin_gpu) is False
+    monkeypatch.setattr(training.os, "cpu_count", lambda: 8)
+    X, y = _train()
+    pre = make_preprocessor(["promedio", "creditos"], ["programa", "sede"])
+    res = fit_oof_and_final(X, y, pre, sin_gpu, n_splits=4, prefer_gpu=True, jobs=0)
+    assert res.gpu is False
+    assert (res.workers, res.threads_per_worker) == (5, 1)  # final + 4 folds, no de a uno como con GPU
+
+
+def test_parallel_matches_sequential_loop():
+    X, y = _train()
+    pre = make_preprocessor(["promedio", "creditos"], ["programa", "sede"])
+
+    # loop secuencial original
+    ref_oof = np.zeros(len(X))
+    for tr_idx, te_idx in TimeSeriesSplit(n_splits=4).split(X, y):
+        pipe = Pipeline([("prep", pre), ("clf", _small_xgb(y[tr_idx]))]).fit(X.iloc[tr_idx], y[tr_idx])
+        ref_oof[te_idx] = pipe.predict_proba(X.iloc[te_idx])[:, 1]
+    ref_final = Pipeline([("prep", pre), ("clf", _small_xgb(y))]).fit(X, y)
+
+    for jobs in (1, 3):
+        res = fit_oof_and_final(X, y, pre, _small_xgb, n_splits=4, jobs=jobs)
+        np.testing.assert_array_equal(res.proba_oof, ref_oof)
+        np.testing.assert_array_equal(res.model.predict_proba(X), ref_final.predict_proba(X))
+        assert set(res.fit_s) == {"final", "fold_1", "fold_2", "fold_3", "fold_4"}
+
+    p_ref = fit_platt_from_oof(ref_oof, y)
+    p_new = fit_platt_from_oof(res.proba_oof, y)
+    np.testing.assert_array_equal(p_ref.model.coef_, p_new.model.coef_)
+
+
+def test_early_stopping_median_final():
+    X, y = _train(n=3000, seed=5)
+    pre = make_preprocessor(["promedio", "creditos"], ["programa", "sede"])
+    res = fit_oof_and_final(X, y, pre, build_xgb, n_splits=3, jobs=1, early_stopping_rounds=10)
+
+    assert set(res.best_iteration) == {"fold_1", "fold_2", "fold_3"}
+    assert res.final_n_estimators == int(np.median(list(res.best_iteration.values()))) + 1
+    assert res.n_trees["final"] == res.final_n_estimators
+    assert all(res.n_trees[f] < 1200 for f in res.best_iteration)
+
+    # el primer tramo de TimeSeriesSplit no tiene OOF
+    first_test = next(TimeSeriesSplit(n_splits=3).split(X))[1][0]
+    assert not res.scored[:first_test].any() and res.scored[first_test:].all()
+    assert (res.proba_oof[res.scored] > 0).all()
+
+    boosting = res.summary()["boosting"]
+    assert boosting["final_n_estimators"] == res.final_n_estimators
+    assert set(boosting["trees_per_s"]) == {"final", "fold_1", "fold_2", "fold_3"}
+
+
+def test_eval_slice_skipped_for_single_class():
+    X, y = _train(n=600, seed=6)
+    y = y.copy()
+    y[250:400] = 0  # el tramo de evaluación del fold 2 (filas 280-399) queda con una sola clase
+    res = fit_oof_and_final(X, y, make_preprocessor(["promedio", "creditos"], ["programa", "sede"]), _small_xgb,
+                            n_splits=2, jobs=1, early_stopping_rounds=5, es_frac=0.3)
+    assert "fold_2" not in res.best_iteration